@@ -0,0 +1,191 @@
+import itertools
+from datetime import date, timedelta
+from models.student import Student
+from models.academic import AcademicRecord
+from models.attendance import Attendance
+from models.document import Document
+from models.learning_outcome import LearningOutcome
+from models.reports import Reports
+
+class Fixture:
+    """Models plus representative ids picked from the benchmark database"""
+
+    def __init__(self, db):
+        self.db = db
+        self.student = Student()
+        self.academic = AcademicRecord()
+        self.attendance = Attendance()
+        self.document = Document()
+        self.outcome = LearningOutcome()
+        self.reports = Reports()
+        self._serial = itertools.count(1)
+
+        record = db.fetch_one("SELECT record_id, student_id, course_id, semester, year "
+                              "FROM academic_records ORDER BY record_id LIMIT 1") or {}
+        self.record_id = record.get('record_id')
+        self.student_id = record.get('student_id')
+        self.course_id = record.get('course_id')
+        self.semester = record.get('semester')
+        self.year = record.get('year')
+
+        row = db.fetch_one("SELECT attendance_date FROM attendance WHERE course_id = %s LIMIT 1",
+                           (self.course_id,))
+        self.attendance_date = row['attendance_date'] if row else date.today()
+        row = db.fetch_one("SELECT outcome_id FROM learning_outcomes ORDER BY outcome_id LIMIT 1")
+        self.outcome_id = row['outcome_id'] if row else None
+        roster = db.fetch_all("SELECT DISTINCT student_id FROM academic_records "
+                              "WHERE course_id = %s LIMIT 300", (self.course_id,))
+        self.roster = [row['student_id'] for row in roster]
+
+    def serial(self):
+        return next(self._serial)
+
+    # Throwaway rows for the delete cases, created outside the timed region
+
+    def new_student(self):
+        n = self.serial()
+        result = self.db.execute_query(
+            "INSERT INTO students (first_name, last_name, email) VALUES (%s, %s, %s)",
+            ("Bench", "Delete", f"bench-delete-{id(self)}-{n}@learntrack.example"))
+        return result.lastrowid
+
+    def new_course(self):
+        result = self.db.execute_query(
+            "INSERT INTO courses (course_code, course_name) VALUES (%s, %s)",
+            (f"BD{id(self) % 10**6}-{self.serial()}", "Bench delete"))
+        return result.lastrowid
+
+    def new_document(self):
+        result = self.db.execute_query(
+            "INSERT INTO documents (student_id, document_type, document_name) VALUES (%s, %s, %s)",
+            (self.student_id, "Other", "bench"))
+        return result.lastrowid
+
+    def new_outcome(self):
+        result = self.db.execute_query(
+            "INSERT INTO learning_outcomes (student_id, course_id, outcome_description, achievement_level) "
+            "VALUES (%s, %s, %s, %s)", (self.student_id, self.course_id, "bench", "met"))
+        return result.lastrowid
+
+class Case:
+    """One benchmarked call: setup(f) runs untimed and its result is passed to run"""
+
+    def __init__(self, name, run, setup=None, writes=False):
+        self.name = name
+        self.run = run
+        self.setup = setup
+        self.writes = writes
+
+def _unique_email(f):
+    return f"bench-{id(f)}-{f.serial()}@learntrack.example"
+
+# Read cases come first so the write cases cannot disturb their timings.
+CASES = [
+    # Student
+    Case('Student.view_all_students', lambda f, _: f.student.view_all_students()),
+    Case('Student.search_student', lambda f, _: f.student.search_student(f.student_id)),
+    # AcademicRecord
+    Case('AcademicRecord.view_all_courses', lambda f, _: f.academic.view_all_courses()),
+    Case('AcademicRecord.search_course', lambda f, _: f.academic.search_course(f.course_id)),
+    Case('AcademicRecord.view_student_grades', lambda f, _: f.academic.view_student_grades(f.student_id)),
+    Case('AcademicRecord.calculate_gpa', lambda f, _: f.academic.calculate_gpa(f.student_id)),
+    Case('AcademicRecord.view_transcript', lambda f, _: f.academic.view_transcript(f.student_id)),
+    Case('AcademicRecord.get_course_statistics', lambda f, _: f.academic.get_course_statistics(f.course_id)),
+    Case('AcademicRecord.get_all_course_statistics', lambda f, _: f.academic.get_all_course_statistics()),
+    # Attendance
+    Case('Attendance.view_attendance', lambda f, _: f.attendance.view_attendance(f.student_id)),
+    Case('Attendance.view_attendance[course]',
+         lambda f, _: f.attendance.view_attendance(f.student_id, f.course_id)),
+    Case('Attendance.get_attendance_percentage',
+         lambda f, _: f.attendance.get_attendance_percentage(f.student_id, f.course_id)),
+    Case('Attendance.view_course_attendance', lambda f, _: f.attendance.view_course_attendance(f.course_id)),
+    Case('Attendance.view_attendance_by_date',
+         lambda f, _: f.attendance.view_attendance_by_date(f.attendance_date)),
+    Case('Attendance.get_student_attendance_summary',
+         lambda f, _: f.attendance.get_student_attendance_summary(f.student_id)),
+    Case('Attendance.get_low_attendance_students', lambda f, _: f.attendance.get_low_attendance_students()),
+    # Count summaries above read attendance_rollup; these read the calendar
+    # and stream raw attendance
+    Case('AttendanceCalendar.series[week]',
+         lambda f, _: f.attendance.calendar.series('week', f.attendance_date - timedelta(days=90),
+                                                   f.attendance_date, f.course_id)),
+    Case('AttendanceCalendar.series[day, school-wide]',
+         lambda f, _: f.attendance.calendar.series('day', f.attendance_date - timedelta(days=30),
+                                                   f.attendance_date)),
+    Case('DatabaseConnection.fetch_iter[course attendance]',
+         lambda f, _: sum(1 for _ in f.db.fetch_iter(
+             "SELECT student_id, attendance_date, status FROM attendance WHERE course_id = %s",
+             (f.course_id,), batch_size=5000))),
+    # Document
+    Case('Document.view_student_documents', lambda f, _: f.document.view_student_documents(f.student_id)),
+    # LearningOutcome
+    Case('LearningOutcome.view_student_outcomes', lambda f, _: f.outcome.view_student_outcomes(f.student_id)),
+    Case('LearningOutcome.view_course_outcomes', lambda f, _: f.outcome.view_course_outcomes(f.course_id)),
+    Case('LearningOutcome.get_achievement_summary',
+         lambda f, _: f.outcome.get_achievement_summary(f.student_id)),
+    Case('LearningOutcome.get_course_achievement_statistics',
+         lambda f, _: f.outcome.get_course_achievement_statistics(f.course_id)),
+    Case('LearningOutcome.compare_student_performance',
+         lambda f, _: f.outcome.compare_student_performance(f.student_id, f.course_id)),
+    # Reports
+    Case('Reports.generate_student_report', lambda f, _: f.reports.generate_student_report(f.student_id)),
+    Case('Reports.generate_course_report', lambda f, _: f.reports.generate_course_report(f.course_id)),
+    Case('Reports.generate_overall_statistics', lambda f, _: f.reports.generate_overall_statistics()),
+    Case('Reports.view_top_performers', lambda f, _: f.reports.view_top_performers()),
+    Case('Reports.view_low_performers', lambda f, _: f.reports.view_low_performers()),
+    Case('Reports.view_attendance_summary', lambda f, _: f.reports.view_attendance_summary()),
+    Case('Reports.generate_semester_report',
+         lambda f, _: f.reports.generate_semester_report(f.semester, f.year)),
+    Case('Reports.view_attendance_heatmap',
+         lambda f, _: f.reports.view_attendance_heatmap(f.attendance_date - timedelta(days=90),
+                                                        f.attendance_date, f.course_id)),
+    Case('Reports.view_attendance_trend',
+         lambda f, _: f.reports.view_attendance_trend(f.attendance_date - timedelta(days=180),
+                                                      f.attendance_date, 'week', f.course_id)),
+
+    # Writes
+    Case('Student.add_student',
+         lambda f, email: f.student.add_student("Bench", "Student", email, "0700000000", "2004-01-01"),
+         setup=_unique_email, writes=True),
+    Case('Student.update_student',
+         lambda f, _: f.student.update_student(f.student_id, 'phone', "0700000001"), writes=True),
+    Case('Student.delete_student', lambda f, sid: f.student.delete_student(sid),
+         setup=Fixture.new_student, writes=True),
+    Case('AcademicRecord.add_course',
+         lambda f, n: f.academic.add_course(f"BA{id(f) % 10**6}-{n}", "Bench course", 3, ""),
+         setup=Fixture.serial, writes=True),
+    Case('AcademicRecord.delete_course', lambda f, cid: f.academic.delete_course(cid),
+         setup=Fixture.new_course, writes=True),
+    Case('AcademicRecord.add_academic_record',
+         lambda f, _: f.academic.add_academic_record(f.student_id, f.course_id, "Bench", 'B', 85, 2024, ""),
+         writes=True),
+    Case('AcademicRecord.add_academic_records',
+         lambda f, _: f.academic.add_academic_records(
+             [(sid, f.course_id, "Bench", 'B', 85, 2024, "") for sid in f.roster]), writes=True),
+    Case('AcademicRecord.update_academic_record',
+         lambda f, _: f.academic.update_academic_record(f.record_id, 'remarks', "bench"), writes=True),
+    Case('GpaEngine.rebuild[roster]', lambda f, _: f.academic.gpa.rebuild(f.roster), writes=True),
+    Case('Attendance.mark_attendance',
+         lambda f, _: f.attendance.mark_attendance(f.student_id, f.course_id, 'present'), writes=True),
+    Case('Attendance.mark_bulk_attendance',
+         lambda f, _: f.attendance.mark_bulk_attendance(f.course_id, f.roster, 'present'), writes=True),
+    # Alternating status so every run changes the rows and exercises the
+    # rollup, calendar, streak and alert deltas, not just the no-op path
+    Case('Attendance.upsert_attendance[roster]',
+         lambda f, status: f.attendance.upsert_attendance(
+             (sid, f.course_id, f.attendance_date, status, "bench") for sid in f.roster),
+         setup=lambda f: ('present', 'late')[f.serial() % 2], writes=True),
+    Case('AttendanceRollup.rebuild', lambda f, _: f.attendance.rollup.rebuild(), writes=True),
+    Case('Document.add_document',
+         lambda f, _: f.document.add_document(f.student_id, "Other", "bench", "/tmp/bench.pdf", ""),
+         writes=True),
+    Case('Document.delete_document', lambda f, did: f.document.delete_document(did),
+         setup=Fixture.new_document, writes=True),
+    Case('LearningOutcome.add_learning_outcome',
+         lambda f, _: f.outcome.add_learning_outcome(f.student_id, f.course_id, "bench", 'met', date.today()),
+         writes=True),
+    Case('LearningOutcome.update_learning_outcome',
+         lambda f, _: f.outcome.update_learning_outcome(f.outcome_id, 'notes', "bench"), writes=True),
+    Case('LearningOutcome.delete_learning_outcome', lambda f, oid: f.outcome.delete_learning_outcome(oid),
+         setup=Fixture.new_outcome, writes=True),
+]
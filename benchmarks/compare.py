@@ -0,0 +1,76 @@
+"""Compare two benchmark result files written by benchmarks.run.
+
+Usage:
+    python -m benchmarks.compare before.json after.json [--threshold 10]
+
+Cases whose median wall time grew by more than the threshold (percent),
+or that now issue more statements, are flagged; the exit status is 1 when
+any case regressed.
+"""
+import argparse
+import json
+from tabulate import tabulate
+
+def _change(before, after):
+    if not before:
+        return None
+    return (after - before) / before * 100
+
+def compare(before, after, threshold=10.0):
+    """Return (table rows, regression count) for two result dicts"""
+    rows = []
+    regressions = 0
+    names = list(before['cases']) + [name for name in after['cases'] if name not in before['cases']]
+    for name in names:
+        old = before['cases'].get(name)
+        new = after['cases'].get(name)
+        if not old or not new or 'error' in old or 'error' in new:
+            state = "missing" if not old or not new else "error"
+            rows.append([name, "-", "-", "-", "-", "-", state])
+            continue
+
+        change = _change(old['wall_ms'], new['wall_ms'])
+        if (change is not None and change > threshold) or new['queries'] > old['queries']:
+            mark = "⚠ slower"
+            regressions += 1
+        elif change is not None and change < -threshold:
+            mark = "✓ faster"
+        else:
+            mark = ""
+        rows.append([
+            name,
+            f"{old['wall_ms']:.1f} → {new['wall_ms']:.1f}",
+            f"{change:+.1f}%" if change is not None else "-",
+            f"{old['queries']} → {new['queries']}",
+            f"{old['rows']} → {new['rows']}",
+            f"{old['peak_kb']:.0f} → {new['peak_kb']:.0f}",
+            mark
+        ])
+    return rows, regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two LearnTrack benchmark runs")
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help="percent change in median wall time treated as significant")
+    args = parser.parse_args(argv)
+
+    with open(args.before) as handle:
+        before = json.load(handle)
+    with open(args.after) as handle:
+        after = json.load(handle)
+    if before.get('scale') != after.get('scale'):
+        print(f"⚠ Comparing different scales: {before.get('scale')} vs {after.get('scale')}")
+
+    rows, regressions = compare(before, after, args.threshold)
+    headers = ['case', 'wall ms', 'change', 'queries', 'rows', 'peak KiB', '']
+    print(tabulate(rows, headers=headers, tablefmt="grid"))
+    if regressions:
+        print(f"\n⚠ {regressions} case(s) regressed")
+        return 1
+    print("\n✓ No regressions")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
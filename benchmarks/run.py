@@ -0,0 +1,177 @@
+"""Benchmark every public model method against a seeded dataset.
+
+Each scale gets its own database (<database>_bench_<scale>), created,
+migrated and filled by database.seed on first use, so benchmark data never
+touches the working database and later runs reuse it.
+
+For every case the runner records wall time over several repetitions,
+statement count and rows transferred (from database.metrics), and peak
+Python memory from a separate tracemalloc pass, then writes JSON that
+benchmarks.compare can diff against an earlier run.
+
+Usage:
+    python -m benchmarks.run --scale small
+    python -m benchmarks.run --scale large --repeat 5 --output bench/large.json
+    python -m benchmarks.run --scale medium --only Reports --skip-writes
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime
+from config import DB_CONFIG, METRICS_CONFIG
+from database.cache import result_cache
+from database.metrics import registry
+
+# Approximate attendance rows of each database.seed preset
+SCALE_ROWS = {'small': '1k', 'medium': '100k', 'large': '10M', 'production': '29M'}
+
+def prepare(scale, seed):
+    """Point the pool at the scale's database and make sure it is populated"""
+    from database import schema
+    from database.connection import DatabaseConnection
+    from database.seed import generate
+    from models.rollup import AttendanceRollup
+    from models.streaks import StreakEngine
+    from models.alerts import AttendanceAlerts
+    from models.attendance_calendar import AttendanceCalendar
+    from models.gpa import GpaEngine
+
+    if not schema.create_database() or not schema.apply_migrations():
+        return None
+    db = DatabaseConnection()
+    row = db.fetch_one("SELECT COUNT(*) AS total FROM students")
+    if row is None:
+        return None
+    if row['total'] == 0:
+        print(f"\nSeeding {scale} dataset (~{SCALE_ROWS[scale]} attendance rows)...")
+        generate(scale, seed=seed)
+        # The seed loader writes raw rows; bring the derived tables up to date
+        AttendanceRollup(db).rebuild()
+        StreakEngine(db).rebuild()
+        AttendanceAlerts(db).sync(emit=False)
+        AttendanceCalendar(db).rebuild()
+        GpaEngine(db).rebuild()
+    return db
+
+def dataset_sizes(db):
+    sizes = {}
+    for table in ('students', 'courses', 'academic_records', 'attendance',
+                  'learning_outcomes', 'documents'):
+        row = db.fetch_one(f"SELECT COUNT(*) AS total FROM {table}")
+        sizes[table] = row['total'] if row else None
+    return sizes
+
+def measure(case, fixture, repeat, warm_cache=False):
+    """Run one case; returns its result dict"""
+    timings = []
+    totals = None
+    error = None
+    with open(os.devnull, 'w') as sink, redirect_stdout(sink):
+        try:
+            for _ in range(repeat):
+                arg = case.setup(fixture) if case.setup else None
+                if not warm_cache:
+                    result_cache.clear()
+                registry.reset()
+                started = time.perf_counter()
+                case.run(fixture, arg)
+                timings.append(time.perf_counter() - started)
+                totals = registry.totals()
+
+            # Memory is measured on its own pass: tracemalloc slows
+            # allocation-heavy code enough to distort the timings above
+            arg = case.setup(fixture) if case.setup else None
+            if not warm_cache:
+                result_cache.clear()
+            tracemalloc.start()
+            try:
+                case.run(fixture, arg)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+
+    if error:
+        return {'error': error}
+    return {
+        'wall_ms': statistics.median(timings) * 1000,
+        'min_ms': min(timings) * 1000,
+        'max_ms': max(timings) * 1000,
+        'queries': totals['queries'],
+        'rows': totals['rows'],
+        'peak_kb': peak / 1024,
+        'repeat': repeat
+    }
+
+def run(scale, repeat=3, only=None, skip_writes=False, warm_cache=False, seed=42, database=None):
+    base = DB_CONFIG['database']
+    DB_CONFIG['database'] = database or f"{base}_bench_{scale}"
+    METRICS_CONFIG['enabled'] = True
+
+    db = prepare(scale, seed)
+    if db is None:
+        print("❌ Benchmark database is not available")
+        return None
+
+    from benchmarks.cases import CASES, Fixture
+    fixture = Fixture(db)
+    if fixture.student_id is None:
+        print("❌ Benchmark database has no academic records to sample ids from")
+        return None
+
+    results = {
+        'scale': scale,
+        'database': DB_CONFIG['database'],
+        'dataset': dataset_sizes(db),
+        'started': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'warm_cache': warm_cache,
+        'cases': {}
+    }
+    for case in CASES:
+        if skip_writes and case.writes:
+            continue
+        if only and not any(part in case.name for part in only):
+            continue
+        result = measure(case, fixture, repeat, warm_cache)
+        results['cases'][case.name] = result
+        if 'error' in result:
+            print(f"❌ {case.name}: {result['error']}")
+        else:
+            print(f"✓ {case.name}: {result['wall_ms']:.1f} ms, {result['queries']} queries, "
+                  f"{result['rows']} rows, {result['peak_kb']:.0f} KiB peak")
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark LearnTrack model methods")
+    parser.add_argument('--scale', choices=sorted(SCALE_ROWS), default='small')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database', help="benchmark database name (default <database>_bench_<scale>)")
+    parser.add_argument('--only', nargs='+', help="run cases whose name contains any of these")
+    parser.add_argument('--skip-writes', action='store_true', help="leave the dataset unchanged")
+    parser.add_argument('--warm-cache', action='store_true', help="keep the result cache between repetitions")
+    parser.add_argument('--output', help="JSON file to write (default bench_<scale>_<timestamp>.json)")
+    args = parser.parse_args(argv)
+
+    results = run(args.scale, args.repeat, args.only, args.skip_writes, args.warm_cache,
+                  args.seed, args.database)
+    if results is None:
+        return 1
+    output = args.output or f"bench_{args.scale}_{datetime.now():%Y%m%d_%H%M%S}.json"
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output, 'w') as handle:
+        json.dump(results, handle, indent=2, default=str)
+    print(f"\n✓ Results written to {output}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -4,3 +4,80 @@ DB_CONFIG = {
     'password': '',  
     'database': 'learntrack'
 }
+
+
+# Shared connection pool used by every DatabaseConnection in the process.
+# pool_size is capped at 32 by mysql-connector; reset_session clears session
+# state (variables, temporary tables) each time a connection is handed back.
+# A session reset also deallocates prepared statements, so with it enabled
+# the statement cache only lives for a single borrow.
+POOL_CONFIG = {
+    'pool_name': 'learntrack',
+    'pool_size': 5,
+    'reset_session': False,
+    'acquire_timeout': 10,  # seconds to wait for a free connection
+    'statement_cache_size': 32,  # prepared statements kept per connection
+    'async_pool_size': 32  # connections behind each AsyncDatabaseConnection
+}
+
+# Per-statement timing collected by database.metrics. Statements slower than
+# slow_query_ms are logged to the 'learntrack.slow_query' logger (set it to
+# None to disable); percentiles use the last samples_per_query timings.
+METRICS_CONFIG = {
+    'enabled': True,
+    'slow_query_ms': 200,
+    'samples_per_query': 1000
+}
+
+# Read-through cache for fetch_all/fetch_one calls made with cache=True.
+# Entries are dropped when this process writes to a table they read; ttl
+# (seconds) bounds staleness from writes made by other processes.
+CACHE_CONFIG = {
+    'enabled': True,
+    'max_entries': 512,
+    'ttl': 60
+}
+
+# Card-reader check-in ingestion (models/checkin.py). A swipe up to
+# late_after_minutes after the session start counts as present, later as
+# late; session_starts overrides the start time per course_id.
+CHECKIN_CONFIG = {
+    'session_start': '09:00',
+    'session_starts': {},
+    'late_after_minutes': 10,
+    'batch_size': 5000,  # events per upsert
+    'flush_interval': 2.0,  # seconds before a partial batch is written
+    'poll_interval': 0.5,  # seconds between reads when following files
+    'checkpoint_file': 'checkin_checkpoints.json'
+}
+
+# Low-attendance alerting (models/alerts.py). A student enters the at-risk
+# set when their overall present rate drops below threshold percent, once
+# they have at least min_sessions marked, and leaves it when it recovers;
+# each crossing adds one row to the notification outbox.
+ALERT_CONFIG = {
+    'threshold': 75,
+    'min_sessions': 5
+}
+
+# Attendance partitioning and archival (database/partitioning.py).
+# attendance gets one partition per period: a term (starting on each
+# term_starts month-day) or a calendar year, depending on granularity.
+# archive moves every closed period older than the newest hot_periods into
+# the compressed attendance_archive table.
+ARCHIVE_CONFIG = {
+    'granularity': 'term',
+    'term_starts': ['01-01', '08-01'],
+    'hot_periods': 2,
+    'future_partitions': 2  # empty partitions kept ahead of today
+}
+
+# Cohort transcript job (models/transcripts.py). workers defaults to the
+# CPU count; each worker renders chunk_size students at a time, and the
+# cohort is streamed from MySQL fetch_batch_size rows per read.
+TRANSCRIPT_CONFIG = {
+    'output_dir': 'transcripts',
+    'workers': None,
+    'chunk_size': 200,
+    'fetch_batch_size': 5000
+}
\ No newline at end of file
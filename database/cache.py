@@ -0,0 +1,118 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from config import CACHE_CONFIG
+
+_READ_TABLES = re.compile(r"\b(?:FROM|JOIN)\s+`?(\w+)`?", re.I)
+_WRITE_TABLES = re.compile(
+    r"\b(?:INSERT\s+(?:IGNORE\s+)?INTO|REPLACE\s+INTO|UPDATE|DELETE\s+FROM|"
+    r"TRUNCATE\s+(?:TABLE\s+)?|ALTER\s+TABLE|DROP\s+TABLE(?:\s+IF\s+EXISTS)?)\s+`?(\w+)`?",
+    re.I
+)
+
+# Deleting a student or course removes dependent rows through ON DELETE
+# CASCADE, so a write to the parent must also invalidate its children.
+CASCADES = {
+    'students': ('academic_records', 'attendance', 'attendance_rollup', 'attendance_streaks',
+                 'attendance_at_risk', 'attendance_alerts', 'documents', 'learning_outcomes',
+                 'student_term_summary', 'student_gpa'),
+    'courses': ('academic_records', 'attendance', 'attendance_rollup', 'attendance_streaks',
+                'learning_outcomes')
+}
+
+def tables_read(query):
+    return {name.lower() for name in _READ_TABLES.findall(query)}
+
+def tables_written(query):
+    tables = {name.lower() for name in _WRITE_TABLES.findall(query)}
+    for table in list(tables):
+        tables.update(CASCADES.get(table, ()))
+    return tables
+
+def _freeze(params):
+    if params is None:
+        return ()
+    if isinstance(params, dict):
+        return tuple(sorted(params.items()))
+    return tuple(params)
+
+class ResultCache:
+    """Size-bounded LRU of query results with TTL and table-tag invalidation.
+
+    Each entry is tagged with the tables its query reads; a write to any of
+    those tables drops the entry. The TTL bounds staleness from writes made
+    by other processes, which this cache cannot see.
+    """
+    def __init__(self, max_entries=None, ttl=None):
+        self.max_entries = max_entries or CACHE_CONFIG['max_entries']
+        self.ttl = ttl if ttl is not None else CACHE_CONFIG['ttl']
+        self._entries = OrderedDict()
+        self._by_table = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, query, params):
+        """Return (key, hit, value); pass key to put() after a miss.
+
+        key is None when caching is disabled.
+        """
+        if not CACHE_CONFIG['enabled']:
+            return None, False, None
+        key = (query, _freeze(params))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, _, value = entry
+                if expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return key, True, value
+                self._remove(key)
+            self.misses += 1
+        return key, False, None
+
+    def put(self, key, value):
+        tables = tables_read(key[0])
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, tables, value)
+            for table in tables:
+                self._by_table.setdefault(table, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, tables):
+        with self._lock:
+            for table in tables:
+                for key in self._by_table.pop(table, ()):
+                    if key in self._entries:
+                        self._remove(key)
+                        self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_table.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'hit_rate': (self.hits / lookups) if lookups else 0.0
+        }
+
+    def _remove(self, key):
+        _, tables, _ = self._entries.pop(key)
+        for table in tables:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+
+result_cache = ResultCache()
@@ -1,57 +1,542 @@
-import mysql.connector
+import asyncio
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from itertools import islice
 from mysql.connector import Error
-from config import DB_CONFIG
+from mysql.connector.errors import InterfaceError, PoolError
+from mysql.connector.pooling import MySQLConnectionPool
+from mysql.connector.aio.pooling import MySQLConnectionPool as AsyncMySQLConnectionPool
+from config import DB_CONFIG, POOL_CONFIG
+from database.cache import result_cache, tables_written
+from database.metrics import timed
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Return the process-wide connection pool, creating it on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = MySQLConnectionPool(
+                    pool_name=POOL_CONFIG['pool_name'],
+                    pool_size=POOL_CONFIG['pool_size'],
+                    pool_reset_session=POOL_CONFIG['reset_session'],
+                    **DB_CONFIG
+                )
+    return _pool
+
+class _StatementCache:
+    """Prepared-statement cursors of one server session, keyed by SQL text (LRU)"""
+    def __init__(self, connection_id):
+        self.connection_id = connection_id
+        self.cursors = OrderedDict()
+    
+    def get(self, connection, query):
+        """Return (sql, cursor); the cached sql object must be passed to execute()"""
+        entry = self.cursors.get(query)
+        if entry is not None:
+            self.cursors.move_to_end(query)
+            _statement_stats['hits'] += 1
+            return entry
+        
+        _statement_stats['misses'] += 1
+        entry = (query, connection.cursor(prepared=True, dictionary=True))
+        self.cursors[query] = entry
+        if len(self.cursors) > POOL_CONFIG['statement_cache_size']:
+            _, (_, evicted) = self.cursors.popitem(last=False)
+            _statement_stats['evictions'] += 1
+            try:
+                evicted.close()
+            except Error:
+                pass
+        return entry
+    
+    def clear(self):
+        for _, cursor in self.cursors.values():
+            try:
+                cursor.close()
+            except Error:
+                pass
+        self.cursors.clear()
+
+_statement_caches = weakref.WeakKeyDictionary()
+_statement_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+def _statement_cache(connection):
+    """Return the statement cache of the server session behind connection"""
+    raw = getattr(connection, '_cnx', connection)
+    cache = _statement_caches.get(raw)
+    if cache is None or cache.connection_id != raw.connection_id:
+        # New or reconnected session: old statement handles died with it
+        cache = _StatementCache(raw.connection_id)
+        _statement_caches[raw] = cache
+    return cache
+
+def _drop_statement_cache(connection):
+    cache = _statement_caches.pop(getattr(connection, '_cnx', connection), None)
+    if cache is not None:
+        cache.clear()
+
+def statement_cache_stats():
+    """Return prepared-statement cache hits, misses, evictions and hit rate"""
+    stats = dict(_statement_stats)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = (stats['hits'] / lookups) if lookups else 0.0
+    return stats
+
+class QueryResult:
+    """Outcome of a write statement, kept after its cursor has been closed"""
+    def __init__(self, rowcount, lastrowid):
+        self.rowcount = rowcount
+        self.lastrowid = lastrowid
 
 class DatabaseConnection:
+    """Runs queries on connections borrowed from the shared pool.
+
+    Each operation takes a connection from the pool and hands it back when
+    it finishes, so model instances are cheap and hold no server resources.
+    Inside transaction() every statement runs on one pinned connection and
+    nothing is committed until the outermost block exits. Passing
+    prepared=True runs a statement as a server-side prepared statement,
+    cached per connection by SQL text (see statement_cache_stats()).
+    Every statement is timed into database.metrics.registry. Reads made
+    with cache=True are served from database.cache.result_cache until a
+    write through any DatabaseConnection touches one of their tables.
+    """
+
     def __init__(self):
-        self.connection = None
-    
+        self._tx_connection = None
+        self._tx_depth = 0
+        self._tx_failed = False
+        self._tx_tables = set()
+
+    @property
+    def transaction_failed(self):
+        """True once a statement inside the current transaction() block has failed"""
+        return self._tx_failed
+
     def connect(self):
         try:
-            self.connection = mysql.connector.connect(**DB_CONFIG)
-            if self.connection.is_connected():
-                return self.connection
+            return get_pool()
         except Error as e:
             print(f"Error connecting to MySQL: {e}")
             return None
-    
+
     def close(self):
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
+        """Kept for compatibility; connections go back to the pool after each operation"""
+        pass
+
+    def _acquire(self):
+        """Take a connection from the pool, waiting while all of them are in use"""
+        deadline = time.monotonic() + POOL_CONFIG['acquire_timeout']
+        while True:
+            try:
+                return get_pool().get_connection()
+            except PoolError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.05)
+
+    @contextmanager
+    def _borrow(self):
+        """Lend a pooled connection for the duration of one operation"""
+        if self._tx_depth:
+            # Statement failures only mark the transaction; transaction()
+            # decides whether to roll back when the block exits.
+            try:
+                yield self._tx_connection
+            except Error:
+                self._tx_failed = True
+                raise
+            return
+        connection = self._acquire()
+        try:
+            yield connection
+        except Error:
+            # Never hand a half-finished transaction to the next borrower
+            try:
+                connection.rollback()
+            except Error:
+                pass
+            raise
+        finally:
+            if get_pool().reset_session:
+                _drop_statement_cache(connection)
+            connection.close()
     
-    def execute_query(self, query, params=None):
+    @contextmanager
+    def _run(self, connection, query, params, prepared=False, **cursor_args):
+        """Execute query and yield the cursor holding its result.
+
+        With prepared=True the statement is prepared once per connection and
+        its cursor is reused from the statement cache instead of closed.
+        """
+        if prepared:
+            query, cursor = _statement_cache(connection).get(connection, query)
+        else:
+            cursor = connection.cursor(**cursor_args)
         try:
-            cursor = self.connection.cursor()
             if params:
                 cursor.execute(query, params)
             else:
                 cursor.execute(query)
-            self.connection.commit()
-            return cursor
+            yield cursor
+        finally:
+            if not prepared:
+                cursor.close()
+            elif connection.unread_result:
+                cursor.fetchall()
+
+    @contextmanager
+    def transaction(self):
+        """Run the enclosed statements as one unit of work.
+
+        The outermost block commits once on success and rolls back if an
+        exception escapes or any statement inside it failed. Nested blocks
+        become savepoints, so a failure there only undoes the inner block.
+        Usage: with db.transaction(): ...
+        """
+        if self._tx_depth:
+            yield from self._savepoint()
+            return
+        connection = self._acquire()
+        self._tx_connection = connection
+        self._tx_depth = 1
+        self._tx_failed = False
+        self._tx_tables = set()
+        try:
+            connection.start_transaction()
+            yield self
+            if self._tx_failed:
+                print("Transaction rolled back: a statement failed")
+                connection.rollback()
+            else:
+                connection.commit()
+                # Readers may have cached the pre-commit rows meanwhile
+                self._invalidate(self._tx_tables)
+        except BaseException:
+            connection.rollback()
+            raise
+        finally:
+            self._tx_connection = None
+            self._tx_depth = 0
+            self._tx_failed = False
+            self._tx_tables = set()
+            if get_pool().reset_session:
+                _drop_statement_cache(connection)
+            connection.close()
+
+    def _savepoint(self):
+        """Body of a nested transaction() block"""
+        self._tx_depth += 1
+        name = f"sp_{self._tx_depth}"
+        outer_failed = self._tx_failed
+        self._tx_failed = False
+        cursor = self._tx_connection.cursor()
+        try:
+            cursor.execute(f"SAVEPOINT {name}")
+            try:
+                yield self
+            except BaseException:
+                cursor.execute(f"ROLLBACK TO SAVEPOINT {name}")
+                raise
+            if self._tx_failed:
+                cursor.execute(f"ROLLBACK TO SAVEPOINT {name}")
+            else:
+                cursor.execute(f"RELEASE SAVEPOINT {name}")
+        finally:
+            cursor.close()
+            self._tx_failed = outer_failed
+            self._tx_depth -= 1
+
+    def _invalidate(self, tables):
+        if tables:
+            result_cache.invalidate(tables)
+    
+    def _written(self, query):
+        """Drop cached results that depend on the tables query writes.
+
+        Called after the statement, so a read that raced with it and cached
+        the old rows is dropped as well.
+        """
+        tables = tables_written(query)
+        if self._tx_depth:
+            self._tx_tables.update(tables)
+        self._invalidate(tables)
+    
+    def execute_query(self, query, params=None, prepared=False):
+        try:
+            with self._borrow() as connection, timed(query, params) as timing:
+                with self._run(connection, query, params, prepared) as cursor:
+                    if not self._tx_depth:
+                        connection.commit()
+                    timing.rows = cursor.rowcount
+                    return QueryResult(cursor.rowcount, cursor.lastrowid)
         except Error as e:
             print(f"Error executing query: {e}")
             return None
-    
-    def fetch_all(self, query, params=None):
+        finally:
+            self._written(query)
+
+    def execute_many(self, query, seq_of_params, chunk_size=1000):
+        """Run one statement for every parameter tuple, committing once per chunk.
+
+        seq_of_params may be any iterable (including a generator); it is
+        consumed chunk_size items at a time. INSERT ... VALUES statements are
+        sent as a single multi-row INSERT per chunk by the connector. Inside
+        transaction() nothing is committed per chunk; the block commits.
+        Returns the affected row count of each chunk, or None on error.
+        """
+        rows = iter(seq_of_params)
+        counts = []
         try:
-            cursor = self.connection.cursor(dictionary=True)
-            if params:
-                cursor.execute(query, params)
+            with self._borrow() as connection:
+                cursor = connection.cursor()
+                try:
+                    while True:
+                        chunk = list(islice(rows, chunk_size))
+                        if not chunk:
+                            break
+                        with timed(query, chunk[0]) as timing:
+                            cursor.executemany(query, chunk)
+                            if not self._tx_depth:
+                                connection.commit()
+                            timing.rows = cursor.rowcount
+                        counts.append(cursor.rowcount)
+                finally:
+                    cursor.close()
+            return counts
+        except Error as e:
+            if self._tx_depth:
+                # Nothing was committed; the enclosing transaction decides
+                print(f"Error executing batch after {len(counts)} chunk(s) written in the transaction: {e}")
             else:
-                cursor.execute(query)
-            return cursor.fetchall()
+                print(f"Error executing batch after {len(counts)} committed chunk(s): {e}")
+            return None
+        finally:
+            self._written(query)
+
+    def fetch_all(self, query, params=None, prepared=False, cache=False):
+        key = None
+        if cache and not self._tx_depth:
+            key, hit, rows = result_cache.get(query, params)
+            if hit:
+                return [dict(row) for row in rows]
+        try:
+            with self._borrow() as connection, timed(query, params) as timing:
+                with self._run(connection, query, params, prepared,
+                               dictionary=True, buffered=True) as cursor:
+                    rows = cursor.fetchall()
+                    timing.rows = len(rows)
+            if key is not None:
+                result_cache.put(key, [dict(row) for row in rows])
+            return rows
         except Error as e:
             print(f"Error fetching data: {e}")
             return []
-    
-    def fetch_one(self, query, params=None):
+
+    def fetch_iter(self, query, params=None, batch_size=1000):
+        """Stream rows as dictionaries, reading batch_size rows at a time.
+
+        Uses an unbuffered cursor so memory stays constant however large the
+        result set is. The connection is held until the generator is
+        exhausted or closed; if the caller stops early the remaining rows are
+        drained before the cursor is closed and the connection returned.
+        The recorded timing spans the whole iteration, caller work included.
+        """
         try:
-            cursor = self.connection.cursor(dictionary=True)
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            return cursor.fetchone()
+            with self._borrow() as connection, timed(query, params) as timing:
+                cursor = connection.cursor(dictionary=True)
+                try:
+                    if params:
+                        cursor.execute(query, params)
+                    else:
+                        cursor.execute(query)
+                    while True:
+                        rows = cursor.fetchmany(batch_size)
+                        if not rows:
+                            break
+                        timing.rows += len(rows)
+                        yield from rows
+                finally:
+                    if connection.unread_result:
+                        connection.consume_results()
+                    cursor.close()
+        except Error as e:
+            print(f"Error fetching data: {e}")
+
+    def fetch_one(self, query, params=None, prepared=False, cache=False):
+        key = None
+        if cache and not self._tx_depth:
+            key, hit, row = result_cache.get(query, params)
+            if hit:
+                return dict(row) if row else row
+        try:
+            with self._borrow() as connection, timed(query, params) as timing:
+                with self._run(connection, query, params, prepared,
+                               dictionary=True, buffered=True) as cursor:
+                    row = cursor.fetchone()
+                    timing.rows = 1 if row else 0
+            if key is not None:
+                result_cache.put(key, dict(row) if row else row)
+            return row
+        except Error as e:
+            print(f"Error fetching data: {e}")
+            return None
+
+class AsyncDatabaseConnection:
+    """asyncio counterpart of DatabaseConnection built on mysql.connector.aio.
+
+    Owns its own async pool, bound to the event loop it was opened on.
+    Coroutines borrow a connection per operation; when all of them are busy
+    callers queue on a semaphore instead of failing, so one process can keep
+    many queries in flight.
+
+    Usage:
+        async with AsyncDatabaseConnection() as db:
+            rows = await db.fetch_all(query, params)
+    """
+
+    def __init__(self, pool_size=None):
+        self.pool_size = pool_size or POOL_CONFIG['async_pool_size']
+        self.pool = None
+        self._slots = None
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def connect(self):
+        if self.pool is not None:
+            return self.pool
+        try:
+            pool = AsyncMySQLConnectionPool(
+                pool_name=POOL_CONFIG['pool_name'] + '_async',
+                pool_size=self.pool_size,
+                pool_reset_session=POOL_CONFIG['reset_session'],
+                **DB_CONFIG
+            )
+            await pool.initialize_pool()
+        except Error as e:
+            print(f"Error connecting to MySQL: {e}")
+            return None
+        self.pool = pool
+        self._slots = asyncio.Semaphore(self.pool_size)
+        return pool
+
+    async def close(self):
+        if self.pool is not None:
+            await self.pool.close_pool()
+            self.pool = None
+
+    @asynccontextmanager
+    async def _borrow(self):
+        """Lend a pooled connection for the duration of one operation"""
+        if self.pool is None and await self.connect() is None:
+            raise InterfaceError("No connection pool available")
+        async with self._slots:
+            connection = await self.pool.get_connection()
+            try:
+                yield connection
+            except Error:
+                try:
+                    await connection.rollback()
+                except Error:
+                    pass
+                raise
+            finally:
+                await connection.close()
+
+    async def execute(self, query, params=None):
+        try:
+            async with self._borrow() as connection:
+                cursor = await connection.cursor()
+                try:
+                    with timed(query, params) as timing:
+                        if params:
+                            await cursor.execute(query, params)
+                        else:
+                            await cursor.execute(query)
+                        await connection.commit()
+                        timing.rows = cursor.rowcount
+                    return QueryResult(cursor.rowcount, cursor.lastrowid)
+                finally:
+                    await cursor.close()
+        except Error as e:
+            print(f"Error executing query: {e}")
+            return None
+        finally:
+            # Sync cached reads in this process must not outlive async writes
+            result_cache.invalidate(tables_written(query))
+
+    async def execute_many(self, query, seq_of_params, chunk_size=1000):
+        """Async execute_many: one commit per chunk, returns per-chunk row counts"""
+        rows = iter(seq_of_params)
+        counts = []
+        try:
+            async with self._borrow() as connection:
+                cursor = await connection.cursor()
+                try:
+                    while True:
+                        chunk = list(islice(rows, chunk_size))
+                        if not chunk:
+                            break
+                        with timed(query, chunk[0]) as timing:
+                            await cursor.executemany(query, chunk)
+                            await connection.commit()
+                            timing.rows = cursor.rowcount
+                        counts.append(cursor.rowcount)
+                finally:
+                    await cursor.close()
+            return counts
+        except Error as e:
+            print(f"Error executing batch after {len(counts)} committed chunk(s): {e}")
+            return None
+        finally:
+            result_cache.invalidate(tables_written(query))
+
+    async def fetch_all(self, query, params=None):
+        try:
+            async with self._borrow() as connection:
+                cursor = await connection.cursor(dictionary=True, buffered=True)
+                try:
+                    with timed(query, params) as timing:
+                        if params:
+                            await cursor.execute(query, params)
+                        else:
+                            await cursor.execute(query)
+                        rows = await cursor.fetchall()
+                        timing.rows = len(rows)
+                    return rows
+                finally:
+                    await cursor.close()
+        except Error as e:
+            print(f"Error fetching data: {e}")
+            return []
+
+    async def fetch_one(self, query, params=None):
+        try:
+            async with self._borrow() as connection:
+                cursor = await connection.cursor(dictionary=True, buffered=True)
+                try:
+                    with timed(query, params) as timing:
+                        if params:
+                            await cursor.execute(query, params)
+                        else:
+                            await cursor.execute(query)
+                        row = await cursor.fetchone()
+                        timing.rows = 1 if row else 0
+                    return row
+                finally:
+                    await cursor.close()
         except Error as e:
             print(f"Error fetching data: {e}")
             return None
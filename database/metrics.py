@@ -0,0 +1,150 @@
+import logging
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from tabulate import tabulate
+from config import METRICS_CONFIG
+
+logger = logging.getLogger("learntrack.slow_query")
+
+_COMMENT = re.compile(r"/\*.*?\*/|--[^\n]*", re.S)
+_STRING = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\?")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ROW_LIST = re.compile(r"\(\s*\(\?\+\)(?:\s*,\s*\(\?\+\))*\s*\)")
+_SPACE = re.compile(r"\s+")
+
+def fingerprint(query):
+    """Normalise SQL so statements differing only in literals group together.
+
+    Comments are dropped, literals and placeholders become ?, IN-lists
+    collapse to (?+), lists of row tuples to ((?+)+) and whitespace is
+    squeezed to single spaces.
+    """
+    text = _COMMENT.sub(" ", query)
+    text = _STRING.sub("?", text)
+    text = _PLACEHOLDER.sub("?", text)
+    text = _NUMBER.sub("?", text)
+    text = _LIST.sub("(?+)", text)
+    text = _ROW_LIST.sub("((?+)+)", text)
+    return _SPACE.sub(" ", text).strip()
+
+def params_shape(params):
+    """Describe parameters by type only, so values never reach the log"""
+    if params is None:
+        return "()"
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in params.items()) + "}"
+    return "(" + ", ".join(type(v).__name__ for v in params) + ")"
+
+def _percentile(ordered, pct):
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+class _FingerprintStats:
+    def __init__(self, samples):
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total = 0.0
+        self.durations = deque(maxlen=samples)
+
+class QueryMetrics:
+    """In-process registry of statement timings, grouped by fingerprint.
+
+    Percentiles are computed over the most recent samples_per_query
+    timings of each fingerprint; call counts and totals cover all calls.
+    """
+    def __init__(self, samples_per_query=None):
+        self.samples_per_query = samples_per_query or METRICS_CONFIG['samples_per_query']
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, query, params, elapsed, rows=0, failed=False):
+        key = fingerprint(query)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = _FingerprintStats(self.samples_per_query)
+            stats.calls += 1
+            stats.rows += rows or 0
+            stats.total += elapsed
+            stats.durations.append(elapsed)
+            if failed:
+                stats.errors += 1
+
+        threshold = METRICS_CONFIG['slow_query_ms']
+        if threshold is not None and elapsed * 1000 >= threshold:
+            logger.warning("slow query %.1f ms rows=%s params=%s: %s",
+                           elapsed * 1000, rows, params_shape(params), key)
+
+    def summary(self):
+        """Return per-fingerprint stats (times in ms), slowest total first"""
+        with self._lock:
+            items = [(key, stats, sorted(stats.durations)) for key, stats in self._stats.items()]
+        result = []
+        for key, stats, ordered in items:
+            result.append({
+                'fingerprint': key,
+                'calls': stats.calls,
+                'errors': stats.errors,
+                'rows': stats.rows,
+                'total_ms': stats.total * 1000,
+                'p50_ms': _percentile(ordered, 50) * 1000,
+                'p95_ms': _percentile(ordered, 95) * 1000,
+                'p99_ms': _percentile(ordered, 99) * 1000
+            })
+        result.sort(key=lambda row: row['total_ms'], reverse=True)
+        return result
+
+    def totals(self):
+        """Return overall statement count and rows transferred"""
+        with self._lock:
+            return {
+                'queries': sum(s.calls for s in self._stats.values()),
+                'rows': sum(s.rows for s in self._stats.values())
+            }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def print_summary(self, limit=20):
+        rows = self.summary()[:limit]
+        if not rows:
+            print("No queries recorded")
+            return
+        table = [[r['fingerprint'][:60], r['calls'], r['rows'], f"{r['total_ms']:.1f}",
+                  f"{r['p50_ms']:.2f}", f"{r['p95_ms']:.2f}", f"{r['p99_ms']:.2f}"] for r in rows]
+        headers = ['query', 'calls', 'rows', 'total ms', 'p50', 'p95', 'p99']
+        print(tabulate(table, headers=headers, tablefmt="grid"))
+
+class _Timing:
+    def __init__(self):
+        self.rows = 0
+
+registry = QueryMetrics()
+
+@contextmanager
+def timed(query, params=None):
+    """Time the enclosed statement and record it; set .rows on the yielded object"""
+    if not METRICS_CONFIG['enabled']:
+        yield _Timing()
+        return
+    timing = _Timing()
+    started = time.perf_counter()
+    failed = False
+    try:
+        yield timing
+    except Exception:
+        # Only real errors count; a generator closed early by its caller
+        # (fetch_iter) exits here with GeneratorExit and is not a failure
+        failed = True
+        raise
+    finally:
+        registry.record(query, params, time.perf_counter() - started, timing.rows, failed)
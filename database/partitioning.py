@@ -0,0 +1,276 @@
+"""Range partitioning of attendance by attendance_date, and cold archival.
+
+enable converts attendance into one RANGE COLUMNS partition per term or
+year (ARCHIVE_CONFIG['granularity']) plus a catch-all pmax. MySQL cannot
+partition a table that has foreign keys, so enable drops attendance's;
+student and course deletes remove attendance rows explicitly instead of
+relying on the cascade. Queries bounded by attendance_date then read only
+the partitions in range.
+
+archive moves every closed period older than the newest hot periods out
+of attendance: the partition is swapped into a staging table with
+EXCHANGE PARTITION (a metadata change, no row copy under lock), copied
+into the compressed attendance_archive table and dropped. The derived
+tables are left alone, so summaries, streaks, alerts and calendar reports
+keep covering archived terms; their rebuilds read attendance_history, a
+view over both tables. Writes dated before the archived range are refused
+by Attendance.upsert_attendance.
+
+Usage:
+    python -m database.partitioning status
+    python -m database.partitioning enable
+    python -m database.partitioning extend     add partitions ahead of today
+    python -m database.partitioning archive [--keep N]
+"""
+import argparse
+from datetime import date, timedelta
+from tabulate import tabulate
+from config import ARCHIVE_CONFIG
+from database.connection import DatabaseConnection
+
+STAGE_TABLE = "attendance_archive_stage"
+
+PARTITIONS_QUERY = """
+SELECT partition_name AS name, partition_description AS bound, table_rows AS row_estimate
+FROM information_schema.partitions
+WHERE table_schema = DATABASE() AND table_name = 'attendance' AND partition_name IS NOT NULL
+ORDER BY partition_ordinal_position
+"""
+
+FOREIGN_KEYS_QUERY = """
+SELECT constraint_name FROM information_schema.referential_constraints
+WHERE constraint_schema = DATABASE() AND table_name = 'attendance'
+"""
+
+STAGE_QUERY = """
+SELECT table_comment FROM information_schema.tables
+WHERE table_schema = DATABASE() AND table_name = %s
+"""
+
+ARCHIVE_COLUMNS = "attendance_id, student_id, course_id, attendance_date, status, remarks, created_at"
+
+ARCHIVE_RECORD_QUERY = """
+INSERT INTO attendance_archives (partition_name, archived_before, first_date, last_date, row_count)
+VALUES (%s, %s, %s, %s, %s) AS new
+ON DUPLICATE KEY UPDATE
+    first_date = LEAST(COALESCE(first_date, new.first_date), new.first_date),
+    last_date = GREATEST(COALESCE(last_date, new.last_date), new.last_date),
+    row_count = row_count + new.row_count
+"""
+
+ARCHIVES_QUERY = """
+SELECT partition_name, first_date, last_date, row_count, archived_at
+FROM attendance_archives
+ORDER BY archived_before
+"""
+
+def period(day, granularity=None):
+    """(partition name, first day, first day of the next period) for the period containing day"""
+    granularity = granularity or ARCHIVE_CONFIG['granularity']
+    if granularity == 'year':
+        return f"p{day.year}", date(day.year, 1, 1), date(day.year + 1, 1, 1)
+    term_starts = sorted(ARCHIVE_CONFIG['term_starts'])
+    starts = [date(year, *map(int, month_day.split('-')))
+              for year in (day.year - 1, day.year, day.year + 1) for month_day in term_starts]
+    for index in range(len(starts) - 1):
+        if starts[index] <= day < starts[index + 1]:
+            start = starts[index]
+            return f"p{start.year}_{index % len(term_starts) + 1}", start, starts[index + 1]
+    raise ValueError(f"No term contains {day}")
+
+def _partition_clause(name, end):
+    return f"PARTITION {name} VALUES LESS THAN ('{end.isoformat()}')"
+
+class AttendancePartitions:
+    def __init__(self, db=None):
+        self.db = db or DatabaseConnection()
+
+    def partitions(self):
+        """attendance partitions in order; end is None for the MAXVALUE partition"""
+        partitions = []
+        for row in self.db.fetch_all(PARTITIONS_QUERY):
+            bound = row['bound'].strip("'")
+            end = None if bound == 'MAXVALUE' else date.fromisoformat(bound)
+            partitions.append({'name': row['name'], 'end': end, 'rows': row['row_estimate']})
+        return partitions
+
+    def _periods_until(self, start, end):
+        """Periods from the one containing start through the one containing end"""
+        periods = []
+        day = start
+        while day <= end:
+            periods.append(period(day))
+            day = periods[-1][2]
+        return periods
+
+    def _horizon(self):
+        """Last day that must have its own partition: future_partitions periods past today"""
+        day = period(date.today())[2]
+        for _ in range(ARCHIVE_CONFIG['future_partitions']):
+            day = period(day)[2]
+        return day - timedelta(days=1)
+
+    def enable(self):
+        """Partition attendance by period; returns False on error"""
+        if self.partitions():
+            print("✓ attendance is already partitioned")
+            return True
+        bounds = self.db.fetch_one("SELECT MIN(attendance_date) AS first FROM attendance")
+        if bounds is None:
+            return False
+        first = bounds['first'] or date.today()
+        periods = self._periods_until(first, self._horizon())
+
+        foreign_keys = [row['constraint_name'] for row in self.db.fetch_all(FOREIGN_KEYS_QUERY)]
+        if foreign_keys:
+            drops = ", ".join(f"DROP FOREIGN KEY {name}" for name in foreign_keys)
+            if self.db.execute_query(f"ALTER TABLE attendance {drops}") is None:
+                return False
+        # Every unique key of a partitioned table must contain attendance_date
+        if self.db.execute_query("ALTER TABLE attendance DROP PRIMARY KEY, "
+                                 "ADD PRIMARY KEY (attendance_id, attendance_date)") is None:
+            return False
+
+        clauses = [_partition_clause(name, end) for name, _, end in periods]
+        clauses.append("PARTITION pmax VALUES LESS THAN (MAXVALUE)")
+        print(f"\nPartitioning attendance into {len(periods)} period(s) from {periods[0][1]}...")
+        ok = self.db.execute_query("ALTER TABLE attendance PARTITION BY RANGE COLUMNS(attendance_date) (\n    "
+                                   + ",\n    ".join(clauses) + "\n)") is not None
+        if ok:
+            print(f"✓ attendance partitioned ({', '.join(name for name, _, _ in periods)}, pmax)")
+        return ok
+
+    def extend(self):
+        """Split pmax so every period up to the horizon has its own partition"""
+        partitions = self.partitions()
+        if not partitions:
+            print("attendance is not partitioned; run enable first")
+            return False
+        bounded = [p for p in partitions if p['end'] is not None]
+        start = bounded[-1]['end'] if bounded else date.today()
+        periods = self._periods_until(start, self._horizon())
+        if not periods:
+            print("✓ Partitions already cover the next periods")
+            return True
+
+        clauses = [_partition_clause(name, end) for name, _, end in periods]
+        clauses.append("PARTITION pmax VALUES LESS THAN (MAXVALUE)")
+        ok = self.db.execute_query("ALTER TABLE attendance REORGANIZE PARTITION pmax INTO (\n    "
+                                   + ",\n    ".join(clauses) + "\n)") is not None
+        if ok:
+            print(f"✓ Added partitions {', '.join(name for name, _, _ in periods)}")
+        return ok
+
+    # ============ ARCHIVAL ============
+
+    def _drain_stage(self, required=False):
+        """Copy a swapped-out partition from the staging table into attendance_archive.
+
+        Also finishes the job after an interrupted archive run: the staging
+        comment names the partition, and INSERT IGNORE skips rows a previous
+        attempt already copied. A stage left empty by a run that stopped
+        before the exchange is dropped; its partition is still in attendance
+        and gets archived again from the start.
+        """
+        row = self.db.fetch_one(STAGE_QUERY, (STAGE_TABLE,))
+        if row is None:
+            if required:
+                # Never drop a partition whose rows were not copied
+                print(f"❌ {STAGE_TABLE} not found after the exchange")
+            return not required
+        label = (row['table_comment'] or '').split()
+        stats = self.db.fetch_one(f"SELECT COUNT(*) AS row_count, MIN(attendance_date) AS first, "
+                                  f"MAX(attendance_date) AS last FROM {STAGE_TABLE}")
+        if stats is None:
+            return False
+        if len(label) != 2 or (not required and not stats['row_count']):
+            if stats['row_count']:
+                print(f"❌ {STAGE_TABLE} holds {stats['row_count']:,} rows but no partition label; "
+                      f"move them to attendance_archive by hand")
+                return False
+            if required:
+                print(f"❌ {STAGE_TABLE} lost its partition label")
+                return False
+            print(f"  Dropping {STAGE_TABLE} left empty by an interrupted archive run")
+            return self.db.execute_query(f"DROP TABLE {STAGE_TABLE}") is not None
+        name, archived_before = label
+
+        with self.db.transaction():
+            result = self.db.execute_query(f"INSERT IGNORE INTO attendance_archive ({ARCHIVE_COLUMNS}) "
+                                           f"SELECT {ARCHIVE_COLUMNS} FROM {STAGE_TABLE}")
+            if result is not None:
+                self.db.execute_query(ARCHIVE_RECORD_QUERY, (name, archived_before, stats['first'],
+                                                             stats['last'], result.rowcount))
+            failed = self.db.transaction_failed
+        if failed:
+            return False
+        print(f"  ✓ {name}: {result.rowcount:,} rows moved to attendance_archive")
+        return self.db.execute_query(f"DROP TABLE {STAGE_TABLE}") is not None
+
+    def _archive_partition(self, name, end):
+        steps = [
+            f"CREATE TABLE {STAGE_TABLE} LIKE attendance",
+            f"ALTER TABLE {STAGE_TABLE} REMOVE PARTITIONING",
+            f"ALTER TABLE {STAGE_TABLE} COMMENT = '{name} {end.isoformat()}'",
+            f"ALTER TABLE attendance EXCHANGE PARTITION {name} WITH TABLE {STAGE_TABLE}",
+        ]
+        for step in steps:
+            if self.db.execute_query(step) is None:
+                return False
+        if not self._drain_stage(required=True):
+            return False
+        return self.db.execute_query(f"ALTER TABLE attendance DROP PARTITION {name}") is not None
+
+    def archive(self, keep=None):
+        """Move closed periods older than the newest keep periods to attendance_archive"""
+        keep = max(1, keep or ARCHIVE_CONFIG['hot_periods'])
+        partitions = self.partitions()
+        if not partitions:
+            print("attendance is not partitioned; run enable first")
+            return False
+        if not self._drain_stage():
+            return False
+
+        cutoff = period(date.today())[1]
+        for _ in range(keep - 1):
+            cutoff = period(cutoff - timedelta(days=1))[1]
+        cold = [p for p in partitions if p['end'] is not None and p['end'] <= cutoff]
+        if not cold:
+            print(f"✓ Nothing to archive before {cutoff}")
+            return True
+
+        print(f"\nArchiving {len(cold)} partition(s) before {cutoff}...")
+        for partition in cold:
+            if not self._archive_partition(partition['name'], partition['end']):
+                print(f"❌ Archive stopped at partition {partition['name']}")
+                return False
+        print(f"✓ attendance now holds sessions from {cutoff} on")
+        return True
+
+    def status(self):
+        partitions = self.partitions()
+        if partitions:
+            print("\n=== attendance partitions ===")
+            rows = [[p['name'], p['end'] or "MAXVALUE", p['rows']] for p in partitions]
+            print(tabulate(rows, headers=['Partition', 'Before', 'Rows (est.)'], tablefmt="grid"))
+        else:
+            print("attendance is not partitioned")
+
+        archives = self.db.fetch_all(ARCHIVES_QUERY)
+        if archives:
+            print("\n=== Archived periods (attendance_archive) ===")
+            rows = [list(archive.values()) for archive in archives]
+            print(tabulate(rows, headers=archives[0].keys(), tablefmt="grid"))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Partition and archive attendance")
+    parser.add_argument('command', choices=['status', 'enable', 'extend', 'archive'])
+    parser.add_argument('--keep', type=int, help="hot periods left in attendance (default from ARCHIVE_CONFIG)")
+    args = parser.parse_args()
+    partitions = AttendancePartitions()
+    if args.command == 'status':
+        partitions.status()
+    elif args.command == 'archive':
+        raise SystemExit(0 if partitions.archive(args.keep) else 1)
+    else:
+        raise SystemExit(0 if getattr(partitions, args.command)() else 1)
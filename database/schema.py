@@ -1,78 +1,542 @@
-# CREATE DATABASE IF NOT EXISTS learntrack;
-# USE learntrack;
-
-# -- Students Table
-# CREATE TABLE students (
-#     student_id INT PRIMARY KEY AUTO_INCREMENT,
-#     first_name VARCHAR(50) NOT NULL,
-#     last_name VARCHAR(50) NOT NULL,
-#     email VARCHAR(100) UNIQUE NOT NULL,
-#     phone VARCHAR(15),
-#     date_of_birth DATE,
-#     enrollment_date DATE DEFAULT (CURRENT_DATE),
-#     status ENUM('active', 'inactive', 'graduated') DEFAULT 'active',
-#     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-# );
-
-# -- Courses Table
-# CREATE TABLE courses (
-#     course_id INT PRIMARY KEY AUTO_INCREMENT,
-#     course_code VARCHAR(20) UNIQUE NOT NULL,
-#     course_name VARCHAR(100) NOT NULL,
-#     credits INT DEFAULT 3,
-#     description TEXT
-# );
-
-# -- Academic Records Table
-# CREATE TABLE academic_records (
-#     record_id INT PRIMARY KEY AUTO_INCREMENT,
-#     student_id INT NOT NULL,
-#     course_id INT NOT NULL,
-#     semester VARCHAR(20),
-#     grade VARCHAR(5),
-#     score DECIMAL(5,2),
-#     year INT,
-#     remarks TEXT,
-#     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-#     FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE,
-#     FOREIGN KEY (course_id) REFERENCES courses(course_id) ON DELETE CASCADE
-# );
-
-# -- Attendance Table
-# CREATE TABLE attendance (
-#     attendance_id INT PRIMARY KEY AUTO_INCREMENT,
-#     student_id INT NOT NULL,
-#     course_id INT NOT NULL,
-#     attendance_date DATE NOT NULL,
-#     status ENUM('present', 'absent', 'late', 'excused') NOT NULL,
-#     remarks TEXT,
-#     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-#     FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE,
-#     FOREIGN KEY (course_id) REFERENCES courses(course_id) ON DELETE CASCADE
-# );
-
-# -- Documents Table
-# CREATE TABLE documents (
-#     document_id INT PRIMARY KEY AUTO_INCREMENT,
-#     student_id INT NOT NULL,
-#     document_type VARCHAR(50) NOT NULL,
-#     document_name VARCHAR(200) NOT NULL,
-#     file_path VARCHAR(500),
-#     upload_date DATE DEFAULT (CURRENT_DATE),
-#     description TEXT,
-#     FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE
-# );
-
-# -- Learning Outcomes Table
-# CREATE TABLE learning_outcomes (
-#     outcome_id INT PRIMARY KEY AUTO_INCREMENT,
-#     student_id INT NOT NULL,
-#     course_id INT NOT NULL,
-#     outcome_description TEXT NOT NULL,
-#     achievement_level ENUM('not_met', 'partially_met', 'met', 'exceeded') NOT NULL,
-#     assessment_date DATE,
-#     notes TEXT,
-#     FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE,
-#     FOREIGN KEY (course_id) REFERENCES courses(course_id) ON DELETE CASCADE
-# );
+"""LearnTrack schema as versioned migrations.
 
+Each migration is a list of idempotent steps. A step first checks
+information_schema and is skipped when its table or index already exists,
+so running the migrations against a database created from older DDL only
+adds the missing pieces. Applied versions are recorded in schema_migrations.
+
+Usage:
+    python -m database.schema            create / upgrade the database
+    python -m database.schema --status   show applied and pending migrations
+"""
+import sys
+import mysql.connector
+from mysql.connector import Error
+from config import DB_CONFIG
+from database.connection import DatabaseConnection
+
+class CreateTable:
+    def __init__(self, name, ddl):
+        self.name = name
+        self.ddl = ddl
+
+    def describe(self):
+        return f"table {self.name}"
+
+    def is_applied(self, db):
+        query = """
+        SELECT COUNT(*) AS found FROM information_schema.tables
+        WHERE table_schema = DATABASE() AND table_name = %s
+        """
+        row = db.fetch_one(query, (self.name,))
+        return bool(row and row['found'])
+
+    def apply(self, db):
+        return db.execute_query(self.ddl) is not None
+
+class CreateIndex:
+    def __init__(self, table, name, columns, unique=False):
+        self.table = table
+        self.name = name
+        self.columns = columns
+        self.unique = unique
+
+    def describe(self):
+        kind = "unique index" if self.unique else "index"
+        return f"{kind} {self.table}.{self.name} ({', '.join(self.columns)})"
+
+    def is_applied(self, db):
+        query = """
+        SELECT COUNT(*) AS found FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        """
+        row = db.fetch_one(query, (self.table, self.name))
+        return bool(row and row['found'])
+
+    def apply(self, db):
+        unique = "UNIQUE " if self.unique else ""
+        ddl = f"CREATE {unique}INDEX {self.name} ON {self.table} ({', '.join(self.columns)})"
+        return db.execute_query(ddl) is not None
+
+class DropIndex(CreateIndex):
+    def __init__(self, table, name):
+        super().__init__(table, name, [])
+
+    def describe(self):
+        return f"drop index {self.table}.{self.name}"
+
+    def is_applied(self, db):
+        return not super().is_applied(db)
+
+    def apply(self, db):
+        return db.execute_query(f"DROP INDEX {self.name} ON {self.table}") is not None
+
+class RunSQL:
+    """A data fix; check is a query returning a 'pending' column, truthy while the fix is still needed"""
+    def __init__(self, description, sql, check):
+        self.description = description
+        self.sql = sql
+        self.check = check
+
+    def describe(self):
+        return self.description
+
+    def is_applied(self, db):
+        row = db.fetch_one(self.check)
+        return bool(row) and not row['pending']
+
+    def apply(self, db):
+        return db.execute_query(self.sql) is not None
+
+class RunPython(RunSQL):
+    """A data fix done in Python; function(db) returns True on success"""
+    def __init__(self, description, function, check):
+        super().__init__(description, None, check)
+        self.function = function
+
+    def apply(self, db):
+        return bool(self.function(db))
+
+# ============ BASE TABLES ============
+
+STUDENTS = """
+CREATE TABLE students (
+    student_id INT PRIMARY KEY AUTO_INCREMENT,
+    first_name VARCHAR(50) NOT NULL,
+    last_name VARCHAR(50) NOT NULL,
+    email VARCHAR(100) UNIQUE NOT NULL,
+    phone VARCHAR(15),
+    date_of_birth DATE,
+    enrollment_date DATE DEFAULT (CURRENT_DATE),
+    status ENUM('active', 'inactive', 'graduated') DEFAULT 'active',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+COURSES = """
+CREATE TABLE courses (
+    course_id INT PRIMARY KEY AUTO_INCREMENT,
+    course_code VARCHAR(20) UNIQUE NOT NULL,
+    course_name VARCHAR(100) NOT NULL,
+    credits INT DEFAULT 3,
+    description TEXT
+)
+"""
+
+ACADEMIC_RECORDS = """
+CREATE TABLE academic_records (
+    record_id INT PRIMARY KEY AUTO_INCREMENT,
+    student_id INT NOT NULL,
+    course_id INT NOT NULL,
+    semester VARCHAR(20),
+    grade VARCHAR(5),
+    score DECIMAL(5,2),
+    year INT,
+    remarks TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE,
+    FOREIGN KEY (course_id) REFERENCES courses(course_id) ON DELETE CASCADE
+)
+"""
+
+ATTENDANCE = """
+CREATE TABLE attendance (
+    attendance_id INT PRIMARY KEY AUTO_INCREMENT,
+    student_id INT NOT NULL,
+    course_id INT NOT NULL,
+    attendance_date DATE NOT NULL,
+    status ENUM('present', 'absent', 'late', 'excused') NOT NULL,
+    remarks TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE,
+    FOREIGN KEY (course_id) REFERENCES courses(course_id) ON DELETE CASCADE
+)
+"""
+
+DOCUMENTS = """
+CREATE TABLE documents (
+    document_id INT PRIMARY KEY AUTO_INCREMENT,
+    student_id INT NOT NULL,
+    document_type VARCHAR(50) NOT NULL,
+    document_name VARCHAR(200) NOT NULL,
+    file_path VARCHAR(500),
+    upload_date DATE DEFAULT (CURRENT_DATE),
+    description TEXT,
+    FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE
+)
+"""
+
+LEARNING_OUTCOMES = """
+CREATE TABLE learning_outcomes (
+    outcome_id INT PRIMARY KEY AUTO_INCREMENT,
+    student_id INT NOT NULL,
+    course_id INT NOT NULL,
+    outcome_description TEXT NOT NULL,
+    achievement_level ENUM('not_met', 'partially_met', 'met', 'exceeded') NOT NULL,
+    assessment_date DATE,
+    notes TEXT,
+    FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE,
+    FOREIGN KEY (course_id) REFERENCES courses(course_id) ON DELETE CASCADE
+)
+"""
+
+# ============ DERIVED TABLES ============
+
+ATTENDANCE_ROLLUP = """
+CREATE TABLE attendance_rollup (
+    student_id INT NOT NULL,
+    course_id INT NOT NULL,
+    total INT NOT NULL DEFAULT 0,
+    present INT NOT NULL DEFAULT 0,
+    absent INT NOT NULL DEFAULT 0,
+    late INT NOT NULL DEFAULT 0,
+    excused INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (student_id, course_id),
+    FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE,
+    FOREIGN KEY (course_id) REFERENCES courses(course_id) ON DELETE CASCADE
+)
+"""
+
+ATTENDANCE_STREAKS = """
+CREATE TABLE attendance_streaks (
+    student_id INT NOT NULL,
+    course_id INT NOT NULL,
+    current_absent INT NOT NULL DEFAULT 0,
+    max_absent INT NOT NULL DEFAULT 0,
+    current_late INT NOT NULL DEFAULT 0,
+    max_late INT NOT NULL DEFAULT 0,
+    last_date DATE,
+    PRIMARY KEY (student_id, course_id),
+    INDEX idx_streaks_current_absent (current_absent),
+    FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE,
+    FOREIGN KEY (course_id) REFERENCES courses(course_id) ON DELETE CASCADE
+)
+"""
+
+ATTENDANCE_AT_RISK = """
+CREATE TABLE attendance_at_risk (
+    student_id INT PRIMARY KEY,
+    percentage DECIMAL(5,2) NOT NULL,
+    total INT NOT NULL,
+    present INT NOT NULL,
+    since TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE
+)
+"""
+
+ATTENDANCE_ALERTS = """
+CREATE TABLE attendance_alerts (
+    alert_id INT AUTO_INCREMENT PRIMARY KEY,
+    student_id INT NOT NULL,
+    event ENUM('at_risk', 'recovered') NOT NULL,
+    percentage DECIMAL(5,2),
+    threshold DECIMAL(5,2) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    sent_at TIMESTAMP NULL,
+    INDEX idx_alerts_sent (sent_at, alert_id),
+    FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE
+)
+"""
+
+ATTENDANCE_CALENDAR = """
+CREATE TABLE attendance_calendar (
+    grain ENUM('day', 'week', 'month') NOT NULL,
+    period_start DATE NOT NULL,
+    course_id INT NOT NULL,
+    total INT NOT NULL DEFAULT 0,
+    present INT NOT NULL DEFAULT 0,
+    absent INT NOT NULL DEFAULT 0,
+    late INT NOT NULL DEFAULT 0,
+    excused INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (grain, course_id, period_start)
+)
+"""
+
+STUDENT_TERM_SUMMARY = """
+CREATE TABLE student_term_summary (
+    student_id INT NOT NULL,
+    semester VARCHAR(20) NOT NULL DEFAULT '',
+    year INT NOT NULL DEFAULT 0,
+    courses INT NOT NULL DEFAULT 0,
+    credits INT NOT NULL DEFAULT 0,
+    quality_points DECIMAL(8,2) NOT NULL DEFAULT 0,
+    score_total DECIMAL(10,2) NOT NULL DEFAULT 0,
+    gpa DECIMAL(4,2),
+    PRIMARY KEY (student_id, year, semester),
+    FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE
+)
+"""
+
+STUDENT_GPA = """
+CREATE TABLE student_gpa (
+    student_id INT PRIMARY KEY,
+    terms INT NOT NULL DEFAULT 0,
+    courses INT NOT NULL DEFAULT 0,
+    credits INT NOT NULL DEFAULT 0,
+    quality_points DECIMAL(10,2) NOT NULL DEFAULT 0,
+    score_total DECIMAL(12,2) NOT NULL DEFAULT 0,
+    gpa DECIMAL(4,2),
+    INDEX idx_student_gpa_gpa (gpa),
+    FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE
+)
+"""
+
+# Closed terms moved out of attendance by database/partitioning.py archive;
+# no foreign keys, student and course deletes clear it explicitly
+ATTENDANCE_ARCHIVE = """
+CREATE TABLE attendance_archive (
+    attendance_id INT PRIMARY KEY,
+    student_id INT NOT NULL,
+    course_id INT NOT NULL,
+    attendance_date DATE NOT NULL,
+    status ENUM('present', 'absent', 'late', 'excused') NOT NULL,
+    remarks TEXT,
+    created_at TIMESTAMP NULL,
+    UNIQUE KEY uq_archive_student_course_date (student_id, course_id, attendance_date),
+    INDEX idx_archive_course (course_id)
+) ROW_FORMAT=COMPRESSED KEY_BLOCK_SIZE=8
+"""
+
+ATTENDANCE_ARCHIVES = """
+CREATE TABLE attendance_archives (
+    partition_name VARCHAR(64) PRIMARY KEY,
+    archived_before DATE NOT NULL,
+    first_date DATE,
+    last_date DATE,
+    row_count INT NOT NULL DEFAULT 0,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+# Hot and archived attendance together, for rebuilding derived tables
+ATTENDANCE_HISTORY = """
+CREATE VIEW attendance_history AS
+SELECT attendance_id, student_id, course_id, attendance_date, status, remarks, created_at
+FROM attendance
+UNION ALL
+SELECT attendance_id, student_id, course_id, attendance_date, status, remarks, created_at
+FROM attendance_archive
+"""
+
+def _rebuild_streaks(db):
+    # Streaks need an ordered scan in Python; imported here so the schema
+    # module does not load the models unless this step actually runs
+    from models.streaks import StreakEngine
+    return StreakEngine(db).rebuild()
+
+def _sync_alerts(db):
+    # Existing low attenders are the starting state, not news: no outbox rows
+    from models.alerts import AttendanceAlerts
+    return AttendanceAlerts(db).sync(emit=False)
+
+def _rebuild_gpa(db):
+    from models.gpa import GpaEngine
+    return GpaEngine(db).rebuild()
+
+def _rebuild_calendar(db):
+    from models.attendance_calendar import AttendanceCalendar
+    return AttendanceCalendar(db).rebuild()
+
+# ============ MIGRATIONS ============
+
+MIGRATIONS = [
+    (1, "Base tables", [
+        CreateTable('students', STUDENTS),
+        CreateTable('courses', COURSES),
+        CreateTable('academic_records', ACADEMIC_RECORDS),
+        CreateTable('attendance', ATTENDANCE),
+        CreateTable('documents', DOCUMENTS),
+        CreateTable('learning_outcomes', LEARNING_OUTCOMES),
+    ]),
+    (2, "Indexes for the model query patterns", [
+        # mark_attendance check, attendance counts per student/course,
+        # view_attendance; status makes the count queries index-only
+        CreateIndex('attendance', 'idx_attendance_student_course_date',
+                    ['student_id', 'course_id', 'attendance_date', 'status']),
+        # view_attendance_by_date
+        CreateIndex('attendance', 'idx_attendance_date', ['attendance_date', 'course_id']),
+        # view_course_attendance, course report attendance rate
+        CreateIndex('attendance', 'idx_attendance_course_student',
+                    ['course_id', 'student_id', 'status']),
+        # view_student_grades, view_transcript, GPA per student
+        CreateIndex('academic_records', 'idx_records_student_term',
+                    ['student_id', 'year', 'semester']),
+        # generate_semester_report (covering for its aggregates)
+        CreateIndex('academic_records', 'idx_records_term',
+                    ['semester', 'year', 'course_id', 'score']),
+        # get_course_statistics, generate_course_report
+        CreateIndex('academic_records', 'idx_records_course_score', ['course_id', 'score']),
+        # get_course_achievement_statistics, view_course_outcomes
+        CreateIndex('learning_outcomes', 'idx_outcomes_course_level',
+                    ['course_id', 'achievement_level']),
+        # get_achievement_summary, compare_student_performance
+        CreateIndex('learning_outcomes', 'idx_outcomes_student_course_level',
+                    ['student_id', 'course_id', 'achievement_level']),
+        # view_student_documents
+        CreateIndex('documents', 'idx_documents_student_date', ['student_id', 'upload_date']),
+        # overall statistics and the active-student filters in reports
+        CreateIndex('students', 'idx_students_status', ['status']),
+    ]),
+    (3, "One attendance row per student, course and day", [
+        # Older mark_attendance races could leave duplicates; keep the newest
+        RunSQL("remove duplicate attendance rows", """
+            DELETE older FROM attendance older
+            JOIN attendance newer
+              ON newer.student_id = older.student_id
+             AND newer.course_id = older.course_id
+             AND newer.attendance_date = older.attendance_date
+             AND newer.attendance_id > older.attendance_id
+            """, """
+            SELECT EXISTS (
+                SELECT 1 FROM attendance
+                GROUP BY student_id, course_id, attendance_date
+                HAVING COUNT(*) > 1
+            ) AS pending
+            """),
+        # Target of upsert_attendance's ON DUPLICATE KEY UPDATE
+        CreateIndex('attendance', 'uq_attendance_student_course_date',
+                    ['student_id', 'course_id', 'attendance_date'], unique=True),
+        # Same leading columns as the unique key; one less index per write.
+        # This loses the index-only status counts per student and course.
+        # status cannot join the unique key without breaking the upsert
+        # target, and from migration 4 on those counts read
+        # attendance_rollup. The raw reads left are a single pair's streak
+        # recompute, a short range on the unique key, and batch rebuilds
+        # that read every row anyway.
+        DropIndex('attendance', 'idx_attendance_student_course_date'),
+    ]),
+    (4, "Attendance rollup per student and course", [
+        CreateTable('attendance_rollup', ATTENDANCE_ROLLUP),
+        # Backfill; python -m models.rollup rebuilds it in batches later on
+        RunSQL("populate attendance_rollup", """
+            INSERT INTO attendance_rollup (student_id, course_id, total, present, absent, late, excused)
+            SELECT student_id, course_id, COUNT(*),
+                   SUM(CASE WHEN status = 'present' THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN status = 'absent' THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN status = 'late' THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN status = 'excused' THEN 1 ELSE 0 END)
+            FROM attendance
+            GROUP BY student_id, course_id
+            """, """
+            SELECT EXISTS (SELECT 1 FROM attendance)
+               AND NOT EXISTS (SELECT 1 FROM attendance_rollup) AS pending
+            """),
+    ]),
+    (5, "Absence and late streaks per student and course", [
+        CreateTable('attendance_streaks', ATTENDANCE_STREAKS),
+        RunPython("populate attendance_streaks", _rebuild_streaks, """
+            SELECT EXISTS (SELECT 1 FROM attendance)
+               AND NOT EXISTS (SELECT 1 FROM attendance_streaks) AS pending
+            """),
+    ]),
+    (6, "Low-attendance at-risk set and notification outbox", [
+        CreateTable('attendance_at_risk', ATTENDANCE_AT_RISK),
+        CreateTable('attendance_alerts', ATTENDANCE_ALERTS),
+        RunPython("populate attendance_at_risk", _sync_alerts, """
+            SELECT EXISTS (SELECT 1 FROM attendance_rollup)
+               AND NOT EXISTS (SELECT 1 FROM attendance_at_risk) AS pending
+            """),
+    ]),
+    (7, "Daily, weekly and monthly attendance calendar", [
+        # course_id 0 holds the school-wide totals, so no foreign key
+        CreateTable('attendance_calendar', ATTENDANCE_CALENDAR),
+        RunPython("populate attendance_calendar", _rebuild_calendar, """
+            SELECT EXISTS (SELECT 1 FROM attendance)
+               AND NOT EXISTS (SELECT 1 FROM attendance_calendar) AS pending
+            """),
+    ]),
+    (8, "Attendance archive for closed terms", [
+        CreateTable('attendance_archive', ATTENDANCE_ARCHIVE),
+        CreateTable('attendance_archives', ATTENDANCE_ARCHIVES),
+        # information_schema.tables lists views too
+        CreateTable('attendance_history', ATTENDANCE_HISTORY),
+    ]),
+    (9, "Credit-weighted GPA per term and cumulative", [
+        CreateTable('student_term_summary', STUDENT_TERM_SUMMARY),
+        CreateTable('student_gpa', STUDENT_GPA),
+        RunPython("populate GPA summaries", _rebuild_gpa, """
+            SELECT EXISTS (SELECT 1 FROM academic_records WHERE score IS NOT NULL)
+               AND NOT EXISTS (SELECT 1 FROM student_gpa) AS pending
+            """),
+    ]),
+    (10, "Term lookups on the GPA summaries", [
+        # generate_semester_report
+        CreateIndex('student_term_summary', 'idx_term_summary_term', ['year', 'semester']),
+    ]),
+]
+
+MIGRATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INT PRIMARY KEY,
+    description VARCHAR(200) NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+def create_database():
+    """Create the configured database if it does not exist yet"""
+    config = {key: value for key, value in DB_CONFIG.items() if key != 'database'}
+    try:
+        connection = mysql.connector.connect(**config)
+        try:
+            cursor = connection.cursor()
+            cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{DB_CONFIG['database']}`")
+            cursor.close()
+        finally:
+            connection.close()
+        return True
+    except Error as e:
+        print(f"Error creating database: {e}")
+        return False
+
+def applied_versions(db):
+    db.execute_query(MIGRATIONS_TABLE)
+    return {row['version'] for row in db.fetch_all("SELECT version FROM schema_migrations")}
+
+def apply_migrations(db=None):
+    """Bring the database up to the latest schema version.
+
+    Steps that already exist are skipped, so this is safe to run against
+    a database created by hand from earlier DDL. Stops at the first
+    failing step and returns False.
+    """
+    db = db or DatabaseConnection()
+    applied = applied_versions(db)
+
+    for version, description, steps in MIGRATIONS:
+        if version in applied:
+            continue
+        print(f"\nApplying migration {version}: {description}")
+        for step in steps:
+            if step.is_applied(db):
+                print(f"  - {step.describe()} (already present)")
+                continue
+            if not step.apply(db):
+                print(f"❌ Migration {version} stopped at {step.describe()}")
+                return False
+            print(f"  ✓ {step.describe()}")
+        db.execute_query(
+            "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+            (version, description)
+        )
+
+    print(f"\n✓ Schema is at version {MIGRATIONS[-1][0]}")
+    return True
+
+def schema_status(db=None):
+    """Print applied migrations and the pieces still missing"""
+    db = db or DatabaseConnection()
+    applied = applied_versions(db)
+    for version, description, steps in MIGRATIONS:
+        state = "applied" if version in applied else "pending"
+        print(f"{version:>3}  {state:<8} {description}")
+        if version not in applied:
+            for step in steps:
+                if not step.is_applied(db):
+                    print(f"       missing: {step.describe()}")
+
+if __name__ == "__main__":
+    if "--status" in sys.argv[1:]:
+        schema_status()
+    elif create_database():
+        apply_migrations()
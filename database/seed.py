@@ -0,0 +1,284 @@
+"""Reproducible synthetic LearnTrack data for benchmarks and capacity planning.
+
+Rows are produced by generators and written through
+DatabaseConnection.execute_many, so memory stays flat however many rows
+are generated. Students and courses are written first; the four child
+tables are then written in parallel, one pooled connection each.
+
+Every student's enrollments are derived from (seed, student_id) alone, so
+each child-table writer regenerates exactly the same enrollments without
+sharing state, and the same seed always yields the same database.
+
+Rows go straight into the base tables, bypassing the model write paths, so
+derived tables have to be rebuilt afterwards (python -m models.rollup,
+python -m models.streaks, python -m models.attendance_calendar,
+python -m models.gpa, then python -m models.alerts).
+
+Usage:
+    python -m database.seed --scale medium --seed 42
+    python -m database.seed --students 50000 --courses 2000 --terms 8
+"""
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from database.connection import DatabaseConnection
+
+# Each preset is sized by its attendance row count (students x terms x
+# courses_per_term x sessions_per_course): ~1k, ~100k, ~10M and ~29M.
+SCALES = {
+    'small': {'students': 20, 'courses': 5, 'terms': 1, 'courses_per_term': 3,
+              'sessions_per_course': 15},
+    'medium': {'students': 500, 'courses': 40, 'terms': 2, 'courses_per_term': 4,
+               'sessions_per_course': 25},
+    'large': {'students': 20000, 'courses': 800, 'terms': 4, 'courses_per_term': 5,
+              'sessions_per_course': 25},
+    'production': {'students': 50000, 'courses': 2000, 'terms': 8, 'courses_per_term': 6,
+                   'sessions_per_course': 12},
+}
+
+DEFAULTS = {
+    'seed': 42,
+    'start_year': 2021,
+    # Share of each attendance status for an average student; each student
+    # gets their own present rate drawn around it with attendance_spread.
+    'attendance_rates': {'present': 0.85, 'late': 0.06, 'absent': 0.06, 'excused': 0.03},
+    'attendance_spread': 0.08,
+    'score_mean': 72.0,
+    'score_stddev': 12.0,
+    'outcomes_per_course': 2,
+    'documents_per_student': 2,
+    'chunk_size': 5000,
+    **SCALES['medium']
+}
+
+DOCUMENT_TYPES = ['Transcript', 'Certificate', 'ID Card', 'Medical Record', 'Other']
+ACHIEVEMENT_LEVELS = ['not_met', 'partially_met', 'met', 'exceeded']
+FIRST_NAMES = ['Amina', 'Brian', 'Chloe', 'David', 'Esther', 'Felix', 'Grace', 'Hassan',
+               'Ines', 'James', 'Keza', 'Liam', 'Maya', 'Noah', 'Olivia', 'Paul']
+LAST_NAMES = ['Mugisha', 'Smith', 'Uwase', 'Garcia', 'Habimana', 'Chen', 'Ishimwe', 'Brown',
+              'Niyonsaba', 'Muller', 'Keza', 'Okafor', 'Ndayisaba', 'Rossi', 'Kamau', 'Silva']
+SUBJECTS = ['Mathematics', 'Physics', 'Chemistry', 'Biology', 'History', 'Literature',
+            'Computer Science', 'Economics', 'Geography', 'Philosophy', 'Statistics', 'Art']
+
+def _grade(score):
+    if score >= 90:
+        return 'A'
+    elif score >= 80:
+        return 'B'
+    elif score >= 70:
+        return 'C'
+    elif score >= 60:
+        return 'D'
+    return 'F'
+
+class DataGenerator:
+    """Streams rows for all six tables from one seed and configuration"""
+
+    def __init__(self, **options):
+        self.options = {**DEFAULTS, **options}
+        self.seed = self.options['seed']
+        self.student_offset = 0
+        self.course_offset = 0
+
+    def _rng(self, *parts):
+        # A dedicated stream per (table, entity) keeps tables independent.
+        # String seeds are hashed with SHA-512, so they are stable across
+        # processes, unlike hash() of a tuple.
+        return random.Random(":".join(str(part) for part in (self.seed,) + parts))
+
+    def terms(self):
+        """(semester, year, first day) for each term, two per year"""
+        terms = []
+        year = self.options['start_year']
+        while len(terms) < self.options['terms']:
+            terms.append((f"Spring {year}", year, date(year, 1, 15)))
+            if len(terms) < self.options['terms']:
+                terms.append((f"Fall {year}", year, date(year, 9, 1)))
+            year += 1
+        return terms
+
+    def session_dates(self, term_start, course_id):
+        """Dates a course meets in a term: two fixed weekdays per week"""
+        first_day = course_id % 5
+        days = sorted({first_day, (first_day + 2) % 5})
+        monday = term_start - timedelta(days=term_start.weekday())
+        dates = []
+        week = 0
+        while len(dates) < self.options['sessions_per_course']:
+            for day in days:
+                session = monday + timedelta(weeks=week, days=day)
+                if session >= term_start and len(dates) < self.options['sessions_per_course']:
+                    dates.append(session)
+            week += 1
+        return dates
+
+    def enrollments(self, student_id):
+        """Yield (course_id, semester, year, term_start) for one student"""
+        rng = self._rng('enrollments', student_id)
+        courses = self.options['courses']
+        per_term = min(self.options['courses_per_term'], courses)
+        for semester, year, term_start in self.terms():
+            for index in rng.sample(range(courses), per_term):
+                yield self.course_offset + index + 1, semester, year, term_start
+
+    def student_ids(self):
+        return range(self.student_offset + 1, self.student_offset + self.options['students'] + 1)
+
+    # ============ ROW GENERATORS ============
+
+    def students(self):
+        for student_id in self.student_ids():
+            rng = self._rng('students', student_id)
+            birth = date(2000, 1, 1) + timedelta(days=rng.randrange(3650))
+            status = rng.choices(['active', 'inactive', 'graduated'], [0.85, 0.05, 0.10])[0]
+            yield (student_id, rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES),
+                   f"student{student_id}@learntrack.example",
+                   f"+2507{rng.randrange(10**8):08d}", birth, status)
+
+    def courses(self):
+        for index in range(self.options['courses']):
+            course_id = self.course_offset + index + 1
+            rng = self._rng('courses', course_id)
+            subject = SUBJECTS[index % len(SUBJECTS)]
+            yield (course_id, f"C{course_id:05d}", f"{subject} {index // len(SUBJECTS) + 1}",
+                   rng.choice([2, 3, 3, 4]), f"Synthetic {subject.lower()} course")
+
+    def academic_records(self):
+        mean, stddev = self.options['score_mean'], self.options['score_stddev']
+        for student_id in self.student_ids():
+            rng = self._rng('academic_records', student_id)
+            ability = rng.gauss(0, stddev / 2)
+            for course_id, semester, year, _ in self.enrollments(student_id):
+                score = round(min(100.0, max(0.0, rng.gauss(mean + ability, stddev / 2))), 2)
+                yield (student_id, course_id, semester, _grade(score), score, year, '')
+
+    def attendance(self):
+        rates = self.options['attendance_rates']
+        others = [s for s in rates if s != 'present']
+        other_total = sum(rates[s] for s in others) or 1
+        for student_id in self.student_ids():
+            rng = self._rng('attendance', student_id)
+            present = min(0.99, max(0.05, rng.gauss(rates['present'], self.options['attendance_spread'])))
+            weights = [present] + [(1 - present) * rates[s] / other_total for s in others]
+            statuses = ['present'] + others
+            for course_id, _, _, term_start in self.enrollments(student_id):
+                for session in self.session_dates(term_start, course_id):
+                    yield (student_id, course_id, session, rng.choices(statuses, weights)[0], '')
+
+    def learning_outcomes(self):
+        per_course = self.options['outcomes_per_course']
+        for student_id in self.student_ids():
+            rng = self._rng('learning_outcomes', student_id)
+            for course_id, _, _, term_start in self.enrollments(student_id):
+                for number in range(per_course):
+                    level = rng.choices(ACHIEVEMENT_LEVELS, [0.1, 0.25, 0.45, 0.2])[0]
+                    assessed = term_start + timedelta(days=30 * (number + 1))
+                    yield (student_id, course_id, f"Outcome {number + 1}", level, assessed, '')
+
+    def documents(self):
+        for student_id in self.student_ids():
+            rng = self._rng('documents', student_id)
+            for number in range(self.options['documents_per_student']):
+                doc_type = rng.choice(DOCUMENT_TYPES)
+                yield (student_id, doc_type, f"{doc_type} {number + 1}",
+                       f"/documents/{student_id}/{number + 1}.pdf",
+                       date(self.options['start_year'], 1, 1) + timedelta(days=rng.randrange(1000)), '')
+
+# ============ WRITERS ============
+
+INSERTS = {
+    'students': """
+    INSERT INTO students (student_id, first_name, last_name, email, phone, date_of_birth, status)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """,
+    'courses': """
+    INSERT INTO courses (course_id, course_code, course_name, credits, description)
+    VALUES (%s, %s, %s, %s, %s)
+    """,
+    'academic_records': """
+    INSERT INTO academic_records (student_id, course_id, semester, grade, score, year, remarks)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """,
+    'attendance': """
+    INSERT INTO attendance (student_id, course_id, attendance_date, status, remarks)
+    VALUES (%s, %s, %s, %s, %s)
+    """,
+    'learning_outcomes': """
+    INSERT INTO learning_outcomes
+    (student_id, course_id, outcome_description, achievement_level, assessment_date, notes)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    """,
+    'documents': """
+    INSERT INTO documents (student_id, document_type, document_name, file_path, upload_date, description)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    """,
+}
+
+def _write_table(generator, table):
+    """Stream one table into the database; returns (table, rows, seconds)"""
+    started = time.perf_counter()
+    counts = DatabaseConnection().execute_many(INSERTS[table], getattr(generator, table)(),
+                                               chunk_size=generator.options['chunk_size'])
+    elapsed = time.perf_counter() - started
+    rows = sum(counts) if counts is not None else None
+    if rows is None:
+        print(f"❌ {table}: failed")
+    else:
+        print(f"✓ {table}: {rows:,} rows in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)")
+    return table, rows, elapsed
+
+def generate(scale=None, **options):
+    """Populate the database and return {table: rows written}.
+
+    New students and courses get ids after the current maximum, so the
+    generator can be run against a database that already holds data.
+    """
+    if scale:
+        options = {**SCALES[scale], **options}
+    generator = DataGenerator(**options)
+    db = DatabaseConnection()
+    students = db.fetch_one("SELECT COALESCE(MAX(student_id), 0) AS top FROM students")
+    courses = db.fetch_one("SELECT COALESCE(MAX(course_id), 0) AS top FROM courses")
+    if not students or not courses:
+        print("Cannot read existing ids; is the schema in place?")
+        return {}
+    generator.student_offset = students['top']
+    generator.course_offset = courses['top']
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        for phase in (['students', 'courses'],
+                      ['academic_records', 'attendance', 'learning_outcomes', 'documents']):
+            for table, rows, _ in pool.map(lambda t: _write_table(generator, t), phase):
+                results[table] = rows
+            if any(results[table] is None for table in phase):
+                print("Stopping: a parent table failed to load")
+                break
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic LearnTrack data")
+    parser.add_argument('--scale', choices=sorted(SCALES), default='medium')
+    parser.add_argument('--seed', type=int, default=DEFAULTS['seed'])
+    for option in ('students', 'courses', 'terms', 'courses_per_term', 'sessions_per_course',
+                   'outcomes_per_course', 'documents_per_student', 'chunk_size'):
+        parser.add_argument('--' + option.replace('_', '-'), dest=option, type=int)
+    for option in ('score_mean', 'score_stddev', 'attendance_spread'):
+        parser.add_argument('--' + option.replace('_', '-'), dest=option, type=float)
+    parser.add_argument('--present-rate', type=float,
+                        help="average share of sessions marked present")
+    args = vars(parser.parse_args(argv))
+
+    scale = args.pop('scale')
+    present = args.pop('present_rate')
+    options = {key: value for key, value in args.items() if value is not None}
+    if present is not None:
+        rates = dict(DEFAULTS['attendance_rates'])
+        rates['present'] = present
+        options['attendance_rates'] = rates
+    generate(scale, **options)
+
+if __name__ == "__main__":
+    main()
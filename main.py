@@ -4,10 +4,15 @@ from models.attendance import Attendance
 from models.document import Document
 from models.learning_outcome import LearningOutcome
 from models.reports import Reports
+from models.rankings import Rankings
 from utils.menu import *
 from utils.validators import *
 import sys
 
+# Leaderboards cached for the whole session; attached in main() so every
+# grade written through the menus keeps them current
+rankings = Rankings()
+
 def student_management():
     """Handle all student-related operations"""
     student = Student()
@@ -182,6 +187,9 @@ def academic_records_management():
             
             academic.update_academic_record(int(record_id), field, new_value)
         
+        elif choice == '6':
+            academic.get_all_course_statistics()
+        
         elif choice == '0':
             break
         
@@ -215,8 +223,14 @@ def attendance_management():
             status = status_map.get(status_choice, 'present')
             
             remarks = input("Remarks (optional): ").strip()
+            attendance_date = input("Date (YYYY-MM-DD, press Enter for today): ").strip()
             
-            attendance.mark_attendance(int(student_id), int(course_id), status, remarks)
+            if attendance_date and not validate_date(attendance_date):
+                print("Invalid date format!")
+                continue
+            
+            attendance.mark_attendance(int(student_id), int(course_id), status, remarks,
+                                       attendance_date or None)
         
         elif choice == '2':
             student_id = input("Enter Student ID: ").strip()
@@ -254,6 +268,45 @@ def attendance_management():
             else:
                 print("Invalid date format!")
         
+        elif choice == '6':
+            print("\n=== Mark Attendance for a Date Range ===")
+            course_id = input("Course ID: ").strip()
+            student_ids = [s.strip() for s in input("Student IDs (comma-separated): ").split(',') if s.strip()]
+            
+            if not course_id.isdigit() or not student_ids or not all(s.isdigit() for s in student_ids):
+                print("Invalid input!")
+                continue
+            
+            start_date = input("Start date (YYYY-MM-DD): ").strip()
+            end_date = input("End date (YYYY-MM-DD, press Enter for a single day): ").strip() or start_date
+            
+            if not (validate_date(start_date) and validate_date(end_date)):
+                print("Invalid date format!")
+                continue
+            
+            print("\nStatus Options:")
+            print("1. present")
+            print("2. absent")
+            print("3. late")
+            print("4. excused")
+            status_choice = input("Choose status (1-4): ").strip()
+            
+            status_map = {'1': 'present', '2': 'absent', '3': 'late', '4': 'excused'}
+            status = status_map.get(status_choice, 'present')
+            
+            remarks = input("Remarks (optional): ").strip()
+            weekdays_only = input("Skip weekends? (Y/n): ").strip().lower() != 'n'
+            
+            attendance.mark_attendance_range(int(course_id), [int(s) for s in student_ids],
+                                             start_date, end_date, status, remarks, weekdays_only)
+        
+        elif choice == '7':
+            student_id = input("Enter Student ID: ").strip()
+            if student_id.isdigit():
+                attendance.view_student_streaks(int(student_id))
+            else:
+                print("Invalid Student ID!")
+        
         elif choice == '0':
             break
         
@@ -395,7 +448,7 @@ def learning_outcomes_management():
 
 def reports_and_analytics():
     """Handle reports and analytics"""
-    reports = Reports()
+    reports = Reports(rankings)
     while True:
         display_reports_menu()
         choice = input("\nEnter choice: ")
@@ -434,6 +487,56 @@ def reports_and_analytics():
             else:
                 print("Invalid year!")
         
+        elif choice == '8':
+            absences = input("Consecutive absences to flag (default 3): ").strip()
+            lates = input("Late arrivals this week to flag (default 3): ").strip()
+            reports.view_streak_alerts(int(absences) if absences.isdigit() else 3,
+                                       int(lates) if lates.isdigit() else 3)
+        
+        elif choice in ('9', '10'):
+            start_date = input("Start date (YYYY-MM-DD): ").strip()
+            end_date = input("End date (YYYY-MM-DD): ").strip()
+            if not (validate_date(start_date) and validate_date(end_date)):
+                print("Invalid date format!")
+                continue
+            course_id = input("Course ID (press Enter for all courses): ").strip()
+            if course_id and not course_id.isdigit():
+                print("Invalid Course ID!")
+                continue
+            course_id = int(course_id) if course_id else None
+            
+            if choice == '9':
+                reports.view_attendance_heatmap(start_date, end_date, course_id)
+            else:
+                grain = 'month' if input("Group by (1) week or (2) month: ").strip() == '2' else 'week'
+                reports.view_attendance_trend(start_date, end_date, grain, course_id)
+        
+        elif choice == '11':
+            student_id = input("Enter Student ID: ").strip()
+            if student_id.isdigit():
+                reports.view_student_ranks(int(student_id))
+            else:
+                print("Invalid Student ID!")
+        
+        elif choice == '12':
+            kind = input("Rank by (1) cohort, (2) course or (3) semester: ").strip()
+            if kind == '1':
+                year = input("Enrollment Year: ").strip()
+                scope = ('cohort', int(year)) if year.isdigit() else None
+            elif kind == '2':
+                course_id = input("Enter Course ID: ").strip()
+                scope = ('course', int(course_id)) if course_id.isdigit() else None
+            elif kind == '3':
+                semester = input("Enter Semester (e.g., Fall 2024): ").strip()
+                year = input("Enter Year: ").strip()
+                scope = ('semester', semester, int(year)) if year.isdigit() else None
+            else:
+                scope = None
+            if scope:
+                reports.view_leaderboard(scope)
+            else:
+                print("Invalid choice!")
+        
         elif choice == '0':
             break
         
@@ -445,6 +548,7 @@ def main():
     print("\n" + "="*60)
     print("🎓 Welcome to LearnTrack - Student Performance Tracking System")
     print("="*60)
+    rankings.attach()
     
     while True:
         display_main_menu()
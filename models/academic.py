@@ -1,10 +1,94 @@
 from database.connection import DatabaseConnection
+from models.student import STUDENT_BY_ID_QUERY
+from models.attendance_calendar import AttendanceCalendar
+from models.alerts import AttendanceAlerts
+from models.gpa import GpaEngine, grade_points, record_delta, notify_grade_listeners
+from utils.stats import grouped_stats, histogram_bars
 from tabulate import tabulate
 
+# Read queries shared with the async layer (models/async_reads.py)
+ALL_COURSES_QUERY = "SELECT * FROM courses ORDER BY course_code"
+COURSE_BY_ID_QUERY = "SELECT * FROM courses WHERE course_id = %s"
+
+STUDENT_GRADES_QUERY = """
+SELECT 
+    ar.record_id,
+    c.course_code,
+    c.course_name,
+    ar.semester,
+    ar.year,
+    ar.grade,
+    ar.score,
+    c.credits,
+    ar.remarks
+FROM academic_records ar
+JOIN courses c ON ar.course_id = c.course_id
+WHERE ar.student_id = %s
+ORDER BY ar.year DESC, ar.semester DESC
+"""
+
+TRANSCRIPT_QUERY = """
+SELECT 
+    ar.semester,
+    ar.year,
+    c.course_code,
+    c.course_name,
+    c.credits,
+    ar.grade,
+    ar.score
+FROM academic_records ar
+JOIN courses c ON ar.course_id = c.course_id
+WHERE ar.student_id = %s
+ORDER BY ar.year, ar.semester, c.course_code
+"""
+
+# Graded records with their course credits, locked for a GPA delta
+RECORD_CREDITS_QUERY = """
+SELECT ar.record_id, ar.student_id, ar.course_id, ar.semester, ar.year, ar.score, c.credits
+FROM academic_records ar
+JOIN courses c ON ar.course_id = c.course_id
+WHERE {condition}
+FOR UPDATE
+"""
+
+COURSE_STATISTICS_QUERY = """
+SELECT 
+    COUNT(*) as total_students,
+    AVG(score) as average_score,
+    MAX(score) as highest_score,
+    MIN(score) as lowest_score,
+    COUNT(CASE WHEN score >= 90 THEN 1 END) as a_grades,
+    COUNT(CASE WHEN score >= 80 AND score < 90 THEN 1 END) as b_grades,
+    COUNT(CASE WHEN score >= 70 AND score < 80 THEN 1 END) as c_grades,
+    COUNT(CASE WHEN score >= 60 AND score < 70 THEN 1 END) as d_grades,
+    COUNT(CASE WHEN score < 60 THEN 1 END) as f_grades
+FROM academic_records
+WHERE course_id = %s
+"""
+
+# One row per distinct score, read in order off idx_records_course_score, so
+# the distribution of any course arrives in at most 10,001 rows
+COURSE_SCORES_QUERY = """
+SELECT course_id, score, COUNT(*) as n
+FROM academic_records
+WHERE {courses} AND score IS NOT NULL
+GROUP BY course_id, score
+ORDER BY course_id, score
+"""
+
+def course_score_stats(db, course_id=None):
+    """Yield (course_id, ScoreStats) for one course or, in a single streaming pass, every course"""
+    if course_id is None:
+        rows = db.fetch_iter(COURSE_SCORES_QUERY.format(courses="1 = 1"), batch_size=10000)
+    else:
+        rows = db.fetch_iter(COURSE_SCORES_QUERY.format(courses="course_id = %s"), (course_id,))
+    return grouped_stats(rows, 'course_id')
+
 class AcademicRecord:
     def __init__(self):
         self.db = DatabaseConnection()
         self.db.connect()
+        self.gpa = GpaEngine(self.db)
     
     # ============ COURSE MANAGEMENT ============
     
@@ -23,8 +107,7 @@ class AcademicRecord:
     
     def view_all_courses(self):
         """Display all courses"""
-        query = "SELECT * FROM courses ORDER BY course_code"
-        courses = self.db.fetch_all(query)
+        courses = self.db.fetch_all(ALL_COURSES_QUERY, cache=True)
         
         if courses:
             headers = courses[0].keys()
@@ -35,8 +118,7 @@ class AcademicRecord:
     
     def search_course(self, course_id):
         """Search for a specific course"""
-        query = "SELECT * FROM courses WHERE course_id = %s"
-        course = self.db.fetch_one(query, (course_id,))
+        course = self.db.fetch_one(COURSE_BY_ID_QUERY, (course_id,), cache=True)
         
         if course:
             print("\n=== Course Details ===")
@@ -50,8 +132,27 @@ class AcademicRecord:
     def delete_course(self, course_id):
         """Delete a course"""
         query = "DELETE FROM courses WHERE course_id = %s"
-        result = self.db.execute_query(query, (course_id,))
+        with self.db.transaction():
+            # The attendance cascade bypasses the calendar counts, and a
+            # partitioned attendance table has no cascade at all
+            AttendanceCalendar(self.db).retract('course_id', course_id)
+            # Its rollup rows go with the cascade, so the students' at-risk
+            # status is re-checked against what remains
+            attending = self.db.fetch_all("SELECT student_id FROM attendance_rollup WHERE course_id = %s "
+                                          "FOR UPDATE", (course_id,))
+            self.db.execute_query("DELETE FROM attendance WHERE course_id = %s", (course_id,))
+            self.db.execute_query("DELETE FROM attendance_archive WHERE course_id = %s", (course_id,))
+            # Its grades go with the cascade; take them out of the GPA summaries
+            graded = self.db.fetch_all(RECORD_CREDITS_QUERY.format(condition="ar.course_id = %s"), (course_id,))
+            result = self.db.execute_query(query, (course_id,))
+            if result and attending:
+                AttendanceAlerts(self.db).apply([(row['student_id'],) for row in attending])
+            self.gpa.apply(record_delta(r['student_id'], r['semester'], r['year'], r['credits'], r['score'], -1)
+                           for r in graded)
+            if self.db.transaction_failed:
+                result = None
         if result:
+            notify_grade_listeners((r['student_id'], course_id, r['semester'], r['year']) for r in graded)
             print(f"✓ Course {course_id} deleted successfully!")
             return True
         return False
@@ -65,31 +166,59 @@ class AcademicRecord:
         VALUES (%s, %s, %s, %s, %s, %s, %s)
         """
         params = (student_id, course_id, semester, grade, score, year, remarks)
-        result = self.db.execute_query(query, params)
+        with self.db.transaction():
+            result = self.db.execute_query(query, params)
+            if result:
+                credits = self._course_credits([course_id]).get(course_id)
+                self.gpa.apply([record_delta(student_id, semester, year, credits, score)])
+            if self.db.transaction_failed:
+                result = None
         if result:
+            notify_grade_listeners([(student_id, course_id, semester, year)])
             print(f"✓ Academic record added successfully!")
             return True
         return False
     
-    def view_student_grades(self, student_id):
-        """View all grades for a specific student"""
+    def add_academic_records(self, records):
+        """Add many academic records at once.
+
+        records is an iterable of (student_id, course_id, semester, grade,
+        score, year, remarks) tuples; it is written in multi-row batches
+        and committed once, so either every record is stored or none is.
+        """
         query = """
-        SELECT 
-            ar.record_id,
-            c.course_code,
-            c.course_name,
-            ar.semester,
-            ar.year,
-            ar.grade,
-            ar.score,
-            c.credits,
-            ar.remarks
-        FROM academic_records ar
-        JOIN courses c ON ar.course_id = c.course_id
-        WHERE ar.student_id = %s
-        ORDER BY ar.year DESC, ar.semester DESC
+        INSERT INTO academic_records (student_id, course_id, semester, grade, score, year, remarks)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
         """
-        records = self.db.fetch_all(query, (student_id,))
+        records = list(records)
+        with self.db.transaction():
+            counts = self.db.execute_many(query, records)
+            if counts is not None:
+                credits = self._course_credits({record[1] for record in records})
+                self.gpa.apply(record_delta(student_id, semester, year, credits.get(course_id), score)
+                               for student_id, course_id, semester, _, score, year, _ in records)
+            if self.db.transaction_failed:
+                counts = None
+        if counts is not None:
+            notify_grade_listeners((student_id, course_id, semester, year)
+                                   for student_id, course_id, semester, _, _, year, _ in records)
+            print(f"✓ {sum(counts)} academic record(s) added successfully!")
+            return sum(counts)
+        return 0
+    
+    def _course_credits(self, course_ids):
+        """{course_id: credits} for the given courses"""
+        course_ids = list(course_ids)
+        if not course_ids:
+            return {}
+        placeholders = ", ".join(["%s"] * len(course_ids))
+        rows = self.db.fetch_all(f"SELECT course_id, credits FROM courses WHERE course_id IN ({placeholders})",
+                                 course_ids)
+        return {row['course_id']: row['credits'] for row in rows}
+    
+    def view_student_grades(self, student_id):
+        """View all grades for a specific student"""
+        records = self.db.fetch_all(STUDENT_GRADES_QUERY, (student_id,))
         
         if records:
             headers = records[0].keys()
@@ -102,26 +231,20 @@ class AcademicRecord:
             return []
     
     def calculate_gpa(self, student_id):
-        """Calculate GPA for a student"""
-        query = """
-        SELECT AVG(score) as gpa, COUNT(*) as total_courses
-        FROM academic_records 
-        WHERE student_id = %s
-        """
-        result = self.db.fetch_one(query, (student_id,))
+        """Calculate credit-weighted GPA for a student (see models/gpa.py)"""
+        result = self.gpa.student_gpa(student_id)
         
-        if result and result['gpa']:
-            gpa = result['gpa']
-            total = result['total_courses']
-            gpa_4_scale = (gpa / 100) * 4.0
+        if result and result['gpa'] is not None:
+            gpa = float(result['gpa'])
             
             print("\n=== GPA Summary ===")
             print(f"Student ID: {student_id}")
-            print(f"Total Courses: {total}")
-            print(f"Average Score: {gpa:.2f}%")
-            print(f"GPA (4.0 scale): {gpa_4_scale:.2f}")
+            print(f"Total Courses: {result['courses']}")
+            print(f"Total Credits: {result['credits']}")
+            print(f"Average Score: {result['average_score']:.2f}%")
+            print(f"GPA (4.0 scale): {gpa:.2f}")
             
-            return gpa_4_scale
+            return gpa
         else:
             print("No grades available to calculate GPA")
             return None
@@ -129,8 +252,7 @@ class AcademicRecord:
     def view_transcript(self, student_id):
         """Generate a complete transcript for a student"""
         # Get student info
-        student_query = "SELECT * FROM students WHERE student_id = %s"
-        student = self.db.fetch_one(student_query, (student_id,))
+        student = self.db.fetch_one(STUDENT_BY_ID_QUERY, (student_id,), prepared=True, cache=True)
         
         if not student:
             print(f"Student {student_id} not found!")
@@ -147,55 +269,31 @@ class AcademicRecord:
         print("\n" + "-"*70)
         
         # Get grades by semester
-        query = """
-        SELECT 
-            ar.semester,
-            ar.year,
-            c.course_code,
-            c.course_name,
-            c.credits,
-            ar.grade,
-            ar.score
-        FROM academic_records ar
-        JOIN courses c ON ar.course_id = c.course_id
-        WHERE ar.student_id = %s
-        ORDER BY ar.year, ar.semester, c.course_code
-        """
-        records = self.db.fetch_all(query, (student_id,))
+        records = self.db.fetch_all(TRANSCRIPT_QUERY, (student_id,))
         
         if records:
+            # Semester totals come from student_term_summary, one row per term
+            terms = {(term['semester'], term['year']): term for term in self.gpa.term_gpas(student_id)}
             current_semester = None
-            semester_credits = 0
-            semester_points = 0
             
             for record in records:
-                semester_key = f"{record['semester']} {record['year']}"
+                semester_key = (record['semester'] or '', record['year'] or 0)
                 
                 if current_semester != semester_key:
                     if current_semester:
-                        # Print semester summary
-                        sem_gpa = (semester_points / semester_credits) if semester_credits > 0 else 0
-                        print(f"\nSemester Credits: {semester_credits} | Semester GPA: {sem_gpa:.2f}")
+                        self._print_term_summary(terms.get(current_semester))
                         print("-"*70)
                     
                     current_semester = semester_key
-                    print(f"\n{semester_key}")
+                    print(f"\n{record['semester']} {record['year']}")
                     print("-"*70)
-                    semester_credits = 0
-                    semester_points = 0
-                
-                grade_point = self._convert_score_to_gpa(record['score'])
-                semester_credits += record['credits']
-                semester_points += grade_point * record['credits']
                 
                 print(f"{record['course_code']:<10} {record['course_name']:<30} "
                       f"Credits: {record['credits']:<3} Grade: {record['grade']:<5} "
                       f"Score: {record['score']:.1f}")
             
             # Final semester summary
-            if semester_credits > 0:
-                sem_gpa = (semester_points / semester_credits)
-                print(f"\nSemester Credits: {semester_credits} | Semester GPA: {sem_gpa:.2f}")
+            self._print_term_summary(terms.get(current_semester))
             
             print("\n" + "="*70)
             
@@ -206,18 +304,13 @@ class AcademicRecord:
         
         print("="*70)
     
+    def _print_term_summary(self, term):
+        if term and term['gpa'] is not None:
+            print(f"\nSemester Credits: {term['credits']} | Semester GPA: {term['gpa']:.2f}")
+    
     def _convert_score_to_gpa(self, score):
         """Convert percentage score to 4.0 GPA scale"""
-        if score >= 90:
-            return 4.0
-        elif score >= 80:
-            return 3.0
-        elif score >= 70:
-            return 2.0
-        elif score >= 60:
-            return 1.0
-        else:
-            return 0.0
+        return grade_points(score)
     
     def update_academic_record(self, record_id, field, new_value):
         """Update an academic record"""
@@ -228,30 +321,32 @@ class AcademicRecord:
             return False
         
         query = f"UPDATE academic_records SET {field} = %s WHERE record_id = %s"
-        result = self.db.execute_query(query, (new_value, record_id))
+        with self.db.transaction():
+            old = None
+            if field in ('score', 'semester', 'year'):
+                old = self.db.fetch_one(RECORD_CREDITS_QUERY.format(condition="ar.record_id = %s"), (record_id,))
+            result = self.db.execute_query(query, (new_value, record_id))
+            if result and old:
+                # Move the record's contribution from its old values to the new ones
+                new = dict(old)
+                new[field] = int(new_value) if field == 'year' else float(new_value) if field == 'score' else new_value
+                self.gpa.apply([
+                    record_delta(old['student_id'], old['semester'], old['year'], old['credits'], old['score'], -1),
+                    record_delta(new['student_id'], new['semester'], new['year'], new['credits'], new['score'])])
+            if self.db.transaction_failed:
+                result = None
         
         if result:
+            if old:
+                notify_grade_listeners([(old['student_id'], old['course_id'], old['semester'], old['year']),
+                                        (new['student_id'], new['course_id'], new['semester'], new['year'])])
             print(f"✓ Academic record {record_id} updated successfully!")
             return True
         return False
     
     def get_course_statistics(self, course_id):
         """Get statistics for a specific course"""
-        query = """
-        SELECT 
-            COUNT(*) as total_students,
-            AVG(score) as average_score,
-            MAX(score) as highest_score,
-            MIN(score) as lowest_score,
-            COUNT(CASE WHEN score >= 90 THEN 1 END) as a_grades,
-            COUNT(CASE WHEN score >= 80 AND score < 90 THEN 1 END) as b_grades,
-            COUNT(CASE WHEN score >= 70 AND score < 80 THEN 1 END) as c_grades,
-            COUNT(CASE WHEN score >= 60 AND score < 70 THEN 1 END) as d_grades,
-            COUNT(CASE WHEN score < 60 THEN 1 END) as f_grades
-        FROM academic_records
-        WHERE course_id = %s
-        """
-        stats = self.db.fetch_one(query, (course_id,))
+        stats = self.db.fetch_one(COURSE_STATISTICS_QUERY, (course_id,))
         
         if stats and stats['total_students'] > 0:
             print("\n=== Course Statistics ===")
@@ -265,7 +360,38 @@ class AcademicRecord:
             print(f"  C (70-79):  {stats['c_grades']} students")
             print(f"  D (60-69):  {stats['d_grades']} students")
             print(f"  F (0-59):   {stats['f_grades']} students")
+            
+            for _, scores in course_score_stats(self.db, course_id):
+                summary = scores.summary()
+                stats.update({key: summary[key] for key in ('q1', 'median', 'q3', 'stddev')})
+                print(f"\nMedian Score: {summary['median']:.2f}%")
+                print(f"Quartiles (Q1 / Q3): {summary['q1']:.2f}% / {summary['q3']:.2f}%")
+                print(f"Standard Deviation: {summary['stddev']:.2f}")
+                print("\nScore Histogram:")
+                print("\n".join(histogram_bars(scores.histogram())))
             return stats
         else:
             print("No data available for this course.")
-            return None
\ No newline at end of file
+            return None
+    
+    def get_all_course_statistics(self):
+        """Score distribution of every course from one pass over the score index"""
+        courses = {course['course_id']: course for course in self.db.fetch_all(ALL_COURSES_QUERY, cache=True)}
+        results = {}
+        for course_id, scores in course_score_stats(self.db):
+            results[course_id] = scores.summary()
+        
+        if not results:
+            print("No graded records found.")
+            return {}
+        
+        headers = ['Code', 'Course', 'Graded', 'Mean', 'Std Dev', 'Min', 'Q1', 'Median', 'Q3', 'Max']
+        rows = []
+        for course_id, summary in results.items():
+            course = courses.get(course_id, {})
+            rows.append([course.get('course_code', course_id), course.get('course_name', ''),
+                         summary['count'], summary['mean'], summary['stddev'], summary['min'],
+                         summary['q1'], summary['median'], summary['q3'], summary['max']])
+        print("\n=== Course Score Statistics ===")
+        print(tabulate(rows, headers=headers, tablefmt="grid", floatfmt=".2f"))
+        return results
\ No newline at end of file
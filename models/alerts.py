@@ -0,0 +1,181 @@
+from config import ALERT_CONFIG
+from database.connection import DatabaseConnection
+
+# Low-attendance alerting. attendance_at_risk holds the students currently
+# under ALERT_CONFIG['threshold']; attendance_alerts is an outbox with one
+# row per crossing ('at_risk' or 'recovered'). Attendance.upsert_attendance
+# re-checks only the students it touched, reading their totals from
+# attendance_rollup, so the cost follows the size of the change rather
+# than the size of the attendance table.
+#
+#     python -m models.alerts           resync the at-risk set from the rollup
+#     python -m models.alerts --drain   print and mark pending notifications
+
+STUDENT_RATIO_QUERY = """
+SELECT student_id, SUM(total) as total, SUM(present) as present
+FROM attendance_rollup
+WHERE student_id IN ({ids})
+GROUP BY student_id
+"""
+
+ALL_RATIOS_QUERY = """
+SELECT student_id, SUM(total) as total, SUM(present) as present
+FROM attendance_rollup
+GROUP BY student_id
+"""
+
+AT_RISK_LOCK_QUERY = """
+SELECT student_id FROM attendance_at_risk
+WHERE student_id IN ({ids})
+FOR UPDATE
+"""
+
+AT_RISK_UPSERT_QUERY = """
+INSERT INTO attendance_at_risk (student_id, percentage, total, present)
+VALUES (%s, %s, %s, %s) AS new
+ON DUPLICATE KEY UPDATE
+    percentage = new.percentage,
+    total = new.total,
+    present = new.present
+"""
+
+OUTBOX_INSERT_QUERY = """
+INSERT INTO attendance_alerts (student_id, event, percentage, threshold)
+VALUES (%s, %s, %s, %s)
+"""
+
+AT_RISK_QUERY = """
+SELECT
+    s.student_id,
+    s.first_name,
+    s.last_name,
+    s.email,
+    r.total as total_classes,
+    r.present,
+    r.percentage,
+    r.since
+FROM attendance_at_risk r
+JOIN students s ON r.student_id = s.student_id
+ORDER BY r.percentage ASC
+"""
+
+PENDING_ALERTS_QUERY = """
+SELECT alert_id, student_id, event, percentage, threshold, created_at
+FROM attendance_alerts
+WHERE sent_at IS NULL
+ORDER BY alert_id
+LIMIT %s
+FOR UPDATE SKIP LOCKED
+"""
+
+ID_CHUNK = 1000
+
+class AttendanceAlerts:
+    def __init__(self, db=None):
+        self.db = db or DatabaseConnection()
+        self.threshold = ALERT_CONFIG['threshold']
+        self.min_sessions = ALERT_CONFIG['min_sessions']
+
+    def _percentage(self, row):
+        """Present rate of a ratio row, or None while it has too few sessions to judge"""
+        if not row or row['total'] < max(self.min_sessions, 1):
+            return None
+        return round(float(row['present']) / float(row['total']) * 100, 2)
+
+    def _reconcile(self, ratios, at_risk, emit=True):
+        """Move students in or out of the at-risk set; ratios maps student_id -> ratio row"""
+        entering, staying, leaving = [], [], []
+        for student_id, row in ratios.items():
+            percentage = self._percentage(row)
+            if percentage is not None and percentage < self.threshold:
+                target = staying if student_id in at_risk else entering
+                target.append((student_id, percentage, int(row['total']), int(row['present'])))
+            elif student_id in at_risk:
+                leaving.append((student_id, percentage))
+
+        ok = True
+        if entering or staying:
+            ok = self.db.execute_many(AT_RISK_UPSERT_QUERY, entering + staying) is not None and ok
+        for start in range(0, len(leaving), ID_CHUNK):
+            chunk = [student_id for student_id, _ in leaving[start:start + ID_CHUNK]]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            ok = self.db.execute_query(f"DELETE FROM attendance_at_risk WHERE student_id IN ({placeholders})",
+                                       chunk) is not None and ok
+        if emit:
+            events = ([(sid, 'at_risk', pct, self.threshold) for sid, pct, _, _ in entering] +
+                      [(sid, 'recovered', pct, self.threshold) for sid, pct in leaving])
+            if events:
+                ok = self.db.execute_many(OUTBOX_INSERT_QUERY, events) is not None and ok
+        return ok, len(entering), len(leaving)
+
+    def apply(self, changes):
+        """Re-check the students in AttendanceWrite.changes; returns False on error.
+
+        Run inside the transaction that wrote the attendance, after the
+        rollup has been updated, so alerts commit together with the marks.
+        """
+        student_ids = sorted({change[0] for change in changes})
+        ok = True
+        for start in range(0, len(student_ids), ID_CHUNK):
+            chunk = student_ids[start:start + ID_CHUNK]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            at_risk = {row['student_id'] for row in
+                       self.db.fetch_all(AT_RISK_LOCK_QUERY.format(ids=placeholders), chunk)}
+            ratios = {student_id: None for student_id in chunk}
+            for row in self.db.fetch_all(STUDENT_RATIO_QUERY.format(ids=placeholders), chunk):
+                ratios[row['student_id']] = row
+            ok = self._reconcile(ratios, at_risk)[0] and ok
+        return ok
+
+    def sync(self, emit=True):
+        """Recompute the whole at-risk set from the rollup, e.g. after changing the threshold"""
+        with self.db.transaction():
+            at_risk = {row['student_id'] for row in
+                       self.db.fetch_all("SELECT student_id FROM attendance_at_risk FOR UPDATE")}
+            ratios = {row['student_id']: row for row in self.db.fetch_all(ALL_RATIOS_QUERY)}
+            for student_id in at_risk - set(ratios):
+                ratios[student_id] = None
+            _, entered, left = self._reconcile(ratios, at_risk, emit)
+            failed = self.db.transaction_failed
+        if failed:
+            return False
+        print(f"✓ At-risk set synced at {self.threshold}%: {entered} added, {left} removed")
+        return True
+
+    # ============ READS ============
+
+    def at_risk_students(self):
+        return self.db.fetch_all(AT_RISK_QUERY, cache=True)
+
+    def drain(self, handler, batch_size=100):
+        """Pass pending outbox rows to handler(alert) and mark them sent; returns the count.
+
+        Rows are claimed with SKIP LOCKED, so several workers can drain the
+        outbox at once. A handler exception leaves its batch pending.
+        """
+        sent = 0
+        while True:
+            with self.db.transaction():
+                alerts = self.db.fetch_all(PENDING_ALERTS_QUERY, (batch_size,))
+                for alert in alerts:
+                    handler(alert)
+                if alerts:
+                    ids = [alert['alert_id'] for alert in alerts]
+                    placeholders = ", ".join(["%s"] * len(ids))
+                    self.db.execute_query(
+                        f"UPDATE attendance_alerts SET sent_at = CURRENT_TIMESTAMP WHERE alert_id IN ({placeholders})",
+                        ids)
+                failed = self.db.transaction_failed
+            if failed or not alerts:
+                return sent
+            sent += len(alerts)
+
+if __name__ == "__main__":
+    import sys
+    alerts = AttendanceAlerts()
+    if "--drain" in sys.argv[1:]:
+        count = alerts.drain(lambda a: print(f"{a['created_at']}  student {a['student_id']}: "
+                                             f"{a['event']} ({a['percentage']}% vs {a['threshold']}%)"))
+        print(f"\n✓ {count} notification(s) sent")
+    else:
+        alerts.sync()
@@ -0,0 +1,106 @@
+import asyncio
+from models.student import ALL_STUDENTS_QUERY, STUDENT_BY_ID_QUERY
+from models.academic import (ALL_COURSES_QUERY, COURSE_BY_ID_QUERY, STUDENT_GRADES_QUERY,
+                             TRANSCRIPT_QUERY, COURSE_STATISTICS_QUERY)
+from models.attendance import (STUDENT_ATTENDANCE_QUERY, STUDENT_COURSE_ATTENDANCE_QUERY,
+                               ATTENDANCE_COUNTS_QUERY, COURSE_ATTENDANCE_QUERY,
+                               ATTENDANCE_BY_DATE_QUERY, STUDENT_ATTENDANCE_SUMMARY_QUERY,
+                               LOW_ATTENDANCE_QUERY)
+from models.reports import (STUDENT_ACADEMIC_SUMMARY_QUERY, STUDENT_ATTENDANCE_TOTALS_QUERY,
+                            STUDENT_OUTCOME_COUNTS_QUERY, STUDENT_DOCUMENT_COUNT_QUERY)
+
+# Async counterparts of the model read paths. They run the same SQL as the
+# synchronous models but return rows instead of printing tables, so a
+# server can await many of them concurrently on one AsyncDatabaseConnection:
+#
+#     async with AsyncDatabaseConnection() as db:
+#         attendance = AsyncAttendance(db)
+#         results = await asyncio.gather(*(attendance.get_attendance(s) for s in ids))
+
+class AsyncStudent:
+    def __init__(self, db):
+        self.db = db
+
+    async def get_all_students(self):
+        return await self.db.fetch_all(ALL_STUDENTS_QUERY)
+
+    async def get_student(self, student_id):
+        return await self.db.fetch_one(STUDENT_BY_ID_QUERY, (student_id,))
+
+class AsyncAcademicRecord:
+    def __init__(self, db):
+        self.db = db
+
+    async def get_all_courses(self):
+        return await self.db.fetch_all(ALL_COURSES_QUERY)
+
+    async def get_course(self, course_id):
+        return await self.db.fetch_one(COURSE_BY_ID_QUERY, (course_id,))
+
+    async def get_student_grades(self, student_id):
+        return await self.db.fetch_all(STUDENT_GRADES_QUERY, (student_id,))
+
+    async def get_transcript(self, student_id):
+        """Return the student header and transcript rows, fetched concurrently"""
+        student, records = await asyncio.gather(
+            self.db.fetch_one(STUDENT_BY_ID_QUERY, (student_id,)),
+            self.db.fetch_all(TRANSCRIPT_QUERY, (student_id,))
+        )
+        if not student:
+            return None
+        return {'student': student, 'records': records}
+
+    async def get_course_statistics(self, course_id):
+        return await self.db.fetch_one(COURSE_STATISTICS_QUERY, (course_id,))
+
+class AsyncAttendance:
+    def __init__(self, db):
+        self.db = db
+
+    async def get_attendance(self, student_id, course_id=None):
+        if course_id:
+            return await self.db.fetch_all(STUDENT_COURSE_ATTENDANCE_QUERY, (student_id, course_id))
+        return await self.db.fetch_all(STUDENT_ATTENDANCE_QUERY, (student_id,))
+
+    async def get_attendance_counts(self, student_id, course_id):
+        return await self.db.fetch_one(ATTENDANCE_COUNTS_QUERY, (student_id, course_id))
+
+    async def get_course_attendance(self, course_id):
+        return await self.db.fetch_all(COURSE_ATTENDANCE_QUERY, (course_id,))
+
+    async def get_attendance_by_date(self, attendance_date):
+        return await self.db.fetch_all(ATTENDANCE_BY_DATE_QUERY, (attendance_date,))
+
+    async def get_student_attendance_summary(self, student_id):
+        return await self.db.fetch_all(STUDENT_ATTENDANCE_SUMMARY_QUERY, (student_id,))
+
+    async def get_low_attendance_students(self, threshold=75):
+        return await self.db.fetch_all(LOW_ATTENDANCE_QUERY, (threshold,))
+
+class AsyncReports:
+    def __init__(self, db):
+        self.db = db
+
+    async def get_student_report(self, student_id):
+        """Return every section of the student performance report.
+
+        The five queries behind generate_student_report are issued
+        concurrently, each on its own pooled connection.
+        """
+        params = (student_id,)
+        student, academic, attendance, outcomes, docs = await asyncio.gather(
+            self.db.fetch_one(STUDENT_BY_ID_QUERY, params),
+            self.db.fetch_one(STUDENT_ACADEMIC_SUMMARY_QUERY, params),
+            self.db.fetch_one(STUDENT_ATTENDANCE_TOTALS_QUERY, params),
+            self.db.fetch_all(STUDENT_OUTCOME_COUNTS_QUERY, params),
+            self.db.fetch_one(STUDENT_DOCUMENT_COUNT_QUERY, params)
+        )
+        if not student:
+            return None
+        return {
+            'student': student,
+            'academic': academic,
+            'attendance': attendance,
+            'outcomes': outcomes,
+            'documents': docs['doc_count'] if docs else 0
+        }
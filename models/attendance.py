@@ -1,71 +1,260 @@
 from database.connection import DatabaseConnection
+from models.rollup import AttendanceRollup
+from models.streaks import StreakEngine
+from models.alerts import AttendanceAlerts
+from models.attendance_calendar import AttendanceCalendar
 from tabulate import tabulate
 from datetime import date, datetime, timedelta
 
+# Read queries shared with the async layer (models/async_reads.py)
+STUDENT_ATTENDANCE_QUERY = """
+SELECT 
+    a.attendance_date,
+    c.course_code,
+    c.course_name,
+    a.status,
+    a.remarks
+FROM attendance a
+JOIN courses c ON a.course_id = c.course_id
+WHERE a.student_id = %s
+ORDER BY a.attendance_date DESC
+"""
+
+STUDENT_COURSE_ATTENDANCE_QUERY = """
+SELECT 
+    a.attendance_date,
+    c.course_code,
+    c.course_name,
+    a.status,
+    a.remarks
+FROM attendance a
+JOIN courses c ON a.course_id = c.course_id
+WHERE a.student_id = %s AND a.course_id = %s
+ORDER BY a.attendance_date DESC
+"""
+
+# Count summaries read attendance_rollup (see models/rollup.py)
+ATTENDANCE_COUNTS_QUERY = """
+SELECT total, present, absent, late, excused
+FROM attendance_rollup
+WHERE student_id = %s AND course_id = %s
+"""
+
+COURSE_ATTENDANCE_QUERY = """
+SELECT 
+    s.student_id,
+    s.first_name,
+    s.last_name,
+    r.total as total_classes,
+    r.present,
+    ROUND((r.present / r.total) * 100, 2) as percentage
+FROM attendance_rollup r
+JOIN students s ON s.student_id = r.student_id
+WHERE r.course_id = %s AND r.total > 0
+ORDER BY percentage DESC
+"""
+
+ATTENDANCE_BY_DATE_QUERY = """
+SELECT 
+    s.student_id,
+    s.first_name,
+    s.last_name,
+    c.course_code,
+    c.course_name,
+    a.status,
+    a.remarks
+FROM attendance a
+JOIN students s ON a.student_id = s.student_id
+JOIN courses c ON a.course_id = c.course_id
+WHERE a.attendance_date = %s
+ORDER BY c.course_code, s.last_name
+"""
+
+STUDENT_ATTENDANCE_SUMMARY_QUERY = """
+SELECT 
+    c.course_code,
+    c.course_name,
+    r.total,
+    r.present,
+    ROUND((r.present / r.total) * 100, 2) as percentage
+FROM attendance_rollup r
+JOIN courses c ON r.course_id = c.course_id
+WHERE r.student_id = %s AND r.total > 0
+ORDER BY percentage DESC
+"""
+
+LOW_ATTENDANCE_QUERY = """
+SELECT 
+    s.student_id,
+    s.first_name,
+    s.last_name,
+    s.email,
+    SUM(r.total) as total_classes,
+    SUM(r.present) as present,
+    ROUND((SUM(r.present) / SUM(r.total)) * 100, 2) as percentage
+FROM students s
+JOIN attendance_rollup r ON s.student_id = r.student_id
+GROUP BY s.student_id, s.first_name, s.last_name, s.email
+HAVING percentage < %s
+ORDER BY percentage ASC
+"""
+
+# Write path: every attendance write goes through upsert_attendance.
+# The date range lets a partitioned attendance table prune to the
+# partitions the batch falls in (see database/partitioning.py).
+EXISTING_ATTENDANCE_QUERY = """
+SELECT student_id, course_id, attendance_date, status FROM attendance
+WHERE attendance_date BETWEEN %s AND %s
+  AND (student_id, course_id, attendance_date) IN ({keys})
+FOR UPDATE
+"""
+
+# Sessions before this date live in attendance_archive and are read-only
+ARCHIVE_CUTOFF_QUERY = "SELECT MAX(archived_before) AS cutoff FROM attendance_archives"
+
+UPSERT_ATTENDANCE_QUERY = """
+INSERT INTO attendance (student_id, course_id, attendance_date, status, remarks)
+VALUES (%s, %s, %s, %s, %s) AS new
+ON DUPLICATE KEY UPDATE status = new.status, remarks = new.remarks
+"""
+
+# Keys per existence lookup; keeps each IN-list well under max_allowed_packet
+KEY_LOOKUP_CHUNK = 1000
+
+# Called with AttendanceWrite.changes after every committed
+# upsert_attendance, for in-process consumers such as AttendanceIndex
+_change_listeners = []
+
+def add_change_listener(listener):
+    _change_listeners.append(listener)
+
+def remove_change_listener(listener):
+    if listener in _change_listeners:
+        _change_listeners.remove(listener)
+
+def as_date(value):
+    """Accept a date, datetime or YYYY-MM-DD string"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    return value
+
+class AttendanceWrite:
+    """Outcome of upsert_attendance.
+
+    changes lists (student_id, course_id, attendance_date, old_status,
+    new_status) for every row whose status changed; old_status is None for
+    inserted rows. archived counts rows refused because their date falls in
+    a term already moved to attendance_archive.
+    """
+    def __init__(self):
+        self.inserted = 0
+        self.updated = 0
+        self.skipped = 0
+        self.archived = 0
+        self.changes = []
+
 class Attendance:
     def __init__(self):
         self.db = DatabaseConnection()
         self.db.connect()
+        self.rollup = AttendanceRollup(self.db)
+        self.streaks = StreakEngine(self.db)
+        self.alerts = AttendanceAlerts(self.db)
+        self.calendar = AttendanceCalendar(self.db)
     
-    def mark_attendance(self, student_id, course_id, status, remarks=""):
-        """Mark attendance for a student"""
-        # Check if attendance already marked for today
-        check_query = """
-        SELECT * FROM attendance 
-        WHERE student_id = %s AND course_id = %s AND attendance_date = %s
+    def mark_attendance(self, student_id, course_id, status, remarks="", attendance_date=None):
+        """Mark attendance for a student, for today unless attendance_date is given"""
+        attendance_date = as_date(attendance_date) if attendance_date else date.today()
+        result = self.upsert_attendance([(student_id, course_id, attendance_date, status, remarks)])
+        
+        if result is None or result.archived:
+            return False
+        if result.updated:
+            print(f"⚠ Attendance already marked for {attendance_date}. Updated.")
+        print(f"✓ Attendance marked as '{status}' for student {student_id}")
+        return True
+    
+    def upsert_attendance(self, rows, replace=True):
+        """Insert or update many attendance rows in one transaction.
+
+        rows is an iterable of (student_id, course_id, attendance_date,
+        status, remarks) tuples; a later row for the same student, course
+        and date wins. Rows that already exist are locked and read first,
+        so inserts can be told apart from updates, then the whole set is
+        written with multi-row INSERT ... ON DUPLICATE KEY UPDATE statements.
+        With replace=False existing rows are left as they are and counted
+        as skipped. Returns an AttendanceWrite, or None if the transaction
+        rolled back.
         """
-        existing = self.db.fetch_one(check_query, (student_id, course_id, date.today()))
+        latest = {}
+        for student_id, course_id, attendance_date, status, remarks in rows:
+            latest[(int(student_id), int(course_id), as_date(attendance_date))] = (status, remarks)
         
-        if existing:
-            print(f"⚠ Attendance already marked for today. Updating...")
-            update_query = """
-            UPDATE attendance 
-            SET status = %s, remarks = %s 
-            WHERE student_id = %s AND course_id = %s AND attendance_date = %s
-            """
-            result = self.db.execute_query(update_query, (status, remarks, student_id, course_id, date.today()))
-        else:
-            query = """
-            INSERT INTO attendance (student_id, course_id, attendance_date, status, remarks)
-            VALUES (%s, %s, %s, %s, %s)
-            """
-            params = (student_id, course_id, date.today(), status, remarks)
-            result = self.db.execute_query(query, params)
+        result = AttendanceWrite()
+        if not latest:
+            return result
         
-        if result:
-            print(f"✓ Attendance marked as '{status}' for student {student_id}")
-            return True
-        return False
+        existing = {}
+        with self.db.transaction():
+            # Uncached: archive runs in another process, which does not
+            # invalidate this process's result cache
+            cutoff = self.db.fetch_one(ARCHIVE_CUTOFF_QUERY)
+            if cutoff and cutoff['cutoff']:
+                archived = [key for key in latest if key[2] < cutoff['cutoff']]
+                for key in archived:
+                    del latest[key]
+                if archived:
+                    result.archived = len(archived)
+                    print(f"⚠ {len(archived)} row(s) dated before {cutoff['cutoff']} fall in archived terms; not written")
+                if not latest:
+                    return result
+            
+            keys = list(latest)
+            for start in range(0, len(keys), KEY_LOOKUP_CHUNK):
+                chunk = keys[start:start + KEY_LOOKUP_CHUNK]
+                query = EXISTING_ATTENDANCE_QUERY.format(keys=", ".join(["(%s, %s, %s)"] * len(chunk)))
+                params = [min(key[2] for key in chunk), max(key[2] for key in chunk)]
+                params += [value for key in chunk for value in key]
+                for row in self.db.fetch_all(query, params):
+                    existing[(row['student_id'], row['course_id'], row['attendance_date'])] = row['status']
+            
+            if not replace:
+                result.skipped = len(existing)
+                keys = [key for key in keys if key not in existing]
+            counts = self.db.execute_many(UPSERT_ATTENDANCE_QUERY, (key + latest[key] for key in keys))
+            
+            if counts is not None:
+                for key in keys:
+                    old_status = existing.get(key)
+                    new_status = latest[key][0]
+                    if key in existing:
+                        result.updated += 1
+                    else:
+                        result.inserted += 1
+                    if old_status != new_status:
+                        result.changes.append(key + (old_status, new_status))
+                # Derived tables commit or roll back with the rows themselves
+                self.rollup.apply(result.changes)
+                self.calendar.apply(result.changes)
+                self.streaks.apply(result.changes)
+                self.alerts.apply(result.changes)
+            failed = counts is None or self.db.transaction_failed
+        if failed:
+            return None
+        
+        for listener in list(_change_listeners):
+            listener(result.changes)
+        return result
     
     def view_attendance(self, student_id, course_id=None):
         """View attendance records for a student"""
         if course_id:
-            query = """
-            SELECT 
-                a.attendance_date,
-                c.course_code,
-                c.course_name,
-                a.status,
-                a.remarks
-            FROM attendance a
-            JOIN courses c ON a.course_id = c.course_id
-            WHERE a.student_id = %s AND a.course_id = %s
-            ORDER BY a.attendance_date DESC
-            """
+            query = STUDENT_COURSE_ATTENDANCE_QUERY
             params = (student_id, course_id)
         else:
-            query = """
-            SELECT 
-                a.attendance_date,
-                c.course_code,
-                c.course_name,
-                a.status,
-                a.remarks
-            FROM attendance a
-            JOIN courses c ON a.course_id = c.course_id
-            WHERE a.student_id = %s
-            ORDER BY a.attendance_date DESC
-            """
+            query = STUDENT_ATTENDANCE_QUERY
             params = (student_id,)
         
         records = self.db.fetch_all(query, params)
@@ -82,17 +271,7 @@ class Attendance:
     
     def get_attendance_percentage(self, student_id, course_id):
         """Calculate attendance percentage for a student in a course"""
-        query = """
-        SELECT 
-            COUNT(*) as total,
-            SUM(CASE WHEN status = 'present' THEN 1 ELSE 0 END) as present,
-            SUM(CASE WHEN status = 'absent' THEN 1 ELSE 0 END) as absent,
-            SUM(CASE WHEN status = 'late' THEN 1 ELSE 0 END) as late,
-            SUM(CASE WHEN status = 'excused' THEN 1 ELSE 0 END) as excused
-        FROM attendance
-        WHERE student_id = %s AND course_id = %s
-        """
-        result = self.db.fetch_one(query, (student_id, course_id))
+        result = self.db.fetch_one(ATTENDANCE_COUNTS_QUERY, (student_id, course_id))
         
         if result and result['total'] > 0:
             present = result['present']
@@ -126,21 +305,7 @@ class Attendance:
     
     def view_course_attendance(self, course_id):
         """View attendance for all students in a course"""
-        query = """
-        SELECT 
-            s.student_id,
-            s.first_name,
-            s.last_name,
-            COUNT(*) as total_classes,
-            SUM(CASE WHEN a.status = 'present' THEN 1 ELSE 0 END) as present,
-            ROUND((SUM(CASE WHEN a.status = 'present' THEN 1 ELSE 0 END) / COUNT(*)) * 100, 2) as percentage
-        FROM students s
-        JOIN attendance a ON s.student_id = a.student_id
-        WHERE a.course_id = %s
-        GROUP BY s.student_id, s.first_name, s.last_name
-        ORDER BY percentage DESC
-        """
-        records = self.db.fetch_all(query, (course_id,))
+        records = self.db.fetch_all(COURSE_ATTENDANCE_QUERY, (course_id,))
         
         if records:
             headers = records[0].keys()
@@ -160,22 +325,7 @@ class Attendance:
     
     def view_attendance_by_date(self, attendance_date):
         """View all attendance records for a specific date"""
-        query = """
-        SELECT 
-            s.student_id,
-            s.first_name,
-            s.last_name,
-            c.course_code,
-            c.course_name,
-            a.status,
-            a.remarks
-        FROM attendance a
-        JOIN students s ON a.student_id = s.student_id
-        JOIN courses c ON a.course_id = c.course_id
-        WHERE a.attendance_date = %s
-        ORDER BY c.course_code, s.last_name
-        """
-        records = self.db.fetch_all(query, (attendance_date,))
+        records = self.db.fetch_all(ATTENDANCE_BY_DATE_QUERY, (attendance_date,))
         
         if records:
             headers = records[0].keys()
@@ -197,20 +347,7 @@ class Attendance:
     
     def get_student_attendance_summary(self, student_id):
         """Get overall attendance summary for a student across all courses"""
-        query = """
-        SELECT 
-            c.course_code,
-            c.course_name,
-            COUNT(*) as total,
-            SUM(CASE WHEN a.status = 'present' THEN 1 ELSE 0 END) as present,
-            ROUND((SUM(CASE WHEN a.status = 'present' THEN 1 ELSE 0 END) / COUNT(*)) * 100, 2) as percentage
-        FROM attendance a
-        JOIN courses c ON a.course_id = c.course_id
-        WHERE a.student_id = %s
-        GROUP BY c.course_id, c.course_code, c.course_name
-        ORDER BY percentage DESC
-        """
-        records = self.db.fetch_all(query, (student_id,))
+        records = self.db.fetch_all(STUDENT_ATTENDANCE_SUMMARY_QUERY, (student_id,))
         
         if records:
             headers = records[0].keys()
@@ -230,22 +367,11 @@ class Attendance:
     
     def get_low_attendance_students(self, threshold=75):
         """Get list of students with attendance below threshold"""
-        query = """
-        SELECT 
-            s.student_id,
-            s.first_name,
-            s.last_name,
-            s.email,
-            COUNT(*) as total_classes,
-            SUM(CASE WHEN a.status = 'present' THEN 1 ELSE 0 END) as present,
-            ROUND((SUM(CASE WHEN a.status = 'present' THEN 1 ELSE 0 END) / COUNT(*)) * 100, 2) as percentage
-        FROM students s
-        JOIN attendance a ON s.student_id = a.student_id
-        GROUP BY s.student_id, s.first_name, s.last_name, s.email
-        HAVING percentage < %s
-        ORDER BY percentage ASC
-        """
-        records = self.db.fetch_all(query, (threshold,))
+        if threshold == self.alerts.threshold:
+            # Maintained on every write; also honours ALERT_CONFIG['min_sessions']
+            records = self.alerts.at_risk_students()
+        else:
+            records = self.db.fetch_all(LOW_ATTENDANCE_QUERY, (threshold,))
         
         if records:
             headers = records[0].keys()
@@ -259,13 +385,72 @@ class Attendance:
             print(f"✓ No students with attendance below {threshold}%")
             return []
     
-    def mark_bulk_attendance(self, course_id, student_ids, status, remarks=""):
-        """Mark attendance for multiple students at once"""
-        success_count = 0
+    def view_student_streaks(self, student_id):
+        """View current and longest absence/late streaks for a student"""
+        records = self.streaks.student_streaks(student_id)
+        
+        if records:
+            headers = records[0].keys()
+            rows = [list(record.values()) for record in records]
+            print(f"\n=== Attendance Streaks for Student {student_id} ===")
+            print(tabulate(rows, headers=headers, tablefmt="grid"))
+            
+            worst = max(record['current_absent'] for record in records)
+            if worst >= 3:
+                print(f"\n⚠ Currently absent {worst} sessions in a row")
+            
+            return records
+        else:
+            print("No attendance records found")
+            return []
+    
+    def mark_bulk_attendance(self, course_id, student_ids, status, remarks="", attendance_date=None):
+        """Mark attendance for multiple students at once, for today unless attendance_date is given"""
+        if not student_ids:
+            print("No students given")
+            return 0
+        
+        attendance_date = as_date(attendance_date) if attendance_date else date.today()
+        result = self.upsert_attendance((sid, course_id, attendance_date, status, remarks) for sid in student_ids)
+        if result is None:
+            print("\n❌ Bulk attendance failed; no students were marked")
+            return 0
+        
+        marked = result.inserted + result.updated
+        print(f"\n✓ Bulk attendance marked: {marked}/{len(student_ids)} students "
+              f"({result.inserted} new, {result.updated} updated)")
+        return marked
+    
+    def mark_attendance_range(self, course_id, student_ids, start_date, end_date, status,
+                              remarks="", weekdays_only=True):
+        """Mark the same status for every student on every day from start_date to end_date.
+
+        Weekends are skipped unless weekdays_only is False. All rows are
+        written in one transaction, e.g. a three-day school trip marked
+        'excused' for the whole class. Returns the number of rows marked.
+        """
+        start_date, end_date = as_date(start_date), as_date(end_date)
+        if end_date < start_date:
+            print("End date is before start date")
+            return 0
+        if not student_ids:
+            print("No students given")
+            return 0
         
-        for student_id in student_ids:
-            if self.mark_attendance(student_id, course_id, status, remarks):
-                success_count += 1
+        days = [start_date + timedelta(days=n) for n in range((end_date - start_date).days + 1)]
+        if weekdays_only:
+            days = [day for day in days if day.weekday() < 5]
+        if not days:
+            print("No school days in that range")
+            return 0
+        
+        rows = ((sid, course_id, day, status, remarks) for day in days for sid in student_ids)
+        result = self.upsert_attendance(rows)
+        if result is None:
+            print(f"\n❌ Attendance for {start_date} to {end_date} failed; nothing was marked")
+            return 0
         
-        print(f"\n✓ Bulk attendance marked: {success_count}/{len(student_ids)} students")
-        return success_count
\ No newline at end of file
+        marked = result.inserted + result.updated
+        print(f"\n✓ Marked '{status}' for {len(student_ids)} student(s) over {len(days)} day(s): "
+              f"{result.inserted} new, {result.updated} updated")
+        return marked
\ No newline at end of file
@@ -0,0 +1,197 @@
+from collections import defaultdict
+from datetime import timedelta
+from database.connection import DatabaseConnection
+from models.rollup import STATUSES
+
+# Attendance counts per day, ISO week (keyed by its Monday) and month (keyed
+# by its first day), for each course and for the whole school (course_id 0),
+# stored in attendance_calendar. Attendance.upsert_attendance adds the
+# deltas of every write in its own transaction and student/course deletes
+# retract their rows first, so heatmaps and trends over any date range read
+# a few hundred aggregate rows instead of scanning attendance. Rebuild after
+# loading attendance by other means with:
+#     python -m models.attendance_calendar
+
+GRAINS = ('day', 'week', 'month')
+SCHOOL_WIDE = 0
+
+# Periods per rebuild transaction
+REBUILD_BLOCK = {'day': 31, 'week': 8, 'month': 3}
+
+# SQL for the start of the period containing attendance_date
+PERIOD_SQL = {
+    'day': "attendance_date",
+    'week': "DATE_SUB(attendance_date, INTERVAL WEEKDAY(attendance_date) DAY)",
+    'month': "DATE_SUB(attendance_date, INTERVAL DAYOFMONTH(attendance_date) - 1 DAY)",
+}
+
+CALENDAR_DELTA_QUERY = """
+INSERT INTO attendance_calendar (grain, period_start, course_id, total, present, absent, late, excused)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s) AS new
+ON DUPLICATE KEY UPDATE
+    total = total + new.total,
+    present = present + new.present,
+    absent = absent + new.absent,
+    late = late + new.late,
+    excused = excused + new.excused
+"""
+
+CALENDAR_REBUILD_QUERY = """
+INSERT INTO attendance_calendar (grain, period_start, course_id, total, present, absent, late, excused)
+SELECT
+    %s,
+    {period},
+    {course},
+    COUNT(*),
+    SUM(CASE WHEN status = 'present' THEN 1 ELSE 0 END),
+    SUM(CASE WHEN status = 'absent' THEN 1 ELSE 0 END),
+    SUM(CASE WHEN status = 'late' THEN 1 ELSE 0 END),
+    SUM(CASE WHEN status = 'excused' THEN 1 ELSE 0 END)
+FROM attendance_history
+WHERE attendance_date BETWEEN %s AND %s
+GROUP BY 2, 3
+"""
+
+RETRACT_QUERY = """
+SELECT course_id, attendance_date, status, COUNT(*) as sessions
+FROM {table}
+WHERE {column} = %s
+GROUP BY course_id, attendance_date, status
+{lock}
+"""
+
+SERIES_QUERY = """
+SELECT
+    period_start,
+    total,
+    present,
+    absent,
+    late,
+    excused,
+    ROUND((present / total) * 100, 2) as percentage
+FROM attendance_calendar
+WHERE grain = %s AND course_id = %s AND period_start BETWEEN %s AND %s AND total > 0
+ORDER BY period_start
+"""
+
+def period_start(grain, day):
+    """First day of the grain period containing day"""
+    if grain == 'week':
+        return day - timedelta(days=day.weekday())
+    if grain == 'month':
+        return day.replace(day=1)
+    return day
+
+def next_period(grain, start):
+    if grain == 'week':
+        return start + timedelta(days=7)
+    if grain == 'month':
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+def calendar_deltas(changes):
+    """Fold AttendanceWrite.changes into count deltas per (grain, period, course).
+
+    A change whose new status is None retracts the session (see retract()).
+    Changes may carry a sixth element, the number of identical sessions.
+    """
+    deltas = defaultdict(lambda: [0, 0, 0, 0, 0])
+    for change in changes:
+        _, course_id, day, old_status, new_status = change[:5]
+        sessions = change[5] if len(change) > 5 else 1
+        for grain in GRAINS:
+            start = period_start(grain, day)
+            for course in (course_id, SCHOOL_WIDE):
+                delta = deltas[(grain, start, course)]
+                if old_status is None:
+                    delta[0] += sessions
+                else:
+                    delta[1 + STATUSES.index(old_status)] -= sessions
+                if new_status is None:
+                    delta[0] -= sessions
+                else:
+                    delta[1 + STATUSES.index(new_status)] += sessions
+    return [key + tuple(delta) for key, delta in deltas.items() if any(delta)]
+
+class AttendanceCalendar:
+    def __init__(self, db=None):
+        self.db = db or DatabaseConnection()
+
+    def apply(self, changes):
+        """Add the deltas of a batch of attendance changes; returns False on error.
+
+        Call it inside the transaction that wrote the attendance rows so the
+        calendar commits or rolls back with them.
+        """
+        deltas = calendar_deltas(changes)
+        if not deltas:
+            return True
+        return self.db.execute_many(CALENDAR_DELTA_QUERY, deltas) is not None
+
+    def retract(self, column, value):
+        """Subtract the attendance of one student or course before it is deleted.
+
+        column is 'student_id' or 'course_id'. The cascade on attendance
+        does not reach this table, so call it in the same transaction as
+        the DELETE.
+        """
+        # Archived rows never change, so only the hot ones need locking
+        rows = (self.db.fetch_all(RETRACT_QUERY.format(table="attendance", column=column, lock="FOR UPDATE"),
+                                  (value,)) +
+                self.db.fetch_all(RETRACT_QUERY.format(table="attendance_archive", column=column, lock=""),
+                                  (value,)))
+        changes = [(None, row['course_id'], row['attendance_date'], row['status'], None, row['sessions'])
+                   for row in rows]
+        ok = self.apply(changes)
+        if column == 'course_id':
+            ok = self.db.execute_query("DELETE FROM attendance_calendar WHERE course_id = %s",
+                                       (value,)) is not None and ok
+        return ok
+
+    def rebuild(self):
+        """Recompute the calendar from raw attendance, a block of periods per transaction"""
+        bounds = self.db.fetch_one("SELECT MIN(attendance_date) AS first, MAX(attendance_date) AS last "
+                                  "FROM attendance_history")
+        if not bounds or bounds['first'] is None:
+            self.db.execute_query("DELETE FROM attendance_calendar")
+            print("No attendance to aggregate")
+            return False
+
+        print(f"\nRebuilding attendance_calendar for {bounds['first']} to {bounds['last']}...")
+        for grain in GRAINS:
+            start = period_start(grain, bounds['first'])
+            self.db.execute_query(
+                "DELETE FROM attendance_calendar WHERE grain = %s AND (period_start < %s OR period_start > %s)",
+                (grain, start, bounds['last']))
+            while start <= bounds['last']:
+                end = start
+                for _ in range(REBUILD_BLOCK[grain]):
+                    end = next_period(grain, end)
+                last_day = end - timedelta(days=1)
+                with self.db.transaction():
+                    self.db.execute_query(
+                        "DELETE FROM attendance_calendar WHERE grain = %s AND period_start BETWEEN %s AND %s",
+                        (grain, start, last_day))
+                    for course in ("course_id", str(SCHOOL_WIDE)):
+                        query = CALENDAR_REBUILD_QUERY.format(period=PERIOD_SQL[grain], course=course)
+                        self.db.execute_query(query, (grain, start, last_day))
+                    failed = self.db.transaction_failed
+                if failed:
+                    print(f"❌ Rebuild stopped at {grain}s from {start}")
+                    return False
+                start = end
+
+        row = self.db.fetch_one("SELECT COUNT(*) AS periods FROM attendance_calendar")
+        print(f"✓ attendance_calendar rebuilt: {row['periods']} period rows")
+        return True
+
+    # ============ READS ============
+
+    def series(self, grain, start_date, end_date, course_id=None):
+        """Counts per grain period overlapping the range; school-wide unless course_id is given"""
+        course = SCHOOL_WIDE if course_id is None else course_id
+        return self.db.fetch_all(SERIES_QUERY, (grain, course, period_start(grain, start_date), end_date),
+                                 cache=True)
+
+if __name__ == "__main__":
+    AttendanceCalendar().rebuild()
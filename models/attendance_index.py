@@ -0,0 +1,176 @@
+from datetime import timedelta
+from database.connection import DatabaseConnection
+from models.attendance import add_change_listener, remove_change_listener, as_date
+
+# Status of one session as two bits (hi, lo); a separate "marked" plane
+# tells an unmarked day from a present one.
+CODES = {'present': (0, 0), 'late': (0, 1), 'absent': (1, 0), 'excused': (1, 1)}
+STATUSES = {code: status for status, code in CODES.items()}
+
+INDEX_LOAD_QUERY = """
+SELECT student_id, course_id, attendance_date, status
+FROM attendance
+WHERE attendance_date BETWEEN %s AND %s
+"""
+
+class AttendanceIndex:
+    """In-memory attendance for one date window (typically a term).
+
+    Each (student, course) pair is a single Python int holding three bit
+    planes of one bit per day of the window -- marked, hi and lo -- so a
+    180-day term costs about 100 bytes per pair instead of one row or dict
+    per session. Counts are popcounts of plane masks and streaks walk the
+    marked bits, so per-student queries take microseconds; per-student
+    totals are kept alongside so threshold scans never touch the planes.
+
+    attach() subscribes the index to Attendance.upsert_attendance, keeping
+    it current as attendance is marked in this process:
+
+        index = AttendanceIndex.load(date(2024, 1, 15), date(2024, 6, 30))
+        index.attach()
+        index.percentage(17, 4)
+        index.below(75)
+    """
+    def __init__(self, start_date, end_date):
+        self.start = as_date(start_date)
+        self.end = as_date(end_date)
+        self.width = (self.end - self.start).days + 1
+        self._mask = (1 << self.width) - 1
+        self._pairs = {}  # student_id -> {course_id: packed planes}
+        self._totals = {}  # student_id -> [present, marked]
+        self.ignored = 0
+
+    @classmethod
+    def load(cls, start_date, end_date, db=None):
+        """Build an index from the attendance rows in the window, streamed in batches"""
+        index = cls(start_date, end_date)
+        db = db or DatabaseConnection()
+        for row in db.fetch_iter(INDEX_LOAD_QUERY, (index.start, index.end), batch_size=10000):
+            index.set(row['student_id'], row['course_id'], row['attendance_date'], row['status'])
+        return index
+
+    # ============ UPDATES ============
+
+    def _pack(self, marked, hi, lo):
+        return marked | (hi << self.width) | (lo << (2 * self.width))
+
+    def _unpack(self, packed):
+        return (packed & self._mask, (packed >> self.width) & self._mask,
+                packed >> (2 * self.width))
+
+    def set(self, student_id, course_id, attendance_date, status):
+        """Record one session; returns False if the date is outside the window"""
+        offset = (as_date(attendance_date) - self.start).days
+        if not 0 <= offset < self.width:
+            self.ignored += 1
+            return False
+
+        bit = 1 << offset
+        courses = self._pairs.setdefault(student_id, {})
+        marked, hi, lo = self._unpack(courses.get(course_id, 0))
+        totals = self._totals.setdefault(student_id, [0, 0])
+        if marked & bit:
+            if not (hi | lo) & bit:
+                totals[0] -= 1
+        else:
+            totals[1] += 1
+
+        code_hi, code_lo = CODES[status]
+        marked |= bit
+        hi = hi | bit if code_hi else hi & ~bit
+        lo = lo | bit if code_lo else lo & ~bit
+        if status == 'present':
+            totals[0] += 1
+        courses[course_id] = self._pack(marked, hi, lo)
+        return True
+
+    def apply(self, changes):
+        """Fold AttendanceWrite.changes into the index"""
+        for student_id, course_id, attendance_date, _, new_status in changes:
+            self.set(student_id, course_id, attendance_date, new_status)
+
+    def attach(self):
+        add_change_listener(self.apply)
+
+    def detach(self):
+        remove_change_listener(self.apply)
+
+    # ============ QUERIES ============
+
+    def _status_masks(self, student_id, course_id):
+        marked, hi, lo = self._unpack(self._pairs.get(student_id, {}).get(course_id, 0))
+        return {
+            'present': marked & ~hi & ~lo,
+            'late': marked & ~hi & lo,
+            'absent': marked & hi & ~lo,
+            'excused': marked & hi & lo,
+        }, marked
+
+    def status(self, student_id, course_id, attendance_date):
+        offset = (as_date(attendance_date) - self.start).days
+        if not 0 <= offset < self.width:
+            return None
+        marked, hi, lo = self._unpack(self._pairs.get(student_id, {}).get(course_id, 0))
+        if not marked >> offset & 1:
+            return None
+        return STATUSES[(hi >> offset & 1, lo >> offset & 1)]
+
+    def counts(self, student_id, course_id):
+        """Same shape as an attendance_rollup row"""
+        masks, marked = self._status_masks(student_id, course_id)
+        counts = {status: mask.bit_count() for status, mask in masks.items()}
+        counts['total'] = marked.bit_count()
+        return counts
+
+    def percentage(self, student_id, course_id=None):
+        """Share of marked sessions attended as 'present'; None without sessions"""
+        if course_id is None:
+            present, marked = self._totals.get(student_id, (0, 0))
+        else:
+            masks, marked_bits = self._status_masks(student_id, course_id)
+            present, marked = masks['present'].bit_count(), marked_bits.bit_count()
+        return present / marked * 100 if marked else None
+
+    def streaks(self, student_id, course_id, status='absent'):
+        """Return (current, longest) run of consecutive sessions with status"""
+        masks, marked = self._status_masks(student_id, course_id)
+        wanted = masks[status]
+        current = longest = 0
+        while marked:
+            bit = marked & -marked
+            marked ^= bit
+            if wanted & bit:
+                current += 1
+                longest = max(longest, current)
+            else:
+                current = 0
+        return current, longest
+
+    def below(self, threshold=75):
+        """Students whose overall percentage is under threshold, lowest first.
+
+        Returns (student_id, present, total, percentage) tuples, matching
+        Attendance.get_low_attendance_students.
+        """
+        low = [(student_id, present, marked, present / marked * 100)
+               for student_id, (present, marked) in self._totals.items()
+               if marked and present / marked * 100 < threshold]
+        low.sort(key=lambda row: row[3])
+        return low
+
+    def sessions(self, student_id, course_id):
+        """Dates marked for the pair, oldest first"""
+        marked, _, _ = self._unpack(self._pairs.get(student_id, {}).get(course_id, 0))
+        dates = []
+        while marked:
+            bit = marked & -marked
+            marked ^= bit
+            dates.append(self.start + timedelta(days=bit.bit_length() - 1))
+        return dates
+
+    def stats(self):
+        pairs = sum(len(courses) for courses in self._pairs.values())
+        sessions = sum((packed & self._mask).bit_count()
+                       for courses in self._pairs.values() for packed in courses.values())
+        return {'students': len(self._pairs), 'pairs': pairs, 'sessions': sessions,
+                'days': self.width, 'ignored': self.ignored}
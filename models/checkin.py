@@ -0,0 +1,223 @@
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from config import CHECKIN_CONFIG
+from models.attendance import Attendance
+
+# Card readers append one JSON object per line:
+#     {"student_id": 17, "course_id": 4, "ts": "2024-03-04T09:02:11"}
+# ts may also be a Unix timestamp. Run with:
+#     python -m models.checkin reader1.jsonl reader2.jsonl [--follow]
+
+def _parse_ts(value):
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value)
+    ts = datetime.fromisoformat(value)
+    if ts.tzinfo is not None:
+        # Readers in UTC; sessions are scheduled in local time
+        ts = ts.astimezone().replace(tzinfo=None)
+    return ts
+
+def _parse_time(value):
+    hours, minutes = value.split(':')
+    return timedelta(hours=int(hours), minutes=int(minutes))
+
+class CheckinIngestor:
+    """Turns card-reader swipe logs into attendance rows.
+
+    The earliest swipe per (student, course, day) wins: a batch keeps the
+    minimum timestamp of each key whatever order the reader files are read
+    in, and it is classified as present or late against the session start
+    when the batch is written. Events are written in micro-batches through
+    Attendance.upsert_attendance with replace=False, so a swipe never
+    overwrites a mark a teacher or an earlier batch already made, and
+    replaying events after a crash is harmless. After each batch is
+    committed the byte offset reached in every file is saved to the
+    checkpoint file, so a restart resumes where the last committed batch
+    ended.
+
+    Memory is bounded by the batch size.
+    """
+    def __init__(self, paths, checkpoint_file=None, batch_size=None, flush_interval=None,
+                 attendance=None):
+        self.paths = [os.path.abspath(path) for path in paths]
+        self.checkpoint_file = checkpoint_file or CHECKIN_CONFIG['checkpoint_file']
+        self.batch_size = batch_size or CHECKIN_CONFIG['batch_size']
+        self.flush_interval = flush_interval or CHECKIN_CONFIG['flush_interval']
+        self.grace = timedelta(minutes=CHECKIN_CONFIG['late_after_minutes'])
+        self.default_start = _parse_time(CHECKIN_CONFIG['session_start'])
+        self.session_starts = {int(course_id): _parse_time(start)
+                               for course_id, start in CHECKIN_CONFIG['session_starts'].items()}
+        self.attendance = attendance or Attendance()
+        self.db = self.attendance.db
+        self.offsets = self._load_checkpoint()
+        self._read_offsets = dict(self.offsets)
+        self._pending = {}
+        self._last_flush = time.monotonic()
+        self.stats = {'events': 0, 'duplicates': 0, 'rejected': 0, 'inserted': 0,
+                      'skipped': 0, 'batches': 0}
+
+    # ============ CHECKPOINTS ============
+
+    def _load_checkpoint(self):
+        if not os.path.exists(self.checkpoint_file):
+            return {}
+        try:
+            with open(self.checkpoint_file) as handle:
+                return json.load(handle)
+        except (OSError, ValueError) as e:
+            print(f"⚠ Ignoring unreadable checkpoint {self.checkpoint_file}: {e}")
+            return {}
+
+    def _save_checkpoint(self):
+        # Write then rename, so a crash never leaves a half-written file
+        temp = self.checkpoint_file + ".tmp"
+        with open(temp, 'w') as handle:
+            json.dump(self.offsets, handle, indent=2)
+        os.replace(temp, self.checkpoint_file)
+
+    # ============ EVENTS ============
+
+    def classify(self, course_id, ts):
+        """'present' up to the grace period after the session start, else 'late'"""
+        start = self.session_starts.get(course_id, self.default_start)
+        since_midnight = ts - ts.replace(hour=0, minute=0, second=0, microsecond=0)
+        return 'present' if since_midnight <= start + self.grace else 'late'
+
+    def add_event(self, event):
+        """Queue one decoded swipe; returns False if it was rejected or a duplicate"""
+        try:
+            student_id = int(event['student_id'])
+            course_id = int(event['course_id'])
+            ts = _parse_ts(event['ts'])
+        except (KeyError, TypeError, ValueError):
+            self.stats['rejected'] += 1
+            return False
+
+        self.stats['events'] += 1
+        key = (student_id, course_id, ts.date())
+        first = self._pending.get(key)
+        if first is not None:
+            self.stats['duplicates'] += 1
+            if ts >= first:
+                return False
+        self._pending[key] = ts
+        return True
+
+    def _read_file(self, path, limit):
+        """Queue up to limit complete lines from path; returns the number read"""
+        offset = self._read_offsets.get(path, 0)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return 0
+        if size < offset:
+            print(f"⚠ {path} was truncated; reading it from the start")
+            offset = 0
+        if size == offset:
+            return 0
+
+        count = 0
+        with open(path, 'rb') as handle:
+            handle.seek(offset)
+            while count < limit:
+                line = handle.readline()
+                if not line.endswith(b"\n"):
+                    # Partial line still being written; pick it up next time
+                    break
+                offset += len(line)
+                count += 1
+                if not line.strip():
+                    continue
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    self.stats['rejected'] += 1
+                    continue
+                self.add_event(event)
+        self._read_offsets[path] = offset
+        return count
+
+    # ============ WRITES ============
+
+    def _existing_ids(self, table, column, ids):
+        """Return the subset of ids present in table.
+
+        Checked again on every flush rather than cached: a student or course
+        deleted after it was first seen would otherwise fail every retry of
+        the batch on its foreign key and stall ingestion.
+        """
+        ids = sorted(ids)
+        placeholders = ", ".join(["%s"] * len(ids))
+        rows = self.db.fetch_all(f"SELECT {column} FROM {table} WHERE {column} IN ({placeholders})", ids)
+        return {row[column] for row in rows}
+
+    def flush(self):
+        """Write the pending batch and checkpoint; returns False if the write failed"""
+        self._last_flush = time.monotonic()
+        if self._pending:
+            # A single unknown id would fail the whole batch on its foreign
+            # key, so drop those events up front
+            students = self._existing_ids('students', 'student_id', {key[0] for key in self._pending})
+            courses = self._existing_ids('courses', 'course_id', {key[1] for key in self._pending})
+            rows = [key + (self.classify(key[1], ts), "card reader") for key, ts in self._pending.items()
+                    if key[0] in students and key[1] in courses]
+            self.stats['rejected'] += len(self._pending) - len(rows)
+
+            result = self.attendance.upsert_attendance(rows, replace=False)
+            if result is None:
+                print("❌ Check-in batch failed; offsets were not advanced")
+                return False
+            self.stats['inserted'] += result.inserted
+            self.stats['skipped'] += result.skipped
+            self.stats['batches'] += 1
+            self._pending = {}
+
+        if self.offsets != self._read_offsets:
+            self.offsets = dict(self._read_offsets)
+            self._save_checkpoint()
+        return True
+
+    def run(self, follow=False):
+        """Ingest every file; with follow=True keep polling for new lines until interrupted"""
+        started = time.monotonic()
+        try:
+            while True:
+                read = 0
+                for path in self.paths:
+                    read += self._read_file(path, self.batch_size - len(self._pending))
+                    if len(self._pending) >= self.batch_size and not self.flush():
+                        return False
+
+                if time.monotonic() - self._last_flush >= self.flush_interval and not self.flush():
+                    return False
+                if not read:
+                    if not follow:
+                        break
+                    time.sleep(CHECKIN_CONFIG['poll_interval'])
+        except KeyboardInterrupt:
+            print("\nStopping; writing the last batch...")
+
+        ok = self.flush()
+        self.print_summary(time.monotonic() - started)
+        return ok
+
+    def print_summary(self, elapsed):
+        stats = self.stats
+        rate = stats['events'] / elapsed if elapsed else 0
+        print(f"\n✓ {stats['events']:,} swipes in {elapsed:.1f}s ({rate:,.0f}/s): "
+              f"{stats['inserted']:,} marked, {stats['skipped']:,} already marked, "
+              f"{stats['duplicates']:,} duplicates, {stats['rejected']:,} rejected, "
+              f"{stats['batches']} batch(es)")
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Ingest card-reader check-in logs into attendance")
+    parser.add_argument('paths', nargs='+', help="JSON-lines files written by the card readers")
+    parser.add_argument('--follow', action='store_true', help="keep tailing the files for new swipes")
+    parser.add_argument('--checkpoint', help="checkpoint file (default from CHECKIN_CONFIG)")
+    parser.add_argument('--batch-size', type=int)
+    args = parser.parse_args()
+    ok = CheckinIngestor(args.paths, args.checkpoint, args.batch_size).run(args.follow)
+    raise SystemExit(0 if ok else 1)
@@ -0,0 +1,257 @@
+from database.connection import DatabaseConnection
+
+# The one GPA definition: each score maps to banded grade points (the
+# scale below), weighted by course credits. student_term_summary holds
+# credits and quality points per (student, semester, year) and student_gpa
+# the cumulative totals. AcademicRecord grade writes add their deltas in
+# the same transaction (apply), so readers cost O(terms), not O(records).
+# Rebuilds are set-based over academic_records joined to courses, a block
+# of students per statement. Recompute with:
+#     python -m models.gpa              every student
+#     python -m models.gpa 17 42 108    selected students
+
+# (lowest score, grade points), highest band first
+GRADE_POINT_SCALE = [(90, 4.0), (80, 3.0), (70, 2.0), (60, 1.0), (0, 0.0)]
+
+def grade_points(score):
+    """Grade points on the 4.0 scale for a percentage score"""
+    for floor, points in GRADE_POINT_SCALE:
+        if score >= floor:
+            return points
+    return 0.0
+
+GRADE_POINTS_SQL = ("CASE " + " ".join(f"WHEN ar.score >= {floor} THEN {points}"
+                                        for floor, points in GRADE_POINT_SCALE[:-1])
+                    + f" ELSE {GRADE_POINT_SCALE[-1][1]} END")
+
+# Records without a score carry no grade points and are left out
+TERM_SUMMARY_SELECT = f"""
+SELECT
+    ar.student_id,
+    COALESCE(ar.semester, '') as semester,
+    COALESCE(ar.year, 0) as year,
+    COUNT(*) as courses,
+    SUM(COALESCE(c.credits, 0)) as credits,
+    SUM(COALESCE(c.credits, 0) * {GRADE_POINTS_SQL}) as quality_points,
+    SUM(ar.score) as score_total
+FROM academic_records ar
+JOIN courses c ON ar.course_id = c.course_id
+WHERE ar.score IS NOT NULL AND {{students}}
+GROUP BY ar.student_id, COALESCE(ar.semester, ''), COALESCE(ar.year, 0)
+"""
+
+TERM_SUMMARY_REBUILD_QUERY = f"""
+INSERT INTO student_term_summary
+(student_id, semester, year, courses, credits, quality_points, score_total, gpa)
+SELECT t.*, ROUND(t.quality_points / NULLIF(t.credits, 0), 2)
+FROM ({TERM_SUMMARY_SELECT}) t
+"""
+
+TERM_DELTA_QUERY = """
+INSERT INTO student_term_summary (student_id, semester, year, courses, credits, quality_points, score_total, gpa)
+VALUES (%s, %s, %s, %s, %s, %s, %s, ROUND(%s / NULLIF(%s, 0), 2)) AS new
+ON DUPLICATE KEY UPDATE
+    courses = courses + new.courses,
+    credits = credits + new.credits,
+    quality_points = quality_points + new.quality_points,
+    score_total = score_total + new.score_total,
+    gpa = ROUND(quality_points / NULLIF(credits, 0), 2)
+"""
+
+GPA_REBUILD_QUERY = """
+INSERT INTO student_gpa (student_id, terms, courses, credits, quality_points, score_total, gpa)
+SELECT
+    student_id,
+    COUNT(*),
+    SUM(courses),
+    SUM(credits),
+    SUM(quality_points),
+    SUM(score_total),
+    ROUND(SUM(quality_points) / NULLIF(SUM(credits), 0), 2)
+FROM student_term_summary
+WHERE {students}
+GROUP BY student_id
+"""
+
+# Same definition straight from academic_records, for one student
+LIVE_GPA_QUERY = f"""
+SELECT
+    COUNT(*) as courses,
+    COALESCE(SUM(COALESCE(c.credits, 0)), 0) as credits,
+    SUM(COALESCE(c.credits, 0) * {GRADE_POINTS_SQL}) as quality_points,
+    ROUND(SUM(COALESCE(c.credits, 0) * {GRADE_POINTS_SQL}) / NULLIF(SUM(COALESCE(c.credits, 0)), 0), 2) as gpa,
+    ROUND(AVG(ar.score), 2) as average_score
+FROM academic_records ar
+JOIN courses c ON ar.course_id = c.course_id
+WHERE ar.student_id = %s AND ar.score IS NOT NULL
+"""
+
+STUDENT_GPA_QUERY = """
+SELECT
+    student_id,
+    terms,
+    courses,
+    credits,
+    quality_points,
+    gpa,
+    ROUND(score_total / courses, 2) as average_score
+FROM student_gpa
+WHERE student_id = %s
+"""
+
+STUDENT_TERMS_QUERY = """
+SELECT
+    semester,
+    year,
+    courses,
+    credits,
+    quality_points,
+    gpa,
+    ROUND(score_total / courses, 2) as average_score
+FROM student_term_summary
+WHERE student_id = %s
+ORDER BY year, semester
+"""
+
+ID_CHUNK = 1000
+
+# Called after every committed grade write with (student_id, course_id,
+# semester, year) per record touched, for in-process consumers such as
+# Rankings; course_id, semester and year are None when a whole student is
+# removed
+_grade_listeners = []
+
+def add_grade_listener(listener):
+    _grade_listeners.append(listener)
+
+def remove_grade_listener(listener):
+    if listener in _grade_listeners:
+        _grade_listeners.remove(listener)
+
+def notify_grade_listeners(changes):
+    changes = list(changes)
+    if changes:
+        for listener in list(_grade_listeners):
+            listener(changes)
+
+def record_delta(student_id, semester, year, credits, score, sign=1):
+    """Summary delta of adding (sign=1) or removing (sign=-1) one graded record; None without a score"""
+    if score is None:
+        return None
+    credits, score = credits or 0, float(score)
+    return (student_id, semester or '', year or 0, sign, sign * credits,
+            sign * credits * grade_points(score), sign * score)
+
+class GpaEngine:
+    def __init__(self, db=None):
+        self.db = db or DatabaseConnection()
+
+    def _replace(self, condition, params):
+        """Recompute the summaries of the students matched by condition, a template on {column}"""
+        students = condition.format(column='student_id')
+        with self.db.transaction():
+            for table in ('student_gpa', 'student_term_summary'):
+                self.db.execute_query(f"DELETE FROM {table} WHERE {students}", params)
+            records = condition.format(column='ar.student_id')
+            self.db.execute_query(TERM_SUMMARY_REBUILD_QUERY.format(students=records), params)
+            self.db.execute_query(GPA_REBUILD_QUERY.format(students=students), params)
+            failed = self.db.transaction_failed
+        return not failed
+
+    def apply(self, deltas):
+        """Add record deltas to the term summaries and refresh the students' cumulative GPA.
+
+        Run inside the transaction that wrote the academic records; returns
+        False on error. Cumulative rows are re-derived from the students'
+        term rows, which is O(terms) per student.
+        """
+        totals = {}
+        for delta in deltas:
+            if delta is None:
+                continue
+            key, values = delta[:3], delta[3:]
+            current = totals.get(key)
+            totals[key] = values if current is None else tuple(a + b for a, b in zip(current, values))
+        if not totals:
+            return True
+
+        rows = [key + values + (values[2], values[1]) for key, values in totals.items()]
+        ok = self.db.execute_many(TERM_DELTA_QUERY, rows) is not None
+        student_ids = sorted({key[0] for key in totals})
+        for start in range(0, len(student_ids), ID_CHUNK):
+            chunk = student_ids[start:start + ID_CHUNK]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            # A record moved to another term can leave an empty one behind
+            ok = self.db.execute_query(f"DELETE FROM student_term_summary WHERE student_id IN ({placeholders}) "
+                                       f"AND courses <= 0", chunk) is not None and ok
+            ok = self.db.execute_query(f"DELETE FROM student_gpa WHERE student_id IN ({placeholders})",
+                                       chunk) is not None and ok
+            ok = self.db.execute_query(GPA_REBUILD_QUERY.format(students=f"student_id IN ({placeholders})"),
+                                       chunk) is not None and ok
+        return ok
+
+    def rebuild(self, student_ids=None, batch_size=1000):
+        """Recompute term and cumulative GPA for every student, or only student_ids.
+
+        Each block of students is replaced in one transaction by two
+        INSERT ... SELECT statements, so a full run costs one round trip
+        per block rather than several per student.
+        """
+        if student_ids is not None:
+            student_ids = sorted(set(student_ids))
+            for start in range(0, len(student_ids), ID_CHUNK):
+                chunk = student_ids[start:start + ID_CHUNK]
+                placeholders = ", ".join(["%s"] * len(chunk))
+                if not self._replace(f"{{column}} IN ({placeholders})", chunk):
+                    print(f"❌ GPA rebuild failed for students {chunk[0]}-{chunk[-1]}")
+                    return False
+            return True
+
+        bounds = self.db.fetch_one("SELECT MIN(student_id) AS low, MAX(student_id) AS high FROM students")
+        if not bounds or bounds['low'] is None:
+            print("No students to grade")
+            return False
+
+        print(f"\nRebuilding GPA summaries for students {bounds['low']}-{bounds['high']}...")
+        for low in range(bounds['low'], bounds['high'] + 1, batch_size):
+            high = low + batch_size - 1
+            if not self._replace("{column} BETWEEN %s AND %s", (low, high)):
+                print(f"❌ Rebuild stopped at students {low}-{high}")
+                return False
+
+        row = self.db.fetch_one("SELECT COUNT(*) AS students, COALESCE(SUM(terms), 0) AS terms FROM student_gpa")
+        print(f"✓ GPA summaries rebuilt: {row['students']} students, {row['terms']} student terms")
+        return True
+
+    # ============ READS ============
+
+    def student_gpa(self, student_id):
+        """Cumulative credit-weighted GPA row, or None without graded records"""
+        return self.db.fetch_one(STUDENT_GPA_QUERY, (student_id,), cache=True)
+
+    def live_gpa(self, student_id):
+        """Cumulative GPA computed from academic_records rather than student_gpa"""
+        return self.db.fetch_one(LIVE_GPA_QUERY, (student_id,))
+
+    def term_gpas(self, student_id):
+        return self.db.fetch_all(STUDENT_TERMS_QUERY, (student_id,), cache=True)
+
+    def gpas(self, student_ids):
+        """{student_id: gpa} for many students, one query per ID_CHUNK ids"""
+        student_ids = list(student_ids)
+        result = {}
+        for start in range(0, len(student_ids), ID_CHUNK):
+            chunk = student_ids[start:start + ID_CHUNK]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            query = f"SELECT student_id, gpa FROM student_gpa WHERE student_id IN ({placeholders})"
+            for row in self.db.fetch_all(query, chunk):
+                result[row['student_id']] = row['gpa']
+        return result
+
+if __name__ == "__main__":
+    import sys
+    ids = [int(arg) for arg in sys.argv[1:]]
+    ok = GpaEngine().rebuild(ids or None)
+    if ok and ids:
+        print(f"✓ GPA summaries rebuilt for {len(set(ids))} student(s)")
+    raise SystemExit(0 if ok else 1)
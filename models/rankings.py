@@ -0,0 +1,233 @@
+from bisect import bisect_left, bisect_right, insort
+from heapq import nlargest
+from database.connection import DatabaseConnection
+from models.gpa import add_grade_listener, remove_grade_listener
+
+# Class rank and percentile of a student within a scope:
+#     ('cohort', 2021)            cumulative GPA among students enrolled in 2021
+#     ('course', 4)               best score in course 4
+#     ('semester', 'Fall', 2024)  term GPA for Fall 2024
+# Ranks are dense (ties share a rank, the next value takes the next rank)
+# and the percentile is the share of the scope at or below the student.
+
+COHORT_BOARD_QUERY = """
+SELECT g.student_id, g.gpa AS value
+FROM student_gpa g
+JOIN students s ON g.student_id = s.student_id
+WHERE s.enrollment_date >= %s AND s.enrollment_date < %s AND g.gpa IS NOT NULL
+"""
+
+COURSE_BOARD_QUERY = """
+SELECT student_id, MAX(score) AS value
+FROM academic_records
+WHERE course_id = %s AND score IS NOT NULL {students}
+GROUP BY student_id
+"""
+
+SEMESTER_BOARD_QUERY = """
+SELECT student_id, gpa AS value
+FROM student_term_summary
+WHERE semester = %s AND year = %s AND gpa IS NOT NULL {students}
+"""
+
+STUDENT_COHORT_QUERY = """
+SELECT s.student_id, YEAR(s.enrollment_date) AS cohort, g.gpa AS value
+FROM students s
+LEFT JOIN student_gpa g ON g.student_id = s.student_id
+WHERE s.student_id IN ({ids})
+"""
+
+STUDENT_SCOPES_QUERY = """
+SELECT DISTINCT ar.course_id, COALESCE(ar.semester, '') AS semester, COALESCE(ar.year, 0) AS year
+FROM academic_records ar
+WHERE ar.student_id = %s AND ar.score IS NOT NULL
+"""
+
+ID_CHUNK = 1000
+
+class Leaderboard:
+    """Values of one scope with a sorted index for O(log n) rank lookups.
+
+    _sorted holds every value and _distinct each value once, both
+    ascending, so a dense rank is a bisect into _distinct and a percentile
+    a bisect into _sorted. set() moves one student in place.
+    """
+    def __init__(self, rows=()):
+        self._values = {key: float(value) for key, value in rows if value is not None}
+        self._sorted = sorted(self._values.values())
+        self._distinct = sorted(set(self._sorted))
+
+    def __len__(self):
+        return len(self._values)
+
+    def set(self, key, value):
+        """Store key's new value; None removes it from the board"""
+        old = self._values.pop(key, None)
+        if old is not None:
+            del self._sorted[bisect_left(self._sorted, old)]
+            index = bisect_left(self._sorted, old)
+            if index == len(self._sorted) or self._sorted[index] != old:
+                del self._distinct[bisect_left(self._distinct, old)]
+        if value is None:
+            return
+        value = float(value)
+        self._values[key] = value
+        index = bisect_left(self._sorted, value)
+        if index == len(self._sorted) or self._sorted[index] != value:
+            insort(self._distinct, value)
+        self._sorted.insert(index, value)
+
+    def rank(self, key):
+        """{'rank', 'percentile', 'of', 'value'} for key, or None if it is not on the board"""
+        value = self._values.get(key)
+        if value is None:
+            return None
+        return {
+            'rank': len(self._distinct) - bisect_right(self._distinct, value) + 1,
+            'percentile': round(bisect_right(self._sorted, value) / len(self._sorted) * 100, 2),
+            'of': len(self._sorted),
+            'value': value,
+        }
+
+    def top(self, limit=10):
+        """[(rank, key, value)] for the highest values"""
+        leaders = nlargest(limit, self._values.items(), key=lambda item: item[1])
+        return [(self.rank(key)['rank'], key, value) for key, value in leaders]
+
+class Rankings:
+    """Leaderboards per scope, loaded on first use and cached.
+
+    Each board is one query when first asked for; after that lookups are
+    bisects in memory and take microseconds. attach() subscribes to grade
+    writes made through AcademicRecord in this process: the cached boards
+    those writes touch are refreshed for the affected students only, by
+    reading their new values after the summaries have committed.
+
+        rankings = Rankings()
+        rankings.attach()
+        rankings.rank(('semester', 'Fall', 2024), 17)
+        rankings.leaderboard(('cohort', 2021))
+
+    Writes from other processes are not seen; call clear() to reload.
+    """
+    def __init__(self, db=None):
+        self.db = db or DatabaseConnection()
+        self._boards = {}
+
+    def _load(self, scope):
+        kind = scope[0]
+        if kind == 'cohort':
+            year = scope[1]
+            rows = self.db.fetch_all(COHORT_BOARD_QUERY, (f"{year}-01-01", f"{year + 1}-01-01"))
+        elif kind == 'course':
+            rows = self.db.fetch_all(COURSE_BOARD_QUERY.format(students=""), (scope[1],))
+        elif kind == 'semester':
+            rows = self.db.fetch_all(SEMESTER_BOARD_QUERY.format(students=""), (scope[1] or '', scope[2] or 0))
+        else:
+            raise ValueError(f"Unknown ranking scope {scope!r}")
+        return Leaderboard((row['student_id'], row['value']) for row in rows)
+
+    def board(self, scope):
+        """The cached Leaderboard for scope, loading it on first use"""
+        if scope[0] == 'semester':
+            scope = ('semester', scope[1] or '', int(scope[2] or 0))
+        elif scope[0] in ('cohort', 'course'):
+            scope = (scope[0], int(scope[1]))
+        board = self._boards.get(scope)
+        if board is None:
+            board = self._boards[scope] = self._load(scope)
+        return board
+
+    def rank(self, scope, student_id):
+        return self.board(scope).rank(student_id)
+
+    def leaderboard(self, scope, limit=10):
+        return self.board(scope).top(limit)
+
+    def student_ranks(self, student_id):
+        """Rank in the student's cohort and in every course and semester they were graded in"""
+        cohort = self.db.fetch_all(STUDENT_COHORT_QUERY.format(ids="%s"), (student_id,))
+        scopes = [('cohort', row['cohort']) for row in cohort if row['cohort'] is not None]
+        terms = self.db.fetch_all(STUDENT_SCOPES_QUERY, (student_id,))
+        scopes += sorted({('course', row['course_id']) for row in terms})
+        scopes += sorted({('semester', row['semester'], row['year']) for row in terms},
+                         key=lambda scope: (scope[2], scope[1]))
+        ranks = []
+        for scope in scopes:
+            rank = self.rank(scope, student_id)
+            if rank:
+                ranks.append((scope, rank))
+        return ranks
+
+    # ============ UPDATES ============
+
+    def _refresh(self, scope, student_ids, query, params):
+        """Re-read the values of student_ids on one cached board"""
+        board = self._boards[scope]
+        for start in range(0, len(student_ids), ID_CHUNK):
+            chunk = student_ids[start:start + ID_CHUNK]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            values = {row['student_id']: row['value'] for row in
+                      self.db.fetch_all(query.format(students=f"AND student_id IN ({placeholders})"),
+                                        params + tuple(chunk))}
+            for student_id in chunk:
+                board.set(student_id, values.get(student_id))
+
+    def apply(self, changes):
+        """Bring the cached boards up to date with a batch of grade changes (see models.gpa)"""
+        if not self._boards:
+            return
+        students = sorted({change[0] for change in changes})
+        removed = {change[0] for change in changes if change[1] is None}
+        for student_id in removed:
+            for board in self._boards.values():
+                board.set(student_id, None)
+
+        courses, terms = {}, {}
+        for student_id, course_id, semester, year in changes:
+            if student_id not in removed:
+                courses.setdefault(course_id, set()).add(student_id)
+                terms.setdefault((semester or '', year or 0), set()).add(student_id)
+        for course_id, student_ids in courses.items():
+            if ('course', course_id) in self._boards:
+                self._refresh(('course', course_id), sorted(student_ids), COURSE_BOARD_QUERY, (course_id,))
+        for (semester, year), student_ids in terms.items():
+            if ('semester', semester, year) in self._boards:
+                self._refresh(('semester', semester, year), sorted(student_ids), SEMESTER_BOARD_QUERY,
+                              (semester, year))
+
+        cohorts = [scope for scope in self._boards if scope[0] == 'cohort']
+        students = [student_id for student_id in students if student_id not in removed]
+        if not cohorts or not students:
+            return
+        for start in range(0, len(students), ID_CHUNK):
+            chunk = students[start:start + ID_CHUNK]
+            query = STUDENT_COHORT_QUERY.format(ids=", ".join(["%s"] * len(chunk)))
+            for row in self.db.fetch_all(query, chunk):
+                board = self._boards.get(('cohort', row['cohort']))
+                if board is not None:
+                    board.set(row['student_id'], row['value'])
+
+    def attach(self):
+        add_grade_listener(self.apply)
+
+    def detach(self):
+        remove_grade_listener(self.apply)
+
+    def clear(self):
+        """Drop every cached board; each reloads on its next lookup"""
+        self._boards.clear()
+
+if __name__ == "__main__":
+    import sys
+    from tabulate import tabulate
+    if len(sys.argv) != 2:
+        print("Usage: python -m models.rankings STUDENT_ID")
+        raise SystemExit(2)
+    ranks = Rankings().student_ranks(int(sys.argv[1]))
+    if not ranks:
+        print("No graded records to rank")
+        raise SystemExit(1)
+    rows = [[" ".join(str(part) for part in scope), rank['value'], f"{rank['rank']} of {rank['of']}",
+             f"{rank['percentile']:.1f}"] for scope, rank in ranks]
+    print(tabulate(rows, headers=['Scope', 'Value', 'Rank', 'Percentile'], tablefmt="grid"))
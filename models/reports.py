@@ -1,16 +1,63 @@
 from database.connection import DatabaseConnection
+from models.student import STUDENT_BY_ID_QUERY
+from models.streaks import StreakEngine
+from models.attendance import as_date
+from models.attendance_calendar import AttendanceCalendar, period_start
+from models.gpa import GpaEngine
+from models.rankings import Rankings
+from models.academic import course_score_stats
+from utils.stats import histogram_bars
 from tabulate import tabulate
+from datetime import timedelta
+
+# Read queries shared with the async layer (models/async_reads.py)
+STUDENT_ACADEMIC_SUMMARY_QUERY = """
+SELECT 
+    COUNT(*) as total_courses,
+    AVG(score) as avg_score,
+    MAX(score) as highest_score,
+    MIN(score) as lowest_score
+FROM academic_records
+WHERE student_id = %s
+"""
+
+STUDENT_ATTENDANCE_TOTALS_QUERY = """
+SELECT 
+    COALESCE(SUM(total), 0) as total_classes,
+    COALESCE(SUM(present), 0) as present,
+    ROUND((SUM(present) / SUM(total)) * 100, 2) as percentage
+FROM attendance_rollup
+WHERE student_id = %s
+"""
+
+STUDENT_OUTCOME_COUNTS_QUERY = """
+SELECT 
+    achievement_level,
+    COUNT(*) as count
+FROM learning_outcomes
+WHERE student_id = %s
+GROUP BY achievement_level
+"""
+
+STUDENT_DOCUMENT_COUNT_QUERY = "SELECT COUNT(*) as doc_count FROM documents WHERE student_id = %s"
+
+# Heatmap shading by present rate, darkest first
+HEATMAP_SHADES = [(90, '█'), (75, '▓'), (60, '▒'), (0, '░')]
 
 class Reports:
-    def __init__(self):
+    def __init__(self, rankings=None):
         self.db = DatabaseConnection()
         self.db.connect()
+        self.streaks = StreakEngine(self.db)
+        self.calendar = AttendanceCalendar(self.db)
+        self.gpa = GpaEngine(self.db)
+        # Pass the application's attached Rankings to share its cached boards
+        self.rankings = rankings or Rankings(self.db)
     
     def generate_student_report(self, student_id):
         """Generate comprehensive performance report for a student"""
         # Get student info
-        student_query = "SELECT * FROM students WHERE student_id = %s"
-        student = self.db.fetch_one(student_query, (student_id,))
+        student = self.db.fetch_one(STUDENT_BY_ID_QUERY, (student_id,), prepared=True, cache=True)
         
         if not student:
             print(f"Student {student_id} not found!")
@@ -27,20 +74,11 @@ class Reports:
         print("\n" + "-"*80)
         
         # Academic Performance
-        academic_query = """
-        SELECT 
-            COUNT(*) as total_courses,
-            AVG(score) as avg_score,
-            MAX(score) as highest_score,
-            MIN(score) as lowest_score
-        FROM academic_records
-        WHERE student_id = %s
-        """
-        academic = self.db.fetch_one(academic_query, (student_id,))
+        academic = self.db.fetch_one(STUDENT_ACADEMIC_SUMMARY_QUERY, (student_id,))
+        summary = self.gpa.student_gpa(student_id)
+        gpa = float(summary['gpa']) if summary and summary['gpa'] is not None else 0.0
         
         if academic and academic['total_courses'] > 0:
-            gpa = (academic['avg_score'] / 100) * 4.0
-            
             print("\n ACADEMIC PERFORMANCE")
             print(f"Total Courses Completed: {academic['total_courses']}")
             print(f"Average Score: {academic['avg_score']:.2f}%")
@@ -52,15 +90,7 @@ class Reports:
             print("No academic records available")
         
         # Attendance
-        attendance_query = """
-        SELECT 
-            COUNT(*) as total_classes,
-            SUM(CASE WHEN status = 'present' THEN 1 ELSE 0 END) as present,
-            ROUND((SUM(CASE WHEN status = 'present' THEN 1 ELSE 0 END) / COUNT(*)) * 100, 2) as percentage
-        FROM attendance
-        WHERE student_id = %s
-        """
-        attendance = self.db.fetch_one(attendance_query, (student_id,))
+        attendance = self.db.fetch_one(STUDENT_ATTENDANCE_TOTALS_QUERY, (student_id,))
         
         print("\n ATTENDANCE")
         if attendance and attendance['total_classes'] > 0:
@@ -78,15 +108,7 @@ class Reports:
             print("No attendance records available")
         
         # Learning Outcomes
-        outcomes_query = """
-        SELECT 
-            achievement_level,
-            COUNT(*) as count
-        FROM learning_outcomes
-        WHERE student_id = %s
-        GROUP BY achievement_level
-        """
-        outcomes = self.db.fetch_all(outcomes_query, (student_id,))
+        outcomes = self.db.fetch_all(STUDENT_OUTCOME_COUNTS_QUERY, (student_id,))
         
         print("\n LEARNING OUTCOMES")
         if outcomes:
@@ -100,8 +122,7 @@ class Reports:
             print("No learning outcomes assessed")
         
         # Documents
-        docs_query = "SELECT COUNT(*) as doc_count FROM documents WHERE student_id = %s"
-        docs = self.db.fetch_one(docs_query, (student_id,))
+        docs = self.db.fetch_one(STUDENT_DOCUMENT_COUNT_QUERY, (student_id,))
         
         print("\n DOCUMENTS")
         print(f"Total Documents on File: {docs['doc_count'] if docs else 0}")
@@ -111,7 +132,6 @@ class Reports:
         # Overall Assessment
         print("\n OVERALL ASSESSMENT")
         if academic and academic['total_courses'] > 0:
-            gpa = (academic['avg_score'] / 100) * 4.0
             att_pct = attendance['percentage'] if attendance and attendance['total_classes'] > 0 else 0
             
             if gpa >= 3.5 and att_pct >= 90:
@@ -131,7 +151,7 @@ class Reports:
         """Generate report for a specific course"""
         # Get course info
         course_query = "SELECT * FROM courses WHERE course_id = %s"
-        course = self.db.fetch_one(course_query, (course_id,))
+        course = self.db.fetch_one(course_query, (course_id,), cache=True)
         
         if not course:
             print(f"Course {course_id} not found!")
@@ -189,13 +209,20 @@ class Reports:
                 print(f"  C (70-79):  {performance['c_count']} ({(performance['c_count']/total)*100:.1f}%)")
                 print(f"  D (60-69):  {performance['d_count']} ({(performance['d_count']/total)*100:.1f}%)")
                 print(f"  F (0-59):   {performance['f_count']} ({(performance['f_count']/total)*100:.1f}%)")
+            
+            for _, scores in course_score_stats(self.db, course_id):
+                summary = scores.summary()
+                print("\n SCORE DISTRIBUTION")
+                print(f"Median: {summary['median']:.2f}% | Q1: {summary['q1']:.2f}% | Q3: {summary['q3']:.2f}%")
+                print(f"Standard Deviation: {summary['stddev']:.2f}")
+                print("\n".join(histogram_bars(scores.histogram())))
         
         # Attendance
         attendance_query = """
         SELECT 
-            COUNT(*) as total_records,
-            ROUND(AVG(CASE WHEN status = 'present' THEN 100 ELSE 0 END), 2) as avg_attendance
-        FROM attendance
+            COALESCE(SUM(total), 0) as total_records,
+            ROUND((SUM(present) / SUM(total)) * 100, 2) as avg_attendance
+        FROM attendance_rollup
         WHERE course_id = %s
         """
         attendance = self.db.fetch_one(attendance_query, (course_id,))
@@ -221,7 +248,7 @@ class Reports:
             COUNT(CASE WHEN status = 'graduated' THEN 1 END) as graduated
         FROM students
         """
-        students = self.db.fetch_one(student_query)
+        students = self.db.fetch_one(student_query, cache=True)
         
         print("\n STUDENTS")
         if students:
@@ -232,7 +259,7 @@ class Reports:
         
         # Course Statistics
         course_query = "SELECT COUNT(*) as total FROM courses"
-        courses = self.db.fetch_one(course_query)
+        courses = self.db.fetch_one(course_query, cache=True)
         
         print(f"\n COURSES")
         print(f"Total Courses: {courses['total'] if courses else 0}")
@@ -244,22 +271,25 @@ class Reports:
             AVG(score) as avg_score
         FROM academic_records
         """
-        records = self.db.fetch_one(records_query)
+        records = self.db.fetch_one(records_query, cache=True)
+        gpa_query = "SELECT ROUND(SUM(quality_points) / NULLIF(SUM(credits), 0), 2) as gpa FROM student_gpa"
+        gpa = self.db.fetch_one(gpa_query, cache=True)
         
         print(f"\n ACADEMIC RECORDS")
         if records and records['total_records'] > 0:
             print(f"Total Grade Records: {records['total_records']}")
             print(f"System-wide Average Score: {records['avg_score']:.2f}%")
-            print(f"System-wide GPA: {(records['avg_score']/100)*4:.2f}/4.0")
+            if gpa and gpa['gpa'] is not None:
+                print(f"System-wide GPA: {gpa['gpa']:.2f}/4.0")
         
         # Attendance
         attendance_query = """
         SELECT 
-            COUNT(*) as total_records,
-            ROUND(AVG(CASE WHEN status = 'present' THEN 100 ELSE 0 END), 2) as avg_attendance
-        FROM attendance
+            COALESCE(SUM(total), 0) as total_records,
+            ROUND((SUM(present) / SUM(total)) * 100, 2) as avg_attendance
+        FROM attendance_rollup
         """
-        attendance = self.db.fetch_one(attendance_query)
+        attendance = self.db.fetch_one(attendance_query, cache=True)
         
         print(f"\n ATTENDANCE")
         if attendance and attendance['total_records'] > 0:
@@ -268,7 +298,7 @@ class Reports:
         
         # Documents
         docs_query = "SELECT COUNT(*) as total FROM documents"
-        docs = self.db.fetch_one(docs_query)
+        docs = self.db.fetch_one(docs_query, cache=True)
         
         print(f"\n DOCUMENTS")
         print(f"Total Documents: {docs['total'] if docs else 0}")
@@ -282,14 +312,13 @@ class Reports:
             s.student_id,
             s.first_name,
             s.last_name,
-            COUNT(ar.record_id) as courses_taken,
-            AVG(ar.score) as avg_score,
-            ROUND((AVG(ar.score) / 100) * 4, 2) as gpa
-        FROM students s
-        JOIN academic_records ar ON s.student_id = ar.student_id
-        GROUP BY s.student_id, s.first_name, s.last_name
-        HAVING courses_taken >= 3
-        ORDER BY avg_score DESC
+            g.courses as courses_taken,
+            ROUND(g.score_total / g.courses, 2) as avg_score,
+            g.gpa
+        FROM student_gpa g
+        JOIN students s ON g.student_id = s.student_id
+        WHERE g.courses >= 3
+        ORDER BY g.gpa DESC, avg_score DESC
         LIMIT %s
         """
         performers = self.db.fetch_all(query, (limit,))
@@ -303,6 +332,37 @@ class Reports:
         else:
             print("No data available")
     
+    def view_student_ranks(self, student_id):
+        """Rank and percentile in the student's cohort, courses and semesters"""
+        ranks = self.rankings.student_ranks(student_id)
+        
+        if ranks:
+            print(f"\n CLASS RANK - STUDENT {student_id}")
+            print("="*80)
+            rows = [[" ".join(str(part) for part in scope), rank['value'], f"{rank['rank']} of {rank['of']}",
+                     f"{rank['percentile']:.1f}"] for scope, rank in ranks]
+            print(tabulate(rows, headers=['Scope', 'Value', 'Rank', 'Percentile'], tablefmt="grid"))
+        else:
+            print("No graded records to rank")
+        return ranks
+    
+    def view_leaderboard(self, scope, limit=10):
+        """Top students of a ('cohort', year), ('course', id) or ('semester', name, year) scope"""
+        leaders = self.rankings.leaderboard(scope, limit)
+        
+        if leaders:
+            placeholders = ", ".join(["%s"] * len(leaders))
+            names = {row['student_id']: f"{row['first_name']} {row['last_name']}" for row in
+                     self.db.fetch_all(f"SELECT student_id, first_name, last_name FROM students "
+                                       f"WHERE student_id IN ({placeholders})", [key for _, key, _ in leaders])}
+            print(f"\n LEADERBOARD - {' '.join(str(part) for part in scope).upper()}")
+            print("="*80)
+            rows = [[rank, student_id, names.get(student_id, ''), value] for rank, student_id, value in leaders]
+            print(tabulate(rows, headers=['Rank', 'Student ID', 'Name', 'Value'], tablefmt="grid"))
+        else:
+            print("No data available")
+        return leaders
+    
     def view_low_performers(self, threshold=60, limit=10):
         """View students who need academic support"""
         query = """
@@ -311,14 +371,12 @@ class Reports:
             s.first_name,
             s.last_name,
             s.email,
-            COUNT(ar.record_id) as courses_taken,
-            AVG(ar.score) as avg_score,
-            ROUND((AVG(ar.score) / 100) * 4, 2) as gpa
-        FROM students s
-        JOIN academic_records ar ON s.student_id = ar.student_id
-        WHERE s.status = 'active'
-        GROUP BY s.student_id, s.first_name, s.last_name, s.email
-        HAVING avg_score < %s
+            g.courses as courses_taken,
+            ROUND(g.score_total / g.courses, 2) as avg_score,
+            g.gpa
+        FROM student_gpa g
+        JOIN students s ON g.student_id = s.student_id
+        WHERE s.status = 'active' AND g.score_total < %s * g.courses
         ORDER BY avg_score ASC
         LIMIT %s
         """
@@ -341,11 +399,11 @@ class Reports:
             s.student_id,
             s.first_name,
             s.last_name,
-            COUNT(a.attendance_id) as total_classes,
-            SUM(CASE WHEN a.status = 'present' THEN 1 ELSE 0 END) as present,
-            ROUND((SUM(CASE WHEN a.status = 'present' THEN 1 ELSE 0 END) / COUNT(*)) * 100, 2) as percentage
+            SUM(r.total) as total_classes,
+            SUM(r.present) as present,
+            ROUND((SUM(r.present) / SUM(r.total)) * 100, 2) as percentage
         FROM students s
-        JOIN attendance a ON s.student_id = a.student_id
+        JOIN attendance_rollup r ON s.student_id = r.student_id
         WHERE s.status = 'active'
         GROUP BY s.student_id, s.first_name, s.last_name
         ORDER BY percentage ASC
@@ -367,6 +425,92 @@ class Reports:
         else:
             print("No attendance data available")
     
+    def view_streak_alerts(self, min_absent=3, min_late=3):
+        """Students absent min_absent sessions in a row, or late min_late times this week"""
+        print("\n ATTENDANCE STREAK ALERTS")
+        print("="*80)
+        
+        absent = self.streaks.absence_streaks(min_absent)
+        if absent:
+            print(f"\nAbsent {min_absent}+ consecutive sessions:")
+            headers = absent[0].keys()
+            rows = [list(r.values()) for r in absent]
+            print(tabulate(rows, headers=headers, tablefmt="grid"))
+        else:
+            print(f"\n✓ No students absent {min_absent}+ sessions in a row")
+        
+        late = self.streaks.late_in_week(min_late)
+        if late:
+            print(f"\nLate {min_late}+ times this week:")
+            headers = late[0].keys()
+            rows = [list(r.values()) for r in late]
+            print(tabulate(rows, headers=headers, tablefmt="grid"))
+        else:
+            print(f"\n✓ No students late {min_late}+ times this week")
+        
+        return {'absent': absent, 'late': late}
+    
+    def view_attendance_heatmap(self, start_date, end_date, course_id=None):
+        """Calendar of daily present rates, one row per week, from attendance_calendar"""
+        start, end = as_date(start_date), as_date(end_date)
+        days = {row['period_start']: row for row in self.calendar.series('day', start, end, course_id)}
+        scope = f"Course {course_id}" if course_id else "All Courses"
+        
+        if not days:
+            print(f"No attendance recorded between {start} and {end} ({scope})")
+            return []
+        
+        print(f"\n ATTENDANCE HEATMAP - {scope}, {start} to {end}")
+        print("="*80)
+        rows = []
+        monday = period_start('week', start)
+        while monday <= end:
+            cells = []
+            for offset in range(7):
+                day = days.get(monday + timedelta(days=offset))
+                if day:
+                    percentage = float(day['percentage'])
+                    shade = next(mark for floor, mark in HEATMAP_SHADES if percentage >= floor)
+                    cells.append(f"{shade} {percentage:.0f}%")
+                else:
+                    cells.append("")
+            rows.append([monday] + cells)
+            monday += timedelta(days=7)
+        print(tabulate(rows, headers=['Week of', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'],
+                       tablefmt="grid"))
+        print("Present rate: " + "  ".join(f"{mark} >={floor}%" for floor, mark in HEATMAP_SHADES))
+        
+        total = sum(day['total'] for day in days.values())
+        present = sum(day['present'] for day in days.values())
+        print(f"\nSummary: {len(days)} day(s) | {total} sessions | {present / total * 100:.2f}% present")
+        return list(days.values())
+    
+    def view_attendance_trend(self, start_date, end_date, grain='week', course_id=None):
+        """Present, absent and late rates per week or month, from attendance_calendar"""
+        start, end = as_date(start_date), as_date(end_date)
+        periods = self.calendar.series(grain, start, end, course_id)
+        scope = f"Course {course_id}" if course_id else "All Courses"
+        
+        if not periods:
+            print(f"No attendance recorded between {start} and {end} ({scope})")
+            return []
+        
+        print(f"\n ATTENDANCE TREND BY {grain.upper()} - {scope}, {start} to {end}")
+        print("="*80)
+        rows = []
+        previous = None
+        for period in periods:
+            total = period['total']
+            percentage = float(period['percentage'])
+            change = f"{percentage - previous:+.2f}" if previous is not None else ""
+            rows.append([period['period_start'], total, f"{percentage:.2f}",
+                         f"{period['absent'] / total * 100:.2f}", f"{period['late'] / total * 100:.2f}",
+                         change, '█' * round(percentage / 100 * 30)])
+            previous = percentage
+        print(tabulate(rows, headers=[grain.title(), 'Sessions', 'Present %', 'Absent %', 'Late %',
+                                      'Change', 'Present'], tablefmt="grid"))
+        return periods
+    
     def generate_semester_report(self, semester, year):
         """Generate report for a specific semester"""
         print("\n" + "="*80)
@@ -386,18 +530,20 @@ class Reports:
         # Academic Performance
         performance_query = """
         SELECT 
-            AVG(score) as avg_score,
-            COUNT(*) as total_grades
-        FROM academic_records
-        WHERE semester = %s AND year = %s
+            SUM(score_total) / SUM(courses) as avg_score,
+            COALESCE(SUM(courses), 0) as total_grades,
+            ROUND(SUM(quality_points) / NULLIF(SUM(credits), 0), 2) as gpa
+        FROM student_term_summary
+        WHERE year = %s AND semester = %s
         """
-        performance = self.db.fetch_one(performance_query, (semester, year))
+        performance = self.db.fetch_one(performance_query, (year, semester))
         
         if performance and performance['total_grades'] > 0:
             print(f"\n ACADEMIC PERFORMANCE")
             print(f"Total Grades Issued: {performance['total_grades']}")
             print(f"Semester Average: {performance['avg_score']:.2f}%")
-            print(f"Semester GPA: {(performance['avg_score']/100)*4:.2f}/4.0")
+            if performance['gpa'] is not None:
+                print(f"Semester GPA: {performance['gpa']:.2f}/4.0")
         
         # Course-wise breakdown
         courses_query = """
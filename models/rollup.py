@@ -0,0 +1,96 @@
+from collections import defaultdict
+from database.connection import DatabaseConnection
+
+# Per (student, course) attendance counts, so the summary reads in
+# models/attendance.py and models/reports.py never scan raw attendance.
+# Kept current by Attendance.upsert_attendance inside its own transaction;
+# rows go away with their student or course through ON DELETE CASCADE.
+# Rebuilds read attendance_history, so archived terms stay counted.
+# Rebuild after loading attendance by other means (e.g. database.seed):
+#     python -m models.rollup
+
+STATUSES = ('present', 'absent', 'late', 'excused')
+
+ROLLUP_DELTA_QUERY = """
+INSERT INTO attendance_rollup (student_id, course_id, total, present, absent, late, excused)
+VALUES (%s, %s, %s, %s, %s, %s, %s) AS new
+ON DUPLICATE KEY UPDATE
+    total = total + new.total,
+    present = present + new.present,
+    absent = absent + new.absent,
+    late = late + new.late,
+    excused = excused + new.excused
+"""
+
+ROLLUP_REBUILD_QUERY = """
+INSERT INTO attendance_rollup (student_id, course_id, total, present, absent, late, excused)
+SELECT
+    student_id,
+    course_id,
+    COUNT(*),
+    SUM(CASE WHEN status = 'present' THEN 1 ELSE 0 END),
+    SUM(CASE WHEN status = 'absent' THEN 1 ELSE 0 END),
+    SUM(CASE WHEN status = 'late' THEN 1 ELSE 0 END),
+    SUM(CASE WHEN status = 'excused' THEN 1 ELSE 0 END)
+FROM attendance_history
+WHERE student_id BETWEEN %s AND %s
+GROUP BY student_id, course_id
+"""
+
+def rollup_deltas(changes):
+    """Fold AttendanceWrite.changes into one count delta per (student, course)"""
+    deltas = defaultdict(lambda: [0, 0, 0, 0, 0])
+    for student_id, course_id, _, old_status, new_status in changes:
+        delta = deltas[(student_id, course_id)]
+        if old_status is None:
+            delta[0] += 1
+        else:
+            delta[1 + STATUSES.index(old_status)] -= 1
+        delta[1 + STATUSES.index(new_status)] += 1
+    return [key + tuple(delta) for key, delta in deltas.items()]
+
+class AttendanceRollup:
+    def __init__(self, db=None):
+        self.db = db or DatabaseConnection()
+
+    def apply(self, changes):
+        """Add the count deltas of a batch of attendance changes; returns False on error.
+
+        Call it inside the transaction that wrote the attendance rows so the
+        rollup commits or rolls back with them.
+        """
+        deltas = rollup_deltas(changes)
+        if not deltas:
+            return True
+        return self.db.execute_many(ROLLUP_DELTA_QUERY, deltas) is not None
+
+    def rebuild(self, batch_size=1000):
+        """Recompute the rollup from raw attendance, batch_size students per transaction.
+
+        Each batch replaces its slice of the rollup atomically, so readers
+        never see a half-built student and writers to other students are
+        not blocked for the length of the whole rebuild.
+        """
+        bounds = self.db.fetch_one("SELECT MIN(student_id) AS low, MAX(student_id) AS high FROM students")
+        if not bounds or bounds['low'] is None:
+            print("No students to roll up")
+            return False
+
+        print(f"\nRebuilding attendance_rollup for students {bounds['low']}-{bounds['high']}...")
+        for low in range(bounds['low'], bounds['high'] + 1, batch_size):
+            high = low + batch_size - 1
+            with self.db.transaction():
+                self.db.execute_query("DELETE FROM attendance_rollup WHERE student_id BETWEEN %s AND %s",
+                                      (low, high))
+                self.db.execute_query(ROLLUP_REBUILD_QUERY, (low, high))
+                failed = self.db.transaction_failed
+            if failed:
+                print(f"❌ Rebuild stopped at students {low}-{high}")
+                return False
+
+        row = self.db.fetch_one("SELECT COUNT(*) AS pairs, COALESCE(SUM(total), 0) AS total FROM attendance_rollup")
+        print(f"✓ attendance_rollup rebuilt: {row['pairs']} student/course pairs, {row['total']} attendance rows")
+        return True
+
+if __name__ == "__main__":
+    AttendanceRollup().rebuild()
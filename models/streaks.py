@@ -0,0 +1,252 @@
+from collections import defaultdict
+from itertools import chain
+from datetime import date, timedelta
+from database.connection import DatabaseConnection
+
+# Current and longest runs of consecutive absent / late sessions per
+# (student, course), stored in attendance_streaks. Attendance.upsert_attendance
+# refreshes the pairs it touches inside its own transaction; rebuild from
+# raw attendance after bulk loads with:
+#     python -m models.streaks
+
+STREAK_UPSERT_QUERY = """
+INSERT INTO attendance_streaks
+(student_id, course_id, current_absent, max_absent, current_late, max_late, last_date)
+VALUES (%s, %s, %s, %s, %s, %s, %s) AS new
+ON DUPLICATE KEY UPDATE
+    current_absent = new.current_absent,
+    max_absent = new.max_absent,
+    current_late = new.current_late,
+    max_late = new.max_late,
+    last_date = new.last_date
+"""
+
+STREAK_STATE_QUERY = """
+SELECT student_id, course_id, current_absent, max_absent, current_late, max_late, last_date
+FROM attendance_streaks
+WHERE (student_id, course_id) IN ({pairs})
+FOR UPDATE
+"""
+
+# Locking read, as in rebuild: a concurrent writer to one of these pairs
+# waits until the recomputed streak is stored
+PAIR_SESSIONS_QUERY = """
+SELECT student_id, course_id, attendance_date, status
+FROM attendance
+WHERE (student_id, course_id) IN ({pairs})
+ORDER BY student_id, course_id, attendance_date
+FOR SHARE
+"""
+
+ARCHIVED_PAIR_SESSIONS_QUERY = """
+SELECT student_id, course_id, attendance_date, status
+FROM attendance_archive
+WHERE (student_id, course_id) IN ({pairs})
+ORDER BY student_id, course_id, attendance_date
+"""
+
+# Locking read: writers to these students wait until the block is replaced
+BLOCK_SESSIONS_QUERY = """
+SELECT student_id, course_id, attendance_date, status
+FROM attendance
+WHERE student_id BETWEEN %s AND %s
+ORDER BY student_id, course_id, attendance_date
+FOR SHARE
+"""
+
+# Archived sessions all precede the hot ones, so folding these first keeps
+# every pair in date order
+ARCHIVED_BLOCK_SESSIONS_QUERY = """
+SELECT student_id, course_id, attendance_date, status
+FROM attendance_archive
+WHERE student_id BETWEEN %s AND %s
+ORDER BY student_id, course_id, attendance_date
+"""
+
+STUDENT_STREAKS_QUERY = """
+SELECT
+    c.course_code,
+    c.course_name,
+    t.current_absent,
+    t.max_absent,
+    t.current_late,
+    t.max_late,
+    t.last_date
+FROM attendance_streaks t
+JOIN courses c ON t.course_id = c.course_id
+WHERE t.student_id = %s
+ORDER BY t.current_absent DESC, t.max_absent DESC
+"""
+
+ABSENCE_STREAK_QUERY = """
+SELECT
+    s.student_id,
+    s.first_name,
+    s.last_name,
+    c.course_code,
+    t.current_absent,
+    t.max_absent,
+    t.last_date
+FROM attendance_streaks t
+JOIN students s ON t.student_id = s.student_id
+JOIN courses c ON t.course_id = c.course_id
+WHERE t.current_absent >= %s
+ORDER BY t.current_absent DESC, s.last_name
+"""
+
+LATE_IN_WEEK_QUERY = """
+SELECT
+    s.student_id,
+    s.first_name,
+    s.last_name,
+    COUNT(*) as late_count
+FROM attendance a
+JOIN students s ON a.student_id = s.student_id
+WHERE a.attendance_date BETWEEN %s AND %s AND a.status = 'late'
+GROUP BY s.student_id, s.first_name, s.last_name
+HAVING late_count >= %s
+ORDER BY late_count DESC, s.last_name
+"""
+
+PAIR_CHUNK = 1000
+
+class Streak:
+    """Running streak state of one (student, course), fed sessions in date order"""
+    __slots__ = ('current_absent', 'max_absent', 'current_late', 'max_late', 'last_date')
+
+    def __init__(self, current_absent=0, max_absent=0, current_late=0, max_late=0, last_date=None):
+        self.current_absent = current_absent
+        self.max_absent = max_absent
+        self.current_late = current_late
+        self.max_late = max_late
+        self.last_date = last_date
+
+    def add(self, session_date, status):
+        if status == 'absent':
+            self.current_absent += 1
+            self.max_absent = max(self.max_absent, self.current_absent)
+        else:
+            self.current_absent = 0
+        if status == 'late':
+            self.current_late += 1
+            self.max_late = max(self.max_late, self.current_late)
+        else:
+            self.current_late = 0
+        self.last_date = session_date
+
+    def row(self, student_id, course_id):
+        return (student_id, course_id, self.current_absent, self.max_absent,
+                self.current_late, self.max_late, self.last_date)
+
+def _pair_placeholders(count):
+    return ", ".join(["(%s, %s)"] * count)
+
+class StreakEngine:
+    def __init__(self, db=None):
+        self.db = db or DatabaseConnection()
+
+    def _fold(self, rows):
+        """Fold date-ordered session rows into {(student_id, course_id): Streak}"""
+        streaks = {}
+        for row in rows:
+            key = (row['student_id'], row['course_id'])
+            streak = streaks.get(key)
+            if streak is None:
+                streak = streaks[key] = Streak()
+            streak.add(row['attendance_date'], row['status'])
+        return streaks
+
+    def apply(self, changes):
+        """Refresh the streaks of the pairs in AttendanceWrite.changes; returns False on error.
+
+        Run inside the transaction that wrote the attendance. Sessions
+        appended after a pair's last known date extend its streaks in place;
+        any back-dated or edited session makes that pair be recomputed from
+        its attendance rows.
+        """
+        sessions = defaultdict(list)
+        for student_id, course_id, session_date, old_status, new_status in changes:
+            sessions[(student_id, course_id)].append((session_date, old_status, new_status))
+        if not sessions:
+            return True
+
+        pairs = list(sessions)
+        states = {}
+        for start in range(0, len(pairs), PAIR_CHUNK):
+            chunk = pairs[start:start + PAIR_CHUNK]
+            query = STREAK_STATE_QUERY.format(pairs=_pair_placeholders(len(chunk)))
+            for row in self.db.fetch_all(query, [value for pair in chunk for value in pair]):
+                states[(row['student_id'], row['course_id'])] = Streak(
+                    row['current_absent'], row['max_absent'], row['current_late'],
+                    row['max_late'], row['last_date'])
+
+        recompute = []
+        for pair, pair_sessions in sessions.items():
+            pair_sessions.sort(key=lambda session: session[0])
+            state = states.get(pair)
+            appendable = (state is not None and state.last_date is not None
+                          and pair_sessions[0][0] > state.last_date
+                          and all(old is None for _, old, _ in pair_sessions))
+            if appendable:
+                for session_date, _, new_status in pair_sessions:
+                    state.add(session_date, new_status)
+            else:
+                recompute.append(pair)
+
+        for start in range(0, len(recompute), PAIR_CHUNK):
+            chunk = recompute[start:start + PAIR_CHUNK]
+            placeholders = _pair_placeholders(len(chunk))
+            params = [value for pair in chunk for value in pair]
+            # Archived sessions first, so each pair is folded in date order
+            states.update(self._fold(chain(
+                self.db.fetch_all(ARCHIVED_PAIR_SESSIONS_QUERY.format(pairs=placeholders), params),
+                self.db.fetch_all(PAIR_SESSIONS_QUERY.format(pairs=placeholders), params))))
+
+        rows = [states[pair].row(*pair) for pair in pairs if pair in states]
+        return self.db.execute_many(STREAK_UPSERT_QUERY, rows) is not None
+
+    def rebuild(self, batch_size=500):
+        """Recompute every streak with one ordered pass over attendance, batch_size students at a time"""
+        bounds = self.db.fetch_one("SELECT MIN(student_id) AS low, MAX(student_id) AS high FROM students")
+        if not bounds or bounds['low'] is None:
+            print("No students to scan")
+            return False
+
+        print(f"\nRebuilding attendance_streaks for students {bounds['low']}-{bounds['high']}...")
+        pairs = 0
+        for low in range(bounds['low'], bounds['high'] + 1, batch_size):
+            high = low + batch_size - 1
+            with self.db.transaction():
+                streaks = self._fold(chain(
+                    self.db.fetch_iter(ARCHIVED_BLOCK_SESSIONS_QUERY, (low, high), batch_size=5000),
+                    self.db.fetch_iter(BLOCK_SESSIONS_QUERY, (low, high), batch_size=5000)))
+                self.db.execute_query("DELETE FROM attendance_streaks WHERE student_id BETWEEN %s AND %s",
+                                      (low, high))
+                self.db.execute_many(STREAK_UPSERT_QUERY,
+                                     (streak.row(*pair) for pair, streak in streaks.items()))
+                failed = self.db.transaction_failed
+            if failed:
+                print(f"❌ Rebuild stopped at students {low}-{high}")
+                return False
+            pairs += len(streaks)
+
+        print(f"✓ attendance_streaks rebuilt for {pairs} student/course pairs")
+        return True
+
+    # ============ READS ============
+
+    def student_streaks(self, student_id):
+        return self.db.fetch_all(STUDENT_STREAKS_QUERY, (student_id,), cache=True)
+
+    def absence_streaks(self, min_absent=3):
+        """Pairs whose latest min_absent or more sessions were all absences"""
+        return self.db.fetch_all(ABSENCE_STREAK_QUERY, (min_absent,), cache=True)
+
+    def late_in_week(self, min_late=3, week_of=None):
+        """Students late min_late or more times in the Monday-Sunday week containing week_of"""
+        week_of = week_of or date.today()
+        monday = week_of - timedelta(days=week_of.weekday())
+        return self.db.fetch_all(LATE_IN_WEEK_QUERY, (monday, monday + timedelta(days=6), min_late))
+
+if __name__ == "__main__":
+    StreakEngine().rebuild()
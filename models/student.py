@@ -1,6 +1,12 @@
 from database.connection import DatabaseConnection
+from models.attendance_calendar import AttendanceCalendar
+from models.gpa import notify_grade_listeners
 from tabulate import tabulate
 
+# Read queries shared with the async layer (models/async_reads.py)
+ALL_STUDENTS_QUERY = "SELECT * FROM students ORDER BY student_id"
+STUDENT_BY_ID_QUERY = "SELECT * FROM students WHERE student_id = %s"
+
 class Student:
     def __init__(self):
         self.db = DatabaseConnection()
@@ -19,8 +25,7 @@ class Student:
         return False
     
     def view_all_students(self):
-        query = "SELECT * FROM students ORDER BY student_id"
-        students = self.db.fetch_all(query)
+        students = self.db.fetch_all(ALL_STUDENTS_QUERY)
         
         if students:
             headers = students[0].keys()
@@ -30,8 +35,7 @@ class Student:
             print("No students found.")
     
     def search_student(self, student_id):
-        query = "SELECT * FROM students WHERE student_id = %s"
-        student = self.db.fetch_one(query, (student_id,))
+        student = self.db.fetch_one(STUDENT_BY_ID_QUERY, (student_id,), prepared=True)
         
         if student:
             print("\n=== Student Details ===")
@@ -57,8 +61,17 @@ class Student:
     
     def delete_student(self, student_id):
         query = "DELETE FROM students WHERE student_id = %s"
-        result = self.db.execute_query(query, (student_id,))
+        with self.db.transaction():
+            # The attendance cascade bypasses the calendar counts, and a
+            # partitioned attendance table has no cascade at all
+            AttendanceCalendar(self.db).retract('student_id', student_id)
+            self.db.execute_query("DELETE FROM attendance WHERE student_id = %s", (student_id,))
+            self.db.execute_query("DELETE FROM attendance_archive WHERE student_id = %s", (student_id,))
+            result = self.db.execute_query(query, (student_id,))
+            if self.db.transaction_failed:
+                result = None
         if result:
+            notify_grade_listeners([(student_id, None, None, None)])
             print(f"✓ Student {student_id} deleted successfully!")
             return True
         return False
\ No newline at end of file
@@ -0,0 +1,291 @@
+import html
+import os
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+from operator import itemgetter
+from config import TRANSCRIPT_CONFIG
+from database.connection import DatabaseConnection
+from models.gpa import grade_points
+
+# Bulk transcripts for a cohort. Two streaming queries read the whole
+# cohort, one for student headers and one for every grade row, both ordered
+# by student_id, so the job costs two round trips however many students
+# there are. The parent merges the streams into one bundle per student and
+# hands chunks of bundles to a process pool, which renders text or HTML and
+# writes one file per student (or returns it for a single zip archive).
+# Term and cumulative GPA are computed from the same rows with the banded,
+# credit-weighted definition in models/gpa.py, so each transcript is
+# consistent with itself. Run with:
+#     python -m models.transcripts --status graduated
+#     python -m models.transcripts --enrolled 2021 --format html --archive class_of_2025.zip
+#     python -m models.transcripts --ids 17 42 108 --output-dir out
+
+FORMATS = ('text', 'html')
+
+COHORT_COUNT_QUERY = "SELECT COUNT(*) AS students FROM students s WHERE {cohort}"
+
+COHORT_STUDENTS_QUERY = """
+SELECT s.student_id, s.first_name, s.last_name, s.email, s.enrollment_date, s.status
+FROM students s
+WHERE {cohort}
+ORDER BY s.student_id
+"""
+
+COHORT_RECORDS_QUERY = """
+SELECT
+    ar.student_id,
+    ar.semester,
+    ar.year,
+    c.course_code,
+    c.course_name,
+    c.credits,
+    ar.grade,
+    ar.score
+FROM students s
+JOIN academic_records ar ON ar.student_id = s.student_id
+JOIN courses c ON ar.course_id = c.course_id
+WHERE {cohort}
+ORDER BY ar.student_id, ar.year, ar.semester, c.course_code
+"""
+
+def cohort_condition(status=None, enrolled=None, student_ids=None):
+    """(WHERE clause on students s, params) selecting a cohort; every student without filters"""
+    clauses, params = [], []
+    if status:
+        clauses.append("s.status = %s")
+        params.append(status)
+    if enrolled:
+        clauses.append("s.enrollment_date >= %s AND s.enrollment_date < %s")
+        params += [f"{enrolled}-01-01", f"{enrolled + 1}-01-01"]
+    if student_ids:
+        clauses.append(f"s.student_id IN ({', '.join(['%s'] * len(student_ids))})")
+        params += list(student_ids)
+    return " AND ".join(clauses) or "1 = 1", tuple(params)
+
+# ============ RENDERING (runs in the worker processes) ============
+
+def _totals(records):
+    """Graded courses, credits and credit-weighted GPA of some transcript rows"""
+    graded = [r for r in records if r['score'] is not None]
+    credits = sum(r['credits'] or 0 for r in graded)
+    points = sum((r['credits'] or 0) * grade_points(float(r['score'])) for r in graded)
+    gpa = round(points / credits, 2) if credits else None
+    average = sum(float(r['score']) for r in graded) / len(graded) if graded else None
+    return {'courses': len(graded), 'credits': credits, 'gpa': gpa, 'average_score': average}
+
+def _terms(records):
+    """[(semester, year, rows)] in transcript order"""
+    return [(semester, year, list(rows)) for (semester, year), rows in
+            groupby(records, key=lambda r: (r['semester'], r['year']))]
+
+def _score(record):
+    return "-" if record['score'] is None else f"{record['score']:.1f}"
+
+def render_text(student, records):
+    """Plain-text transcript in the layout of AcademicRecord.view_transcript"""
+    lines = ["=" * 70,
+             "                        OFFICIAL TRANSCRIPT",
+             "=" * 70,
+             "",
+             f"Student Name: {student['first_name']} {student['last_name']}",
+             f"Student ID: {student['student_id']}",
+             f"Email: {student['email']}",
+             f"Enrollment Date: {student['enrollment_date']}",
+             f"Status: {student['status']}",
+             "",
+             "-" * 70]
+    if not records:
+        lines += ["", "No academic records found."]
+    for semester, year, rows in _terms(records):
+        lines += ["", f"{semester} {year}", "-" * 70]
+        for r in rows:
+            lines.append(f"{r['course_code']:<10} {r['course_name']:<30} "
+                         f"Credits: {r['credits']:<3} Grade: {r['grade'] or '-':<5} Score: {_score(r)}")
+        term = _totals(rows)
+        if term['gpa'] is not None:
+            lines += ["", f"Semester Credits: {term['credits']} | Semester GPA: {term['gpa']:.2f}"]
+        lines.append("-" * 70)
+    overall = _totals(records)
+    if overall['gpa'] is not None:
+        lines += ["",
+                  f"Total Courses: {overall['courses']}",
+                  f"Total Credits: {overall['credits']}",
+                  f"Average Score: {overall['average_score']:.2f}%",
+                  f"GPA (4.0 scale): {overall['gpa']:.2f}"]
+    lines.append("=" * 70)
+    return "\n".join(lines) + "\n"
+
+def render_html(student, records):
+    """Self-contained HTML transcript, printable from a browser"""
+    e = lambda value: html.escape(str(value))
+    name = f"{student['first_name']} {student['last_name']}"
+    parts = ["<!DOCTYPE html>",
+             f"<html><head><meta charset=\"utf-8\"><title>Transcript - {e(name)}</title>",
+             "<style>body{font-family:sans-serif;max-width:50em;margin:2em auto}"
+             "table{border-collapse:collapse;width:100%;margin-bottom:.5em}"
+             "th,td{border:1px solid #999;padding:2px 6px;text-align:left}</style></head><body>",
+             "<h1>Official Transcript</h1>",
+             f"<p><b>{e(name)}</b><br>Student ID: {e(student['student_id'])}<br>"
+             f"Email: {e(student['email'])}<br>Enrollment Date: {e(student['enrollment_date'])}<br>"
+             f"Status: {e(student['status'])}</p>"]
+    if not records:
+        parts.append("<p>No academic records found.</p>")
+    for semester, year, rows in _terms(records):
+        parts.append(f"<h2>{e(semester)} {e(year)}</h2><table>"
+                     "<tr><th>Code</th><th>Course</th><th>Credits</th><th>Grade</th><th>Score</th></tr>")
+        for r in rows:
+            parts.append(f"<tr><td>{e(r['course_code'])}</td><td>{e(r['course_name'])}</td>"
+                         f"<td>{e(r['credits'])}</td><td>{e(r['grade'] or '-')}</td><td>{_score(r)}</td></tr>")
+        parts.append("</table>")
+        term = _totals(rows)
+        if term['gpa'] is not None:
+            parts.append(f"<p>Semester Credits: {term['credits']} | Semester GPA: {term['gpa']:.2f}</p>")
+    overall = _totals(records)
+    if overall['gpa'] is not None:
+        parts.append(f"<h2>Summary</h2><p>Total Courses: {overall['courses']}<br>"
+                     f"Total Credits: {overall['credits']}<br>"
+                     f"Average Score: {overall['average_score']:.2f}%<br>"
+                     f"GPA (4.0 scale): {overall['gpa']:.2f}</p>")
+    parts.append("</body></html>")
+    return "\n".join(parts) + "\n"
+
+RENDERERS = {'text': (render_text, 'txt'), 'html': (render_html, 'html')}
+
+def render_chunk(bundles, fmt, output_dir=None):
+    """Render (student, records) bundles; write them to output_dir, or return [(name, content)]"""
+    render, extension = RENDERERS[fmt]
+    rendered = [(f"transcript_{student['student_id']}.{extension}", render(student, records))
+                for student, records in bundles]
+    if output_dir is None:
+        return rendered
+    written = 0
+    for name, content in rendered:
+        with open(os.path.join(output_dir, name), 'w', encoding='utf-8') as f:
+            written += f.write(content)
+    return len(rendered), written
+
+# ============ JOB ============
+
+class TranscriptJob:
+    def __init__(self, db=None, workers=None, chunk_size=None):
+        self.db = db or DatabaseConnection()
+        self.workers = workers or TRANSCRIPT_CONFIG['workers'] or os.cpu_count() or 1
+        self.chunk_size = chunk_size or TRANSCRIPT_CONFIG['chunk_size']
+
+    def _bundles(self, cohort, params):
+        """(student, records) per cohort student, merged from the two ordered streams"""
+        batch_size = TRANSCRIPT_CONFIG['fetch_batch_size']
+        records = ((student_id, list(rows)) for student_id, rows in
+                   groupby(self.db.fetch_iter(COHORT_RECORDS_QUERY.format(cohort=cohort), params, batch_size),
+                           key=itemgetter('student_id')))
+        pending = next(records, None)
+        for student in self.db.fetch_iter(COHORT_STUDENTS_QUERY.format(cohort=cohort), params, batch_size):
+            while pending and pending[0] < student['student_id']:
+                pending = next(records, None)
+            if pending and pending[0] == student['student_id']:
+                yield student, pending[1]
+                pending = next(records, None)
+            else:
+                yield student, []
+
+    def _chunks(self, bundles):
+        chunk = []
+        for bundle in bundles:
+            chunk.append(bundle)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def run(self, status=None, enrolled=None, student_ids=None, fmt='text', output_dir=None, archive=None):
+        """Render transcripts for a cohort into output_dir, or into one zip archive.
+
+        Chunks are rendered in order by the process pool with at most two
+        chunks per worker in flight, so memory stays bounded by the chunk
+        size rather than the cohort size. Returns the number of transcripts
+        written, or None on error.
+        """
+        if fmt not in FORMATS:
+            print(f"Unknown format '{fmt}'. Use one of: {', '.join(FORMATS)}")
+            return None
+        cohort, params = cohort_condition(status, enrolled, student_ids)
+        row = self.db.fetch_one(COHORT_COUNT_QUERY.format(cohort=cohort), params)
+        if row is None:
+            return None
+        total = row['students']
+        if not total:
+            print("No students in this cohort")
+            return 0
+
+        if archive is None:
+            output_dir = output_dir or TRANSCRIPT_CONFIG['output_dir']
+            os.makedirs(output_dir, exist_ok=True)
+            destination = output_dir
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(archive)), exist_ok=True)
+            destination = archive
+        print(f"\nRendering {total:,} {fmt} transcript(s) into {destination} with {self.workers} worker(s)...")
+
+        started = time.perf_counter()
+        done = size = 0
+        zip_file = zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) if archive else None
+
+        def collect(result):
+            nonlocal done, size
+            if zip_file is None:
+                count, written = result
+            else:
+                count, written = len(result), 0
+                for name, content in result:
+                    zip_file.writestr(name, content)
+                    written += len(content)
+            done += count
+            size += written
+            rate = done / max(time.perf_counter() - started, 1e-9)
+            print(f"\r  {done:,}/{total:,} transcripts ({rate:,.0f}/s)", end="", flush=True)
+
+        target = None if zip_file else output_dir
+        try:
+            if self.workers == 1:
+                for chunk in self._chunks(self._bundles(cohort, params)):
+                    collect(render_chunk(chunk, fmt, target))
+            else:
+                with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                    in_flight = deque()
+                    for chunk in self._chunks(self._bundles(cohort, params)):
+                        in_flight.append(pool.submit(render_chunk, chunk, fmt, target))
+                        if len(in_flight) >= 2 * self.workers:
+                            collect(in_flight.popleft().result())
+                    while in_flight:
+                        collect(in_flight.popleft().result())
+        except (OSError, zipfile.BadZipFile) as e:
+            print(f"\n❌ Transcript job failed: {e}")
+            return None
+        finally:
+            if zip_file:
+                zip_file.close()
+
+        elapsed = time.perf_counter() - started
+        print(f"\n✓ {done:,} transcript(s), {size / 1e6:,.1f} MB in {elapsed:.1f}s "
+              f"({done / max(elapsed, 1e-9):,.0f} transcripts/s)")
+        return done
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Generate transcripts for a whole cohort")
+    parser.add_argument('--status', choices=['active', 'inactive', 'graduated'])
+    parser.add_argument('--enrolled', type=int, metavar='YEAR', help="students enrolled in this calendar year")
+    parser.add_argument('--ids', type=int, nargs='+', metavar='ID', help="explicit student ids")
+    parser.add_argument('--format', choices=FORMATS, default='text')
+    parser.add_argument('--output-dir', help="one file per student (default from TRANSCRIPT_CONFIG)")
+    parser.add_argument('--archive', metavar='ZIP', help="write a single zip archive instead")
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--chunk-size', type=int)
+    args = parser.parse_args()
+    job = TranscriptJob(workers=args.workers, chunk_size=args.chunk_size)
+    count = job.run(args.status, args.enrolled, args.ids, args.format, args.output_dir, args.archive)
+    raise SystemExit(0 if count is not None else 1)
@@ -0,0 +1,67 @@
+import re
+import unittest
+from datetime import date
+from database.connection import DatabaseConnection
+from models.attendance_calendar import AttendanceCalendar, SERIES_QUERY
+
+# A course id no real course uses; every write is rolled back
+TEST_COURSE = 2_000_000_000
+
+class _Rollback(Exception):
+    pass
+
+class _RecordingDb:
+    def __init__(self):
+        self.calls = []
+
+    def fetch_all(self, query, params=None, cache=False):
+        self.calls.append((query, params))
+        return []
+
+def _database():
+    """A DatabaseConnection to a migrated database, or None"""
+    db = DatabaseConnection()
+    try:
+        row = db.fetch_one("SELECT COUNT(*) AS found FROM information_schema.tables "
+                           "WHERE table_schema = DATABASE() AND table_name = 'attendance_calendar'")
+    except Exception:
+        return None
+    return db if row and row['found'] else None
+
+class SeriesParamsTest(unittest.TestCase):
+    def test_params_follow_placeholders(self):
+        db = _RecordingDb()
+        AttendanceCalendar(db).series('week', date(2024, 3, 6), date(2024, 3, 31), course_id=4)
+        query, params = db.calls[0]
+        self.assertIs(query, SERIES_QUERY)
+        columns = re.findall(r"(\w+) (?:= %s|BETWEEN %s AND %s)", query)
+        self.assertEqual(columns, ['grain', 'course_id', 'period_start'])
+        self.assertEqual(params, ('week', 4, date(2024, 3, 4), date(2024, 3, 31)))
+
+class SeriesRoundTripTest(unittest.TestCase):
+    def setUp(self):
+        self.db = _database()
+        if self.db is None:
+            self.skipTest("no migrated MySQL database available")
+
+    def test_series_reads_back_applied_changes(self):
+        calendar = AttendanceCalendar(self.db)
+        changes = [(1, TEST_COURSE, date(2024, 3, 4), None, 'present'),
+                   (2, TEST_COURSE, date(2024, 3, 4), None, 'absent'),
+                   (1, TEST_COURSE, date(2024, 3, 12), None, 'late')]
+        try:
+            with self.db.transaction():
+                self.assertTrue(calendar.apply(changes))
+                days = calendar.series('day', date(2024, 3, 1), date(2024, 3, 31), TEST_COURSE)
+                months = calendar.series('month', date(2024, 3, 1), date(2024, 3, 31), TEST_COURSE)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        self.assertEqual([(row['period_start'], row['total'], row['present'], row['absent'], row['late'])
+                          for row in days],
+                         [(date(2024, 3, 4), 2, 1, 1, 0), (date(2024, 3, 12), 1, 0, 0, 1)])
+        self.assertEqual([(row['period_start'], row['total']) for row in months], [(date(2024, 3, 1), 3)])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+from datetime import date, datetime
+from models.attendance import AttendanceWrite
+from models.checkin import CheckinIngestor
+
+class _RecordingDb:
+    def __init__(self, students, courses):
+        self.ids = {'student_id': set(students), 'course_id': set(courses)}
+        self.lookups = 0
+
+    def fetch_all(self, query, params=None, cache=False):
+        self.lookups += 1
+        column = 'student_id' if 'FROM students' in query else 'course_id'
+        return [{column: i} for i in params if i in self.ids[column]]
+
+class _RecordingAttendance:
+    def __init__(self, db):
+        self.db = db
+        self.batches = []
+
+    def upsert_attendance(self, rows, replace=True):
+        self.batches.append(sorted(rows))
+        result = AttendanceWrite()
+        result.inserted = len(rows)
+        return result
+
+class CheckinTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.db = _RecordingDb(students=[17, 18], courses=[4])
+        self.attendance = _RecordingAttendance(self.db)
+        self.ingestor = CheckinIngestor([], checkpoint_file=os.path.join(directory.name, 'checkpoints.json'),
+                                        attendance=self.attendance)
+
+    def swipe(self, student_id, ts, course_id=4):
+        return self.ingestor.add_event({'student_id': student_id, 'course_id': course_id, 'ts': ts})
+
+    def test_classify_against_session_start_and_grace(self):
+        # Defaults: session at 09:00, late after 10 minutes
+        self.assertEqual(self.ingestor.classify(4, datetime(2024, 3, 4, 8, 55)), 'present')
+        self.assertEqual(self.ingestor.classify(4, datetime(2024, 3, 4, 9, 10)), 'present')
+        self.assertEqual(self.ingestor.classify(4, datetime(2024, 3, 4, 9, 10, 1)), 'late')
+
+    def test_earliest_swipe_wins_whatever_the_read_order(self):
+        self.assertTrue(self.swipe(17, "2024-03-04T09:30:00"))
+        self.assertTrue(self.swipe(17, "2024-03-04T09:01:00"))
+        self.assertFalse(self.swipe(17, "2024-03-04T09:45:00"))
+        self.assertTrue(self.ingestor.flush())
+        self.assertEqual(self.attendance.batches, [[(17, 4, date(2024, 3, 4), 'present', "card reader")]])
+        self.assertEqual(self.ingestor.stats['duplicates'], 2)
+
+    def test_straggler_days_keep_their_earliest_swipe(self):
+        self.swipe(17, "2024-03-06T09:00:00")
+        self.swipe(17, "2024-03-05T09:00:00")
+        self.swipe(18, "2024-03-01T09:20:00")
+        self.swipe(18, "2024-03-01T08:58:00")
+        self.swipe(18, "2024-03-01T09:40:00")
+        self.ingestor.flush()
+        self.assertIn((18, 4, date(2024, 3, 1), 'present', "card reader"), self.attendance.batches[0])
+        self.assertEqual(len(self.attendance.batches[0]), 3)
+
+    def test_malformed_events_are_rejected(self):
+        self.assertFalse(self.ingestor.add_event({'student_id': 17, 'ts': "2024-03-04T09:00:00"}))
+        self.assertFalse(self.ingestor.add_event({'student_id': 'x', 'course_id': 4, 'ts': 0}))
+        self.assertEqual(self.ingestor.stats['rejected'], 2)
+
+    def test_deleted_ids_are_dropped_on_the_next_flush(self):
+        self.swipe(17, "2024-03-04T09:00:00")
+        self.ingestor.flush()
+        self.db.ids['student_id'].discard(17)
+        self.swipe(17, "2024-03-05T09:00:00")
+        self.swipe(18, "2024-03-05T09:00:00")
+        self.assertTrue(self.ingestor.flush())
+        self.assertEqual(self.attendance.batches[1], [(18, 4, date(2024, 3, 5), 'present', "card reader")])
+        self.assertEqual(self.ingestor.stats['rejected'], 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -48,6 +48,7 @@ def display_academic_menu():
     print("3. Calculate Student GPA")
     print("4. View Student Transcript")
     print("5. Update Academic Record")
+    print("6. View Score Statistics for All Courses")
     print("0. Back to Main Menu")
     print("-"*60)
 
@@ -61,6 +62,8 @@ def display_attendance_menu():
     print("3. Calculate Attendance Percentage")
     print("4. View Course Attendance")
     print("5. View Attendance by Date")
+    print("6. Mark Attendance for a Date Range")
+    print("7. View Attendance Streaks")
     print("0. Back to Main Menu")
     print("-"*60)
 
@@ -99,5 +102,10 @@ def display_reports_menu():
     print("5. View Students Needing Support")
     print("6. View Attendance Summary")
     print("7. Generate Semester Report")
+    print("8. View Attendance Streak Alerts")
+    print("9. View Attendance Calendar Heatmap")
+    print("10. View Attendance Trend")
+    print("11. View Class Rank for a Student")
+    print("12. View Leaderboard")
     print("0. Back to Main Menu")
     print("-"*60)
\ No newline at end of file
@@ -0,0 +1,112 @@
+import math
+
+class ScoreStats:
+    """Distribution of a stream of scores in bounded memory.
+
+    Mean and variance are kept with Welford's update (weighted, so a
+    (score, count) row counts as count scores) and the values themselves in
+    a histogram of bin_width buckets. With the default 0.01 width every
+    DECIMAL(5,2) score has its own bucket, so medians and quartiles are
+    exact while memory stays at most 10,001 buckets however many scores
+    are added.
+    """
+    def __init__(self, bin_width=0.01):
+        self.bin_width = bin_width
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = None
+        self.max = None
+        self._bins = {}
+
+    def add(self, value, count=1):
+        if value is None or count <= 0:
+            return
+        value = float(value)
+        self.count += count
+        delta = value - self.mean
+        self.mean += delta * count / self.count
+        self._m2 += count * delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        key = round(value / self.bin_width)
+        self._bins[key] = self._bins.get(key, 0) + count
+
+    @property
+    def stddev(self):
+        """Population standard deviation, as MySQL STDDEV()"""
+        return math.sqrt(self._m2 / self.count) if self.count else None
+
+    def quantiles(self, qs):
+        """Values at the given fractions (0-1), interpolating between neighbours like numpy's default"""
+        if not self.count:
+            return [None] * len(qs)
+        wanted = sorted({k for q in qs for k in (math.floor(q * (self.count - 1)),
+                                                  math.ceil(q * (self.count - 1)))})
+        found, seen, index = {}, 0, 0
+        for key in sorted(self._bins):
+            seen += self._bins[key]
+            while index < len(wanted) and wanted[index] < seen:
+                found[wanted[index]] = key * self.bin_width
+                index += 1
+            if index == len(wanted):
+                break
+        result = []
+        for q in qs:
+            position = q * (self.count - 1)
+            low, high = found[math.floor(position)], found[math.ceil(position)]
+            result.append(round(low + (high - low) * (position - math.floor(position)), 2))
+        return result
+
+    @property
+    def median(self):
+        return self.quantiles([0.5])[0]
+
+    def histogram(self, width=5, low=0, high=100):
+        """[(from, to, count)] in width-point buckets; the last bucket includes high"""
+        edges = list(range(low, high, width))
+        counts = [0] * len(edges)
+        for key, count in self._bins.items():
+            value = key * self.bin_width
+            index = min(max(int((value - low) // width), 0), len(edges) - 1)
+            counts[index] += count
+        return [(edge, min(edge + width, high), count) for edge, count in zip(edges, counts)]
+
+    def summary(self):
+        """Count, mean, stddev, min, quartiles and max as a dict of floats"""
+        q1, median, q3 = self.quantiles([0.25, 0.5, 0.75])
+        return {
+            'count': self.count,
+            'mean': round(self.mean, 2) if self.count else None,
+            'stddev': round(self.stddev, 2) if self.count else None,
+            'min': self.min,
+            'q1': q1,
+            'median': median,
+            'q3': q3,
+            'max': self.max,
+        }
+
+def grouped_stats(rows, key, value='score', count='n', bin_width=0.01):
+    """Yield (key, ScoreStats) from rows ordered by key, one group in memory at a time"""
+    current, stats = None, None
+    for row in rows:
+        if stats is None or row[key] != current:
+            if stats is not None:
+                yield current, stats
+            current, stats = row[key], ScoreStats(bin_width)
+        stats.add(row[value], row[count] if count else 1)
+    if stats is not None:
+        yield current, stats
+
+def histogram_bars(buckets, width=40):
+    """Text bars for ScoreStats.histogram() output, scaled to the largest bucket"""
+    filled = [index for index, (_, _, count) in enumerate(buckets) if count]
+    if filled:
+        # Empty buckets below the lowest and above the highest score add nothing
+        buckets = buckets[filled[0]:filled[-1] + 1]
+    peak = max((count for _, _, count in buckets), default=0)
+    lines = []
+    for low, high, count in buckets:
+        bar = "█" * round(count / peak * width) if peak else ""
+        lines.append(f"  {low:>3}-{high:<3} {bar} {count}")
+    return lines